@@ -0,0 +1,185 @@
+# cv_digest.py
+# Parse a CV once into a compact digest (headline, skills, experience) for prompts
+
+import os
+import re
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# ---- Env ----
+CV_DIGEST_CACHE_SIZE = int(os.getenv("CV_DIGEST_CACHE_SIZE", "2048"))
+MAX_SKILLS = 30
+MAX_ROLES = 6
+MAX_POINTS_PER_ROLE = 3
+
+# ---- Patterns ----
+_SECTION_ALIASES = {
+    "summary": ("summary", "profile", "about", "about me", "objective", "professional summary"),
+    "skills": ("skills", "technical skills", "core skills", "technologies", "tech stack", "competencies", "tools"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history", "work history"),
+    "projects": ("projects", "selected projects", "personal projects"),
+    "education": ("education", "academic background"),
+    # recognised so their lines don't leak into the previous section; not rendered
+    "other": ("languages", "certifications", "certificates", "hobbies", "interests", "references",
+              "awards", "volunteering", "publications"),
+}
+_HEADING = {alias: name for name, aliases in _SECTION_ALIASES.items() for alias in aliases}
+_HEADING_RE = re.compile(r"^[#=\-\s]*([A-Za-z][A-Za-z &/]{1,40}?)\s*[:#=\-]*\s*$")
+_DATE_RANGE_RE = re.compile(
+    r"((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+)?(19|20)\d{2}\s*(?:-|–|—|to)\s*"
+    r"(((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+)?(19|20)\d{2}|present|current|now)",
+    re.IGNORECASE,
+)
+_BULLET_RE = re.compile(r"^\s*(?:[-•*▪◦●]|\d+[.)])\s+")
+_METRIC_RE = re.compile(r"\d+(?:[.,]\d+)?\s*(?:%|x\b|k\b|m\b|\+|ms\b|users|customers|clients)|\$\s?\d", re.IGNORECASE)
+_SKILL_SPLIT_RE = re.compile(r"\s*(?:[,;|•·]|\s-\s|\band\b)\s*")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_PHONE_RE = re.compile(r"\+?\d[\d ()-]{7,}\d")
+
+def _section_of(line: str) -> Optional[str]:
+    m = _HEADING_RE.match(line)
+    if not m or len(line) > 48:
+        return None
+    return _HEADING.get(m.group(1).strip().lower())
+
+def _split_sections(lines: List[str]) -> Dict[str, List[str]]:
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in lines:
+        name = _section_of(line)
+        if name:
+            current = name
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+def _skills(lines: List[str]) -> List[str]:
+    seen: "OrderedDict[str, None]" = OrderedDict()
+    for line in lines:
+        # "Languages: Python, Go" → drop the label
+        body = line.split(":", 1)[1] if ":" in line and len(line.split(":", 1)[0]) < 30 else line
+        for item in _SKILL_SPLIT_RE.split(_BULLET_RE.sub("", body)):
+            item = item.strip(" .")
+            if 1 < len(item) <= 40 and item.lower() not in (s.lower() for s in seen):
+                seen[item] = None
+    return list(seen)[:MAX_SKILLS]
+
+def _roles(lines: List[str]) -> List[Dict[str, Any]]:
+    roles: List[Dict[str, Any]] = []
+    title = ""  # a plain line right before a date line is that role's title/company
+    for line in lines:
+        bullet = bool(_BULLET_RE.match(line))
+        text = _BULLET_RE.sub("", line).strip()
+        if not text:
+            continue
+        if _DATE_RANGE_RE.search(line) and not bullet:
+            role = re.sub(r"\s+", " ", text)
+            roles.append({"role": f"{title} | {role}" if title else role, "points": []})
+            title = ""
+        elif roles and (bullet or _METRIC_RE.search(text)):
+            roles[-1]["points"].append(text)
+            title = ""
+        else:
+            title = text if len(text) < 80 else ""
+    for r in roles:
+        # prefer quantified achievements, keep original order otherwise
+        ranked = sorted(r["points"], key=lambda p: not _METRIC_RE.search(p))
+        r["points"] = ranked[:MAX_POINTS_PER_ROLE]
+    return roles[:MAX_ROLES]
+
+def _headline(sections: Dict[str, List[str]]) -> str:
+    header = sections.get("header", [])
+    # the first header line is usually the candidate's name
+    for line in (header[1:6] if len(header) > 1 else header):
+        if _EMAIL_RE.search(line) or _PHONE_RE.search(line):
+            continue
+        if 3 <= len(line) <= 90 and len(line.split()) >= 2:
+            headline = line
+            break
+    else:
+        headline = ""
+    summary = " ".join(sections.get("summary", []))
+    if summary:
+        first = re.split(r"(?<=[.!?])\s", summary, maxsplit=1)[0]
+        headline = f"{headline} — {first}" if headline else first
+    return headline[:240]
+
+def _lines(cv_text: str) -> List[str]:
+    lines = (ln.strip() for ln in cv_text.replace("\r", "\n").split("\n"))
+    return [ln for ln in lines if ln]
+
+def split_sections(cv_text: str) -> Dict[str, str]:
+    """CV text grouped by recognised section heading ("header" = before the first one)."""
+    return {name: "\n".join(lines) for name, lines in _split_sections(_lines(cv_text)).items() if lines}
+
+def parse_cv(cv_text: str) -> Dict[str, Any]:
+    """Structured digest of a CV: headline, skills, experience (with top impact lines), education."""
+    sections = _split_sections(_lines(cv_text))
+    experience = _roles(sections.get("experience", []))
+    projects = _roles(sections.get("projects", []))
+    return {
+        "headline": _headline(sections),
+        "skills": _skills(sections.get("skills", [])),
+        "experience": experience,
+        "projects": projects,
+        "education": [re.sub(r"\s+", " ", ln) for ln in sections.get("education", [])[:3]],
+    }
+
+def is_useful(digest: Dict[str, Any]) -> bool:
+    """A digest only replaces the raw CV when it found skills and experience."""
+    return bool(digest["skills"]) and bool(digest["experience"] or digest["projects"])
+
+def render(digest: Dict[str, Any]) -> str:
+    out = []
+    if digest["headline"]:
+        out.append(f"HEADLINE: {digest['headline']}")
+    if digest["skills"]:
+        out.append("SKILLS: " + ", ".join(digest["skills"]))
+    for label, key in (("EXPERIENCE", "experience"), ("PROJECTS", "projects")):
+        if digest[key]:
+            out.append(f"{label}:")
+            for r in digest[key]:
+                out.append(f"- {r['role']}")
+                out.extend(f"  * {p}" for p in r["points"])
+    if digest["education"]:
+        out.append("EDUCATION: " + "; ".join(digest["education"]))
+    return "\n".join(out)
+
+# ---- Cache ----
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+cache_stats = {"hit": 0, "miss": 0}
+
+def cv_hash(cv_text: str) -> str:
+    return hashlib.sha256(cv_text.encode("utf-8")).hexdigest()
+
+def get_digest(cv_text: str) -> Dict[str, Any]:
+    """Digest for *cv_text*, parsed once per distinct CV (bounded LRU)."""
+    key = cv_hash(cv_text)
+    digest = _cache.get(key)
+    if digest is None:
+        cache_stats["miss"] += 1
+        digest = parse_cv(cv_text)
+        digest["text"] = render(digest)
+        digest["useful"] = is_useful(digest)
+        _cache[key] = digest
+        while len(_cache) > CV_DIGEST_CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        cache_stats["hit"] += 1
+        _cache.move_to_end(key)
+    return digest
+
+# ---- Job JSON ----
+# Fields the style rules actually use; everything else is dropped from the prompt
+JOB_PROMPT_FIELDS = (
+    "firm_name", "company", "position", "primary_position", "name", "title",
+    "industry", "skills", "experience", "requirements", "description",
+)
+
+def compact_job(job_obj: Dict[str, Any]) -> str:
+    """Minified JSON of the prompt-relevant, non-empty job fields."""
+    kept = {k: job_obj[k] for k in JOB_PROMPT_FIELDS if job_obj.get(k) not in (None, "", [], {})}
+    return json.dumps(kept or job_obj, ensure_ascii=False, separators=(",", ":"), default=str)
@@ -0,0 +1,373 @@
+# instrumentation.py
+# Shared latency metrics (stage histograms, in-flight gauges, cache counters), /metrics and per-request profiling
+#
+# One process-wide registry rendered in the Prometheus text format. Services call
+# instrument(app) once; code times its stages with `with stage("llm_call"):` and
+# marks concurrent work with `with in_flight("llm"):`. Numbers are per process:
+# behind several workers every worker reports its own series.
+#
+# Profiling: with PROFILE_REQUESTS=1 a request sent with "X-Profile: 1" starts a
+# sampler (every thread's stack each PROFILE_INTERVAL_S) that runs until it
+# finishes; the response carries "X-Profile-Id" and the collapsed stacks
+# (flamegraph.pl / speedscope input) are served at /debug/profiles/<id> once the
+# request has finished. The profile is process-wide: the request's coroutines
+# share the event loop thread, and its to_thread work the pool threads, with
+# every other request in flight, so their stacks are in it too. Profile a
+# request alone (or under a load you control) to read it as that request's.
+
+import os
+import sys
+import time
+import uuid
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ---- Env ----
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "0") == "1"     # honour X-Profile headers
+PROFILE_INTERVAL_S = float(os.getenv("PROFILE_INTERVAL_S", "0.002"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "32"))               # finished profiles kept in memory
+METRICS_PREFIX = "neomind_"
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# ---- Metric types ----
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+def _num(v: float) -> str:
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = METRICS_PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class _Valued(_Metric):
+    """One number per label set, kept here or read from a *collect* callback at scrape
+    time (a number, or a dict from label value(s) to number)."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], Any]] = None):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[Any, ...], float] = {}
+        self._collect = collect
+
+    def _samples(self) -> List[str]:
+        if self._collect is None:
+            with self._lock:
+                items = sorted(self._values.items())
+        else:
+            got = self._collect()
+            items = [((), got)] if not isinstance(got, dict) else \
+                [(k if isinstance(k, tuple) else (k,), v) for k, v in got.items()]
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items if v is not None]
+
+class Counter(_Valued):
+    """Monotonic counter; with *collect*, the callback reads totals some other object keeps."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Valued):
+    """Set/inc/dec gauge, or one read from a *collect* callback."""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    @contextmanager
+    def track(self, **labels: Any) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[Any, ...], List[float]] = {}   # per-bucket counts (+Inf last), then sum
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0] * (len(self.buckets) + 2)
+            s[i] += 1
+            s[-1] += value
+
+    @contextmanager
+    def timer(self, **labels: Any) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        names = self.labelnames + ("le",)
+        out = []
+        for key, s in items:
+            total = 0
+            for bound, n in zip(self.buckets + (float("inf"),), s[:-1]):
+                total += n
+                le = "+Inf" if bound == float("inf") else _num(bound)
+                out.append(f"{self.name}_bucket{_labels(names, key + (le,))} {total}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(s[-1])}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {total}")
+        return out
+
+class Registry:
+    def __init__(self):
+        self._metrics: "OrderedDict[str, _Metric]" = OrderedDict()
+
+    def add(self, metric: _Metric) -> _Metric:
+        """Register *metric*; a metric with the same name already registered is returned instead."""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.add(Histogram("stage_seconds", "Time spent per processing stage", ["stage"]))
+IN_FLIGHT = REGISTRY.add(Gauge("in_flight", "Units of work currently in progress", ["what"]))
+REQUEST_SECONDS = REGISTRY.add(Histogram("http_request_seconds", "HTTP request latency, to the last body byte", ["route"]))
+REQUESTS = REGISTRY.add(Counter("http_requests_total", "HTTP requests answered", ["route", "status"]))
+REQUESTS_IN_FLIGHT = REGISTRY.add(Gauge("http_requests_in_flight", "HTTP requests being served", ["route"]))
+_CACHES: Dict[str, Callable[[], Dict[str, int]]] = {}
+
+def stage(name: str):
+    """``with stage("llm_call"):`` records the block's duration in neomind_stage_seconds."""
+    return STAGE_SECONDS.timer(stage=name)
+
+def in_flight(what: str):
+    """``with in_flight("llm"):`` counts the block in neomind_in_flight while it runs."""
+    return IN_FLIGHT.track(what=what)
+
+def register_cache(name: str, counts: Callable[[], Dict[str, int]]) -> None:
+    """Expose a cache's counters; *counts* returns e.g. {"hit": .., "miss": .., "deduped": ..}."""
+    _CACHES[name] = counts
+
+def _cache_counts() -> Dict[Tuple[str, str], int]:
+    return {(cache, result): n for cache, fn in list(_CACHES.items()) for result, n in fn().items()}
+
+def _cache_hit_ratio() -> Dict[str, Optional[float]]:
+    out = {}
+    for cache, fn in list(_CACHES.items()):
+        c = fn()
+        lookups = sum(c.values())
+        out[cache] = (c.get("hit", 0) + c.get("deduped", 0)) / lookups if lookups else None
+    return out
+
+REGISTRY.add(Counter("cache_lookups_total", "Cache lookups by result", ["cache", "result"],
+                     collect=_cache_counts))
+REGISTRY.add(Gauge("cache_hit_ratio", "Share of cache lookups served without recomputing", ["cache"],
+                   collect=_cache_hit_ratio))
+_STARTED = time.time()
+REGISTRY.add(Gauge("process_uptime_seconds", "Seconds since this process imported the instrumentation",
+                   collect=lambda: time.time() - _STARTED))
+
+# ---- Sampling profiler ----
+class Sampler:
+    """Samples every thread's Python stack on a background thread; ``stop()`` returns
+    collapsed stacks ("thread;outer;...;inner count" per line, most frequent first).
+
+    A process-wide profile, not one request's: see the module header."""
+
+    def __init__(self, interval_s: float = PROFILE_INTERVAL_S):
+        self.interval_s = interval_s
+        self.samples = 0
+        self._counts: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> "Sampler":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                    frame = frame.f_back
+                key = ";".join([names.get(ident, str(ident))] + stack[::-1])
+                self._counts[key] = self._counts.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        return "".join(f"{k} {n}\n" for k, n in sorted(self._counts.items(), key=lambda kv: -kv[1]))
+
+_profiles: "OrderedDict[str, str]" = OrderedDict()
+
+def _keep_profile(profile_id: str, text: str) -> None:
+    _profiles[profile_id] = text
+    while len(_profiles) > PROFILE_KEEP:
+        _profiles.popitem(last=False)
+
+# ---- ASGI middleware ----
+class MetricsMiddleware:
+    """Per-route latency, status counts and in-flight requests; optional profiling while a request runs.
+
+    The timer stops at the last body chunk, so streamed (SSE) responses count in full.
+    """
+
+    def __init__(self, app, *, routes_of=None, profiling: bool = PROFILE_REQUESTS):
+        self.app = app
+        self.routes_of = routes_of     # the FastAPI app, to label requests by route template
+        self.profiling = profiling
+
+    def _route(self, scope) -> str:
+        from starlette.routing import Match
+        for route in getattr(self.routes_of, "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", scope["path"])
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route = self._route(scope)
+        sampler = profile_id = None
+        if self.profiling and (b"x-profile", b"1") in scope.get("headers", ()):
+            profile_id = uuid.uuid4().hex[:16]
+            sampler = Sampler().start()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if profile_id:
+                    message = {**message, "headers": [*message.get("headers", []),
+                                                      (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        t0 = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc(route=route)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(route=route)
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, route=route)
+            REQUESTS.inc(route=route, status=status[0])
+            if sampler is not None:
+                _keep_profile(profile_id, sampler.stop())
+
+def instrument(app) -> None:
+    """Add the metrics middleware, GET /metrics and (with PROFILE_REQUESTS=1) GET /debug/profiles/{id}."""
+    from fastapi import HTTPException
+    from fastapi.responses import PlainTextResponse
+
+    app.add_middleware(MetricsMiddleware, routes_of=app)
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    if PROFILE_REQUESTS:
+        @app.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse, include_in_schema=False)
+        def profile(profile_id: str):
+            text = _profiles.get(profile_id)
+            if text is None:
+                raise HTTPException(status_code=404, detail="Unknown or expired profile (or request still running)")
+            return PlainTextResponse(text)
+
+# ---- Reading /metrics ----
+def histogram_quantiles(text: str, name: str = "stage_seconds", qs: Sequence[float] = (0.5, 0.95, 0.99),
+                        label: str = "stage") -> Dict[str, Dict[str, float]]:
+    """Quantiles per *label* value of histogram *name* in a /metrics page, interpolated
+    linearly inside buckets (the usual histogram_quantile estimate); also "count"."""
+    import re
+    pattern = re.compile(rf'^{METRICS_PREFIX}{name}_bucket\{{{label}="((?:[^"\\]|\\.)*)",le="([^"]+)"\}} (\S+)$')
+    buckets: Dict[str, List[Tuple[float, float]]] = {}
+    for line in text.splitlines():
+        m = pattern.match(line)
+        if m:
+            buckets.setdefault(m.group(1), []).append((float(m.group(2)), float(m.group(3))))
+    out = {}
+    for key, bs in buckets.items():
+        bs.sort()
+        total = bs[-1][1]
+        row = {"count": total}
+        for q in qs:
+            rank, prev_bound, prev_n = q * total, 0.0, 0.0
+            value = float("nan")
+            for bound, n in bs:
+                if n >= rank and total:
+                    if bound == float("inf"):
+                        value = prev_bound     # beyond the last finite bucket: report its bound
+                    else:
+                        value = prev_bound + (bound - prev_bound) * (rank - prev_n) / max(n - prev_n, 1e-12)
+                    break
+                prev_bound, prev_n = bound, n
+            row[f"p{round(q * 100):g}"] = value
+        out[key] = row
+    return out
+
+if __name__ == "__main__":
+    # python instrumentation.py http://localhost:8000/metrics  -> per-stage p50/p95/p99
+    import urllib.request
+    with urllib.request.urlopen(sys.argv[1]) as resp:
+        page = resp.read().decode()
+    for metric, label in (("stage_seconds", "stage"), ("http_request_seconds", "route")):
+        rows = histogram_quantiles(page, metric, label=label)
+        print(f"{label:<34}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for key, row in sorted(rows.items(), key=lambda kv: -kv[1]["p99"] if kv[1]["count"] else 0):
+            print(f"{key:<34}{row['count']:8.0f}{row['p50'] * 1e3:10.1f}{row['p95'] * 1e3:10.1f}{row['p99'] * 1e3:10.1f}")
+        print()
@@ -0,0 +1,58 @@
+# letter_cache.py
+# Content-addressed cache for generated cover letters (memory LRU + optional disk tier)
+
+import os
+import json
+import hashlib
+from typing import Any, Dict, Optional
+
+from text_cache import TextCache
+
+# ---- Env ----
+LETTER_CACHE_SIZE = int(os.getenv("LETTER_CACHE_SIZE", "1024"))            # memory entries
+LETTER_CACHE_TTL_S = float(os.getenv("LETTER_CACHE_TTL_S", str(7 * 24 * 3600)))
+LETTER_CACHE_DIR = os.getenv("LETTER_CACHE_DIR")                            # unset = no disk tier
+LETTER_CACHE_DISK_MAX = int(os.getenv("LETTER_CACHE_DISK_MAX", "20000"))    # disk entries
+
+# ---- Keys ----
+def _normalize_text(text: str) -> str:
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+def cache_key(
+    cv_text: str,
+    job_obj: Dict[str, Any],
+    candidate_overrides: Dict[str, Any],
+    model: str,
+    max_output_tokens: int,
+    variant: str = "",
+) -> str:
+    """SHA-256 over the normalized prompt inputs plus model settings.
+
+    *variant* separates entries whose prompt is built differently from the
+    same inputs.
+    """
+    payload = {
+        "cv": _normalize_text(cv_text),
+        "job": job_obj,
+        "overrides": {k: v for k, v in sorted(candidate_overrides.items()) if v},
+        "model": model,
+        "max_output_tokens": max_output_tokens,
+        "variant": variant,
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+# ---- Cache ----
+class LetterCache(TextCache):
+    """Two-tier letter cache with single-flight deduplication (see TextCache),
+    sized by the LETTER_CACHE_* settings."""
+
+    def __init__(
+        self,
+        max_entries: int = LETTER_CACHE_SIZE,
+        ttl_s: float = LETTER_CACHE_TTL_S,
+        disk_dir: Optional[str] = LETTER_CACHE_DIR,
+        disk_max_entries: int = LETTER_CACHE_DISK_MAX,
+    ):
+        super().__init__(max_entries, ttl_s, disk_dir, disk_max_entries)
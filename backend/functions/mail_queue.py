@@ -0,0 +1,285 @@
+# mail_queue.py
+# Background email delivery: async queue, pooled SMTP session, batching, retries, metrics
+
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import smtplib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+from instrumentation import stage
+
+# ---- Env ----
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
+SMTP_TIMEOUT_S = float(os.getenv("SMTP_TIMEOUT_S", "30"))
+SMTP_IDLE_S = float(os.getenv("SMTP_IDLE_S", "60"))          # close the session after this long idle
+MAIL_BATCH = int(os.getenv("MAIL_BATCH", "20"))               # messages per session round-trip
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "5"))
+MAIL_RETRY_BASE_S = float(os.getenv("MAIL_RETRY_BASE_S", "2"))
+MAIL_SPOOL_DIR = os.getenv("MAIL_SPOOL_DIR")                  # unset = in-memory only
+
+class MailQueue:
+    """Out-of-band delivery for outgoing mail.
+
+    ``enqueue`` returns immediately; a single worker task drains the queue in
+    batches over one reused SMTP session (reconnecting when the server drops
+    it), retries transient failures (4xx replies, connection and I/O errors)
+    with exponential backoff and, when a spool directory is configured, keeps
+    every pending message on disk until it is delivered so a restart resumes
+    where it left off.  A message the server refuses with a 5xx reply, or one
+    smtplib cannot send at all (e.g. a non-ASCII address), fails on its own:
+    no retry, and the session stays up for the rest of the batch.
+    """
+
+    def __init__(
+        self,
+        user: Optional[str],
+        password: Optional[str],
+        *,
+        host: str = SMTP_HOST,
+        port: int = SMTP_PORT,
+        starttls: bool = SMTP_STARTTLS,
+        spool_dir: Optional[str] = MAIL_SPOOL_DIR,
+        batch_size: int = MAIL_BATCH,
+        max_attempts: int = MAIL_MAX_ATTEMPTS,
+        retry_base_s: float = MAIL_RETRY_BASE_S,
+        idle_s: float = SMTP_IDLE_S,
+    ):
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+        self.starttls = starttls
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_s = retry_base_s
+        self.idle_s = idle_s
+        self._queue: asyncio.Queue = asyncio.Queue()   # mail enqueued before start() waits here
+        self._worker: Optional[asyncio.Task] = None
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._retrying: Dict[str, Tuple[asyncio.TimerHandle, Dict[str, Any]]] = {}   # id -> backoff timer, msg
+        self.stats: Dict[str, Any] = {
+            "enqueued": 0, "sent": 0, "failed": 0, "retries": 0,
+            "connections": 0, "batches": 0, "last_error": None,
+        }
+
+    # ---- lifecycle ----
+    async def start(self) -> None:
+        # a fresh queue for this event loop, carrying over mail enqueued before start()
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._queue = asyncio.Queue()
+        queued = {msg["id"] for msg in pending}
+        if self.spool_dir:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            for path in sorted(self.spool_dir.glob("*.json")):
+                try:
+                    msg = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+                if msg["id"] not in queued:
+                    pending.append(msg)
+        for msg in pending:
+            self._queue.put_nowait(msg)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Give queued mail *timeout* seconds to go out, then stop the worker.
+
+        Messages waiting out a retry backoff get one last attempt now; whatever
+        is still undelivered afterwards stays in the spool, or is logged as
+        dropped when there is none.
+        """
+        for handle, msg in list(self._retrying.values()):
+            handle.cancel()
+            self._requeue(msg)
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        for handle, _ in self._retrying.values():
+            handle.cancel()
+        undelivered = [msg for _, msg in self._retrying.values()]
+        while not self._queue.empty():
+            undelivered.append(self._queue.get_nowait())
+        self._retrying.clear()
+        for msg in undelivered:
+            where = "kept in the spool" if self.spool_dir else "dropped"
+            print(f"❌ Email to {msg['to']} not delivered before shutdown, {where}", flush=True)
+        await asyncio.to_thread(self._close)
+
+    # ---- producer side ----
+    def enqueue(self, to_email: str, subject: str, body: str) -> str:
+        msg = {"id": uuid.uuid4().hex, "to": to_email, "subject": subject,
+               "body": body, "attempts": 0, "queued_at": time.time()}
+        if self.spool_dir:
+            self._spool(msg)
+        self._queue.put_nowait(msg)
+        self.stats["enqueued"] += 1
+        return msg["id"]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "queue_depth": self._queue.qsize(), "retry_pending": len(self._retrying),
+                "connected": self._smtp is not None}
+
+    # ---- spool ----
+    def _spool(self, msg: Dict[str, Any]) -> None:
+        path = self.spool_dir / f"{msg['id']}.json"
+        tmp = path.with_name(f"{path.name}.tmp")
+        tmp.write_text(json.dumps(msg, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _unspool(self, msg: Dict[str, Any]) -> None:
+        if self.spool_dir:
+            (self.spool_dir / f"{msg['id']}.json").unlink(missing_ok=True)
+
+    # ---- SMTP session (runs in a worker thread) ----
+    def _connect(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT_S)
+            if self.starttls:
+                smtp.starttls()
+            if self.user and self.password:
+                smtp.login(self.user, self.password)
+            self._smtp = smtp
+            self.stats["connections"] += 1
+        return self._smtp
+
+    def _close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def _reset(self) -> None:
+        """Abort a half-sent transaction so the session can carry the next message."""
+        if self._smtp is not None:
+            try:
+                self._smtp.rset()
+            except Exception:
+                self._close()
+
+    def _build(self, msg: Dict[str, Any]) -> str:
+        mime = MIMEMultipart()
+        mime["From"] = f"NeoMind <{self.user}>"
+        mime["To"] = msg["to"]
+        mime["Subject"] = msg["subject"]
+        mime.attach(MIMEText(msg["body"], "plain"))
+        return mime.as_string()
+
+    def _deliver_batch(self, batch: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Optional[str], bool]]:
+        """Send *batch* over the pooled session; returns (msg, error-or-None, permanent) per message."""
+        results = []
+        down = None   # the server is unreachable: the rest of the batch waits for a retry
+        for msg in batch:
+            error, permanent = down, False
+            for reconnect in (False, True):
+                if down is not None:
+                    break
+                try:
+                    smtp = self._connect()
+                except (smtplib.SMTPException, OSError) as e:
+                    self._close()
+                    error = down = _describe(e)
+                    break
+                try:
+                    with stage("smtp"):
+                        smtp.sendmail(self.user or "", msg["to"], self._build(msg))
+                    error = None
+                    break
+                except smtplib.SMTPServerDisconnected as e:
+                    self._smtp = None  # stale pooled session: reconnect once
+                    error = _describe(e)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                    error, permanent = _describe(e), _is_permanent(e)
+                    if not permanent:
+                        self._close()
+                    break
+                except (smtplib.SMTPException, OSError) as e:
+                    self._close()
+                    error = _describe(e)
+                    break
+                except Exception as e:   # unsendable message, e.g. UnicodeEncodeError for a non-ASCII address
+                    self._reset()
+                    error, permanent = _describe(e), True
+                    break
+            results.append((msg, error, permanent))
+        return results
+
+    # ---- worker ----
+    def _requeue(self, msg: Dict[str, Any]) -> None:
+        self._retrying.pop(msg["id"], None)
+        self._queue.put_nowait(msg)
+
+    def _settle(self, msg: Dict[str, Any], error: Optional[str], permanent: bool) -> None:
+        if error is None:
+            self.stats["sent"] += 1
+            self._unspool(msg)
+            print(f"✅ Email sent to {msg['to']}", flush=True)
+            return
+        self.stats["last_error"] = error
+        msg["attempts"] += 1
+        if not permanent and msg["attempts"] < self.max_attempts:
+            self.stats["retries"] += 1
+            delay = self.retry_base_s * 2 ** (msg["attempts"] - 1) * (1 + random.random())
+            self._retrying[msg["id"]] = (asyncio.get_running_loop().call_later(delay, self._requeue, msg), msg)
+        else:
+            self.stats["failed"] += 1
+            self._unspool(msg)
+            print(f"❌ Failed to send email to {msg['to']}: {error}", flush=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=self.idle_s)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self._close)
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            # nothing may escape this loop: the worker is the only consumer
+            try:
+                results = await asyncio.to_thread(self._deliver_batch, batch)
+            except Exception as e:
+                await asyncio.to_thread(self._close)
+                results = [(msg, _describe(e), False) for msg in batch]
+            self.stats["batches"] += 1
+            for msg, error, permanent in results:
+                try:
+                    self._settle(msg, error, permanent)
+                except Exception as e:
+                    self.stats["last_error"] = _describe(e)
+                    print(f"❌ Mail worker error for {msg.get('to')}: {_describe(e)}", flush=True)
+                finally:
+                    self._queue.task_done()
+
+
+def _describe(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def _is_permanent(e: Exception) -> bool:
+    """5xx replies are permanent; 4xx (and anything else) may succeed on a retry."""
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in e.recipients.values())
+    return getattr(e, "smtp_code", 0) >= 500
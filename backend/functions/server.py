@@ -1,36 +1,91 @@
 # server.py
-# pip install fastapi uvicorn "pydantic>=2" python-dotenv openai
+# pip install fastapi uvicorn "pydantic>=2" python-dotenv openai httpx
 
 import os
 import json
-from typing import Optional, Dict, Any, Union
+import time
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Dict, Any, AsyncIterator, List, Union
 
+import httpx
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, ValidationError
-from openai import OpenAI
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+
+from cv_digest import cache_stats as digest_cache_stats, compact_job, get_digest
+from instrumentation import REGISTRY, STAGE_SECONDS, Gauge, in_flight, instrument, register_cache, stage
+from letter_cache import LetterCache, cache_key
+from mail_queue import MailQueue
 
 # ---- Env ----
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # e.g. a local fake LLM for tests
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_QUEUE_TIMEOUT_S = float(os.getenv("LLM_QUEUE_TIMEOUT_S", "10"))
+PROMPT_COMPACT = os.getenv("PROMPT_COMPACT", "1") == "1"  # CV digest + filtered job JSON
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "25"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))   # per batch request
+WARM_UP = os.getenv("WARM_UP", "1") == "1"   # build the OpenAI client at startup, not on the first request
+
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
 
-if not OPENAI_API_KEY:
-    raise RuntimeError("OPENAI_API_KEY is not set in environment (.env).")
-if not EMAIL_USER or not EMAIL_PASS:
-    raise RuntimeError("EMAIL_USER or EMAIL_PASS is not set in environment (.env).")
-
-client = OpenAI(api_key=OPENAI_API_KEY)
+def check_env() -> None:
+    """Fail fast on missing settings; runs at startup rather than at import, so tools and
+    tests can import this module without credentials."""
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY is not set in environment (.env).")
+    if not EMAIL_USER or not EMAIL_PASS:
+        raise RuntimeError("EMAIL_USER or EMAIL_PASS is not set in environment (.env).")
+
+# The openai package takes longer to import than the rest of this service; it is
+# loaded with the client, which the lifespan builds (WARM_UP) or the first letter does.
+client = None
+
+def get_client():
+    """The shared AsyncOpenAI client over one pooled HTTP/1.1 keep-alive connection pool."""
+    global client
+    if client is None:
+        check_env()
+        from openai import AsyncOpenAI
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT_S, connect=5.0),
+            limits=httpx.Limits(max_connections=LLM_MAX_CONCURRENCY, max_keepalive_connections=LLM_MAX_CONCURRENCY),
+        )
+        client = AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, http_client=http_client, max_retries=2)
+    return client
+
+llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+letter_cache = LetterCache()
+mail_queue = MailQueue(EMAIL_USER, EMAIL_PASS)
+
+class LLMBusyError(RuntimeError):
+    pass
+
+class LLMTimeoutError(RuntimeError):
+    pass
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_env()
+    if WARM_UP:
+        await asyncio.to_thread(get_client)
+    await mail_queue.start()
+    yield
+    await mail_queue.stop()
+    if client is not None:
+        await client.close()
 
 # ---- FastAPI app ----
-app = FastAPI(title="Cover Letter Generator")
+app = FastAPI(title="Cover Letter Generator", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,6 +94,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+instrument(app)   # GET /metrics; process-wide profiles of X-Profile requests with PROFILE_REQUESTS=1
+register_cache("letters", lambda: {"hit": letter_cache.hits, "miss": letter_cache.misses, "deduped": letter_cache.deduped})
+register_cache("cv_digest", lambda: dict(digest_cache_stats))
+REGISTRY.add(Gauge("mail_queue", "Mail queue counters and depth", ["field"], collect=lambda: {
+    k: v for k, v in mail_queue.metrics().items() if isinstance(v, (int, float))}))
 
 # ---- Schemas ----
 class CandidateOverrides(BaseModel):
@@ -60,6 +120,15 @@ class GenerateRequest(BaseModel):
 class GenerateResponse(BaseModel):
     letter: str
 
+class BatchGenerateRequest(BaseModel):
+    cv_text: str = Field(..., description="Full CV/resume text, shared by every job")
+    jobs: List[Union[str, Dict[str, Any]]] = Field(
+        ..., description="Job JSONs (objects or stringified JSON)"
+    )
+    candidate_overrides: Optional[CandidateOverrides] = None
+    model: Optional[str] = None
+    max_output_tokens: int = 700
+
 # ---- Style rules ----
 STYLE_RULES = """\
 Write a concise, one-page cover letter (180–260 words) that:
@@ -72,16 +141,26 @@ Write a concise, one-page cover letter (180–260 words) that:
 """
 
 # ---- Prompt builder ----
-def build_prompt(cv_text: str, job_obj: Dict[str, Any], candidate_overrides: Dict[str, Any]) -> str:
-    name     = candidate_overrides.get("name", "")
-    email    = candidate_overrides.get("email", "")
-    phone    = candidate_overrides.get("phone", "")
-    headline = candidate_overrides.get("headline", "")
+# The CV-derived part comes first so every job for the same CV shares one
+# byte-identical prefix, which the provider's prompt caching can reuse.
+def build_prompt_prefix(cv_text: str, candidate_overrides: Dict[str, Any], *, compact: bool = PROMPT_COMPACT) -> str:
+    name     = candidate_overrides.get("name") or ""
+    email    = candidate_overrides.get("email") or ""
+    phone    = candidate_overrides.get("phone") or ""
+    headline = candidate_overrides.get("headline") or ""
+
+    # A parsed digest replaces the verbatim CV when it found skills and experience
+    digest = get_digest(cv_text) if compact else None
+    if digest and digest["useful"]:
+        cv_label, cv_block = "A structured digest of the candidate's CV", f"=== CV DIGEST ===\n{digest['text']}"
+        headline = headline or digest["headline"]
+    else:
+        cv_label, cv_block = "A raw CV text", f"=== CV TEXT (VERBATIM) ===\n{cv_text}"
 
     return f"""You are an expert career writer and ATS-savvy editor.
 You will receive two blocks:
-(1) A JSON object describing the job.
-(2) A raw CV text.
+(1) {cv_label}.
+(2) A JSON object describing the job.
 
 Task:
 - Parse both.
@@ -91,11 +170,7 @@ Task:
 === STYLE RULES ===
 {STYLE_RULES}
 
-=== JOB.JSON ===
-{json.dumps(job_obj, ensure_ascii=False, indent=2)}
-
-=== CV TEXT (VERBATIM) ===
-{cv_text}
+{cv_block}
 
 === CANDIDATE META (OPTIONAL) ===
 name: {name}
@@ -104,8 +179,47 @@ phone: {phone}
 headline: {headline}
 """
 
+def build_prompt_job(job_obj: Dict[str, Any], *, compact: bool = PROMPT_COMPACT) -> str:
+    job_text = compact_job(job_obj) if compact else json.dumps(job_obj, ensure_ascii=False, indent=2)
+    return f"""
+=== JOB.JSON ===
+{job_text}
+"""
+
+def build_prompt(cv_text: str, job_obj: Dict[str, Any], candidate_overrides: Dict[str, Any], *, compact: bool = PROMPT_COMPACT) -> str:
+    return build_prompt_prefix(cv_text, candidate_overrides, compact=compact) + build_prompt_job(job_obj, compact=compact)
+
+def _prefix_cache_key(prefix: str) -> str:
+    return hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:32]
+
 # ---- Core generator ----
-def generate_cover_letter_from_inputs(
+def _normalize_job(job_json: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    job = json.loads(job_json) if isinstance(job_json, str) else job_json
+    if isinstance(job, dict):
+        return job
+    raise ValueError("job_json must be a JSON object (or a string holding one).")
+
+def _llm_input(prompt: str):
+    return [
+        {"role": "system", "content": "You are an expert career writer and ATS-savvy editor."},
+        {"role": "user", "content": prompt},
+    ]
+
+@asynccontextmanager
+async def _llm_slot():
+    # Bound concurrent LLM calls; wait briefly for a slot rather than queue forever
+    try:
+        with stage("llm_queue"):
+            await asyncio.wait_for(llm_slots.acquire(), timeout=LLM_QUEUE_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        raise LLMBusyError("Too many cover letters in progress, try again shortly.")
+    try:
+        with in_flight("llm"):
+            yield
+    finally:
+        llm_slots.release()
+
+async def generate_cover_letter_from_inputs(
     cv_text: str,
     job_json: Union[str, Dict[str, Any]],
     *,
@@ -113,25 +227,39 @@ def generate_cover_letter_from_inputs(
     candidate_overrides: Optional[Dict[str, Any]] = None,
     max_output_tokens: int = 700,
 ) -> str:
-    # Normalize job JSON
-    if isinstance(job_json, str):
-        job_obj = json.loads(job_json)
-    elif isinstance(job_json, dict):
-        job_obj = job_json
-    else:
-        raise ValueError("job_json must be a JSON string or a dict.")
-
+    job_obj = _normalize_job(job_json)
     model = model or DEFAULT_MODEL
-    prompt = build_prompt(cv_text, job_obj, candidate_overrides or {})
-
-    resp = client.responses.create(
-        model=model,
-        max_output_tokens=max_output_tokens,
-        input=[
-            {"role": "system", "content": "You are an expert career writer and ATS-savvy editor."},
-            {"role": "user", "content": prompt},
-        ],
-    )
+    overrides = candidate_overrides or {}
+    key = cache_key(cv_text, job_obj, overrides, model, max_output_tokens, "compact" if PROMPT_COMPACT else "")
+
+    async def generate() -> str:
+        # only built on a miss: a cached letter skips the CV digest and prompt
+        with stage("prompt_build"):
+            prefix = build_prompt_prefix(cv_text, overrides)
+            job_part = build_prompt_job(job_obj)
+        return await _complete(prefix, job_part, model, max_output_tokens)
+
+    # Same inputs → cached letter; identical concurrent requests share one LLM call
+    return await letter_cache.get_or_create(key, generate)
+
+@contextmanager
+def _model_timeouts():
+    # openai is imported lazily (see get_client), so its timeout is converted here
+    from openai import APITimeoutError
+    try:
+        yield
+    except APITimeoutError as e:
+        raise LLMTimeoutError("Model request timed out.") from e
+
+async def _complete(prefix: str, job_part: str, model: str, max_output_tokens: int) -> str:
+    async with _llm_slot():
+        with stage("llm_call"), _model_timeouts():
+            resp = await get_client().responses.create(
+                model=model,
+                max_output_tokens=max_output_tokens,
+                input=_llm_input(prefix + job_part),
+                extra_body={"prompt_cache_key": _prefix_cache_key(prefix)},
+            )
 
     letter = getattr(resp, "output_text", None)
     if not letter:
@@ -139,32 +267,90 @@ def generate_cover_letter_from_inputs(
 
     return letter.strip()
 
-# ---- Mail sender ----
-def send_email(to_email: str, subject: str, body: str):
-    msg = MIMEMultipart()
-    msg["From"] = f"NeoMind <{EMAIL_USER}>"
-    msg["To"] = to_email
-    msg["Subject"] = subject
-    msg.attach(MIMEText(body, "plain"))
-
+async def stream_cover_letter_from_inputs(
+    cv_text: str,
+    job_json: Union[str, Dict[str, Any]],
+    *,
+    model: Optional[str] = None,
+    candidate_overrides: Optional[Dict[str, Any]] = None,
+    max_output_tokens: int = 700,
+) -> AsyncIterator[str]:
+    """Yield the letter as text deltas while the model writes it.
+
+    A cached letter is yielded in one piece; a freshly streamed one is
+    cached once complete (the final letter is the stripped concatenation),
+    and identical concurrent streams share one LLM call.
+    """
+    job_obj = _normalize_job(job_json)
+    model = model or DEFAULT_MODEL
+    overrides = candidate_overrides or {}
+    key = cache_key(cv_text, job_obj, overrides, model, max_output_tokens, "compact" if PROMPT_COMPACT else "")
+
+    async def generate() -> AsyncIterator[str]:
+        with stage("prompt_build"):
+            prefix = build_prompt_prefix(cv_text, overrides)
+            job_part = build_prompt_job(job_obj)
+        async with _llm_slot():
+            async for delta in _stream_deltas(prefix, job_part, model, max_output_tokens):
+                yield delta
+
+    async for delta in letter_cache.stream_or_create(key, generate):
+        yield delta
+
+async def _stream_deltas(prefix: str, job_part: str, model: str, max_output_tokens: int) -> AsyncIterator[str]:
+    """Text deltas of one streamed model call; llm_call counts only the time spent awaiting the model."""
+    waited = 0.0
+
+    async def timed(awaitable):
+        nonlocal waited
+        t0 = time.perf_counter()
+        try:
+            with _model_timeouts():
+                return await awaitable
+        finally:
+            waited += time.perf_counter() - t0
+
+    got_text = False
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.sendmail(EMAIL_USER, to_email, msg.as_string())
-        print(f"✅ Email sent to {to_email}", flush=True)
-    except Exception as e:
-        print(f"❌ Failed to send email: {e}", flush=True)
+        stream = await timed(get_client().responses.create(
+            model=model,
+            max_output_tokens=max_output_tokens,
+            input=_llm_input(prefix + job_part),
+            extra_body={"prompt_cache_key": _prefix_cache_key(prefix)},
+            stream=True,
+        ))
+        events = stream.__aiter__()
+        while True:
+            try:
+                event = await timed(events.__anext__())
+            except StopAsyncIteration:
+                break
+            if event.type == "response.output_text.delta" and event.delta:
+                got_text = got_text or bool(event.delta.strip())
+                yield event.delta
+    finally:
+        STAGE_SECONDS.observe(waited, stage="llm_call")
+    if not got_text:
+        raise RuntimeError("No text output returned from model.")
+
+# ---- Mail sender ----
+def send_email(to_email: str, subject: str, body: str) -> str:
+    """Queue *body* for background delivery and return its message id."""
+    return mail_queue.enqueue(to_email, subject, body)
 
 # ---- Routes ----
 @app.get("/health")
 def health():
     return {"ok": True}
 
+@app.get("/mail-status")
+def mail_status():
+    return mail_queue.metrics()
+
 @app.post("/generate-cover-letter", response_model=GenerateResponse)
-def generate_cover_letter(req: GenerateRequest):
+async def generate_cover_letter(req: GenerateRequest):
     try:
-        letter = generate_cover_letter_from_inputs(
+        letter = await generate_cover_letter_from_inputs(
             cv_text=req.cv_text,
             job_json=req.job_json,
             model=req.model,
@@ -172,7 +358,7 @@ def generate_cover_letter(req: GenerateRequest):
             max_output_tokens=req.max_output_tokens,
         )
 
-        # Send mail if requested
+        # Send mail if requested (delivered in the background, never blocks the response)
         if req.recipient_email:
             send_email(req.recipient_email, "Job Application", letter)
 
@@ -180,9 +366,107 @@ def generate_cover_letter(req: GenerateRequest):
 
     except (ValidationError, ValueError) as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except LLMBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMTimeoutError:
+        raise HTTPException(status_code=504, detail="Model request timed out.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Server error: {e}")
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/generate-cover-letter/stream")
+async def generate_cover_letter_stream(req: GenerateRequest):
+    """Server-sent events: `delta` per text chunk, then `done` with the full letter (or `error`)."""
+    try:
+        job_obj = _normalize_job(req.job_json)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        parts = []
+        try:
+            async for delta in stream_cover_letter_from_inputs(
+                cv_text=req.cv_text,
+                job_json=job_obj,
+                model=req.model,
+                candidate_overrides=(req.candidate_overrides.model_dump() if req.candidate_overrides else None),
+                max_output_tokens=req.max_output_tokens,
+            ):
+                parts.append(delta)
+                yield _sse("delta", {"text": delta})
+        except LLMBusyError as e:
+            yield _sse("error", {"status": 503, "detail": str(e)})
+            return
+        except LLMTimeoutError:
+            yield _sse("error", {"status": 504, "detail": "Model request timed out."})
+            return
+        except Exception as e:
+            yield _sse("error", {"status": 500, "detail": f"Server error: {e}"})
+            return
+
+        letter = "".join(parts).strip()
+        if req.recipient_email:
+            send_email(req.recipient_email, "Job Application", letter)
+        yield _sse("done", {"letter": letter})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/generate-cover-letters/batch")
+async def generate_cover_letters_batch(req: BatchGenerateRequest):
+    """Server-sent events: one `result` (or `error`) per job as it finishes, then `done`.
+
+    Every job shares the CV prompt prefix; at most BATCH_CONCURRENCY of this
+    request's jobs hold an LLM slot at a time.
+    """
+    if not req.jobs:
+        raise HTTPException(status_code=400, detail="jobs must not be empty.")
+    if len(req.jobs) > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_JOBS} jobs per batch.")
+    overrides = req.candidate_overrides.model_dump() if req.candidate_overrides else None
+    gate = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def one(index: int, job_json):
+        async with gate:
+            try:
+                letter = await generate_cover_letter_from_inputs(
+                    cv_text=req.cv_text,
+                    job_json=job_json,
+                    model=req.model,
+                    candidate_overrides=overrides,
+                    max_output_tokens=req.max_output_tokens,
+                )
+                return _sse("result", {"index": index, "letter": letter})
+            except (ValidationError, ValueError) as e:
+                return _sse("error", {"index": index, "status": 400, "detail": str(e)})
+            except LLMBusyError as e:
+                return _sse("error", {"index": index, "status": 503, "detail": str(e)})
+            except LLMTimeoutError:
+                return _sse("error", {"index": index, "status": 504, "detail": "Model request timed out."})
+            except Exception as e:
+                return _sse("error", {"index": index, "status": 500, "detail": f"Server error: {e}"})
+
+    async def events():
+        tasks = [asyncio.create_task(one(i, job)) for i, job in enumerate(req.jobs)]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+            yield _sse("done", {"count": len(tasks)})
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,11 +1,49 @@
 # run python -m uvicorn backendAPI:app --reload --port 8000 at cd backend/funcitons/src
 
 import os
-from fastapi import FastAPI, UploadFile, File
+import sys
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-import fitz  # PyMuPDF
+from fastapi.responses import JSONResponse
 
-app = FastAPI()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # shared modules in backend/functions
+from pdf_extract import (
+    CV_MAX_BYTES, PDF_WORKERS, PDFError, PDFLimitError, check_size, content_key, make_pool, parse_pdf_async,
+)
+from text_cache import TextCache
+from instrumentation import in_flight, instrument, register_cache, stage
+from job_search import SEARCH_MAX_LIMIT, open_index
+
+# ---- Env ----
+CV_CACHE_SIZE = int(os.getenv("CV_CACHE_SIZE", "256"))                      # parsed CVs kept in memory
+CV_CACHE_TTL_S = float(os.getenv("CV_CACHE_TTL_S", str(30 * 24 * 3600)))
+CV_CACHE_DIR = os.getenv("CV_CACHE_DIR")                                    # unset = no disk tier
+PARSE_MAX_INFLIGHT = int(os.getenv("PARSE_MAX_INFLIGHT", str(4 * PDF_WORKERS)))  # uploads held in memory at once
+PARSE_QUEUE_TIMEOUT_S = float(os.getenv("PARSE_QUEUE_TIMEOUT_S", "10"))
+MULTIPART_OVERHEAD = 64 * 1024   # boundaries and part headers around the uploaded file
+
+pdf_pool = None
+search_index = None
+parse_slots = asyncio.Semaphore(PARSE_MAX_INFLIGHT)
+# Two-tier, single-flight cache keyed by file content; entries are the JSON-encoded parse result
+parse_cache = TextCache(max_entries=CV_CACHE_SIZE, ttl_s=CV_CACHE_TTL_S, disk_dir=CV_CACHE_DIR)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global pdf_pool, search_index
+    pdf_pool = make_pool()
+    # memory-mapped when the saved index matches the sources, built (and saved) otherwise
+    search_index = await asyncio.to_thread(open_index)
+    try:
+        yield
+    finally:
+        pdf_pool.shutdown(cancel_futures=True)
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,19 +52,75 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+instrument(app)   # GET /metrics; process-wide profiles of X-Profile requests with PROFILE_REQUESTS=1
+
+class UploadLimit:
+    """413 for a /parse-cv body whose Content-Length is over the limit, before
+    Starlette reads (and spools) any of it."""
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/parse-cv":
+            length = dict(scope["headers"]).get(b"content-length", b"")
+            if length.isdigit() and int(length) > self.max_bytes:
+                response = JSONResponse({"detail": f"PDF is larger than {CV_MAX_BYTES} bytes"}, status_code=413)
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+app.add_middleware(UploadLimit, max_bytes=CV_MAX_BYTES + MULTIPART_OVERHEAD)
+register_cache("cv_parse", lambda: {"hit": parse_cache.hits, "miss": parse_cache.misses, "deduped": parse_cache.deduped})
+
+async def _parse(contents: bytes) -> str:
+    with stage("pdf_extract"):
+        result = await parse_pdf_async(contents, pdf_pool)
+    return json.dumps(result, ensure_ascii=False)
 
 @app.post("/parse-cv")
 async def parse_cv(file: UploadFile = File(...)):
-    contents = await file.read()
-
-    # ✅ Use a cross-platform temporary path
-    temp_path = os.path.join(os.getcwd(), "temp.pdf")
+    """Raw text plus per-page text, sections, skills and CV digest; cached by file content."""
+    try:
+        with stage("parse_queue"):
+            await asyncio.wait_for(parse_slots.acquire(), PARSE_QUEUE_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Parser is busy, please retry")
+    try:
+        # the body is already spooled by now (UploadLimit rejected oversized
+        # Content-Lengths before that); this catches chunked uploads before
+        # the file is read into memory
+        if file.size is not None and file.size > CV_MAX_BYTES:
+            raise PDFLimitError(f"PDF is larger than {CV_MAX_BYTES} bytes")
+        contents = await file.read()
+        check_size(contents)
+        key = await asyncio.to_thread(content_key, contents)
+        with in_flight("cv_parse"):
+            result = await parse_cache.get_or_create(key, lambda: _parse(contents))
+    except PDFLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except PDFError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        parse_slots.release()
 
-    with open(temp_path, "wb") as f:
-        f.write(contents)
+    return Response(content=result, media_type="application/json")
 
-    doc = fitz.open(temp_path)
-    text = "".join([page.get_text() for page in doc])
-    doc.close()
 
-    return {"text": text}
+@app.get("/search-jobs")
+async def search_jobs(
+    q: str = "",
+    title: str = "",
+    type: Optional[str] = None,
+    region: Optional[str] = None,
+    field: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=SEARCH_MAX_LIMIT),
+):
+    """Postings matching every word of q (the last one as a prefix), title words and facets; newest first.
+    Pass next_cursor back as cursor for the following page."""
+    try:
+        with stage("job_search"):
+            return search_index.search(q, title=title, cursor=cursor, limit=limit, type=type, region=region, field=field)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
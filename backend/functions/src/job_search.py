@@ -0,0 +1,369 @@
+# job_search.py
+# Inverted full-text index over scraped postings and the prediction catalog (facets, prefixes, cursors)
+#
+# Title, company, location and summary words, title-only words ("t:" + word) and
+# facet values ("type:", "region:", "field:") are all terms of one vocabulary,
+# sorted bytewise so every prefix is a contiguous range of term ids. Postings are
+# flat int32 doc-id lists; doc ids are assigned newest posting first, so the
+# first `limit` ids matching every clause are the page, and the last id returned
+# is the cursor for the next one. Queries intersect a window of the shortest
+# clause with the others (binary search per window), never the full result set.
+# Arrays are saved as .npy files and memory-mapped on load.
+
+import os
+import re
+import json
+import time
+import uuid
+import base64
+import shutil
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+# ---- Env ----
+_ROOT = Path(__file__).resolve().parents[3]
+# jobs_etl.py output when it has run, the raw scrape otherwise, plus the prediction catalog
+_SCRAPED = _ROOT / "scraped_jobs.arrow" if (_ROOT / "scraped_jobs.arrow").exists() else _ROOT / "indeed_jobs.csv"
+_DEFAULT_SOURCES = [p for p in (_SCRAPED, _ROOT / "prediction.xlsx") if p.exists()]
+SEARCH_SOURCES = [s for s in os.getenv("SEARCH_SOURCES", ",".join(map(str, _DEFAULT_SOURCES))).split(",") if s]
+SEARCH_INDEX_DIR = os.getenv("SEARCH_INDEX_DIR", str(_ROOT / ".search_index"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "100"))
+SEARCH_PREFIX_MIN = int(os.getenv("SEARCH_PREFIX_MIN", "2"))          # shorter last words match exactly
+SEARCH_PREFIX_EXPANSIONS = int(os.getenv("SEARCH_PREFIX_EXPANSIONS", "32"))  # most frequent completions used
+SEARCH_SUMMARY_CHARS = int(os.getenv("SEARCH_SUMMARY_CHARS", "4000"))  # summary text indexed per posting
+FACETS = ("type", "region", "field")
+_SEPARATORS = r"[^\pL\pN+#]+"
+_QUERY_SEPARATORS = re.compile(r"(?:[^\w+#]|_)+")   # the same split for one short query string
+_JK = r"[?&]v?jk=([0-9A-Za-z]+)"                    # Indeed's job key in a link, as jobs_etl.job_keys
+_WINDOW = 256
+_WINDOW_MAX = 1 << 16
+
+class StaleCursor(ValueError):
+    """The cursor belongs to an older build of the index."""
+
+# ---- Sources ----
+# first column present wins; raw indeed_jobs.csv, jobs_etl output and prediction.xlsx all map here
+_COLUMNS = {
+    "id": ["jk", "id"],
+    "title": ["Title", "position", "name", "primary_position"],
+    "company": ["Company", "firm_name", "company"],
+    "location": ["Location", "location", "city"],
+    "summary": ["Summary", "summary", "description"],
+    "type": ["type"],
+    "region": ["market_region", "region"],
+    "field": ["industry", "field"],
+    "salary": ["Salary", "salary"],
+    "link": ["Link", "link"],
+    "createdAt": ["createdAt"],
+}
+
+def _read(path: str) -> pd.DataFrame:
+    suffix = Path(path).suffix.lower()
+    if suffix in (".xlsx", ".xls"):
+        return pd.read_excel(path)
+    if suffix in (".arrow", ".feather"):
+        return feather.read_feather(path)
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path, engine="pyarrow", dtype=str)
+
+def load_postings(paths: Sequence[str]) -> pd.DataFrame:
+    """Postings from *paths* in one schema (``_COLUMNS``), newest first."""
+    frames = []
+    for path in paths:
+        src = _read(path)
+        out = pd.DataFrame(index=src.index)
+        for col, candidates in _COLUMNS.items():
+            found = next((c for c in candidates if c in src.columns), None)
+            out[col] = src[found] if found else None
+        ids = out["id"].astype(object)
+        if out["link"].notna().any():      # raw scrapes carry the key only inside the link
+            ids = ids.where(ids.notna(), out["link"].astype("string").str.extract(_JK)[0].astype(object))
+        out["id"] = ids.where(ids.notna(), Path(path).stem + ":" + src.index.astype(str))
+        frames.append(out)
+    if not frames:
+        return pd.DataFrame(columns=list(_COLUMNS))
+    df = pd.concat(frames, ignore_index=True).drop_duplicates("id", keep="first")
+    df["createdAt"] = pd.to_datetime(df["createdAt"], errors="coerce", utc=True)
+    return df.sort_values("createdAt", ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+
+def _fingerprint(paths: Sequence[str]) -> List[List[Any]]:
+    out = []
+    for p in paths:
+        st = os.stat(p)
+        out.append([str(p), st.st_size, st.st_mtime_ns])
+    return out
+
+# ---- Tokens ----
+def _words(texts: pa.Array) -> Tuple[pa.Array, np.ndarray]:
+    """Lowercased words of every text, flattened, with the row each word came from."""
+    lists = pc.split_pattern_regex(pc.utf8_lower(pc.fill_null(texts, "")), _SEPARATORS)
+    words = pc.list_flatten(lists)
+    rows = pc.list_parent_indices(lists).to_numpy()
+    keep = pc.not_equal(words, "").to_numpy(zero_copy_only=False)
+    return pc.filter(words, keep), rows[keep]
+
+def _column(df: pd.DataFrame, col: str) -> pa.Array:
+    return pa.array(df[col].astype("string"), pa.large_string())
+
+_DASHES = re.compile(r"[\u2010-\u2015\u2212]")   # prediction.xlsx spells "full‑time" with U+2011
+
+def _facet_value(value: str) -> str:
+    return _DASHES.sub("-", value.strip().lower())
+
+def _doc_terms(df: pd.DataFrame) -> Tuple[pa.Array, np.ndarray]:
+    """Every (term, doc) occurrence: words, title words, facet values."""
+    text = pc.binary_join_element_wise(
+        pc.fill_null(_column(df, "title"), ""), pc.fill_null(_column(df, "company"), ""),
+        pc.fill_null(_column(df, "location"), ""),
+        pc.utf8_slice_codeunits(pc.fill_null(_column(df, "summary"), ""), 0, SEARCH_SUMMARY_CHARS),
+        pa.scalar(" ", pa.large_string()))
+    parts = [_words(text)]
+    title_words, title_rows = _words(_column(df, "title"))
+    parts.append((pc.utf8_replace_slice(title_words, 0, 0, "t:"), title_rows))
+    for facet in FACETS:
+        values = df[facet].astype(object).where(df[facet].notna(), None)
+        present = np.flatnonzero(values.notna().to_numpy())
+        if len(present):
+            terms = [f"{facet}:{_facet_value(str(v))}" for v in values.iloc[present]]
+            parts.append((pa.array(terms, pa.large_string()), present))
+    terms = pa.chunked_array([t.cast(pa.large_string()) for t, _ in parts]).combine_chunks()
+    return terms, np.concatenate([r for _, r in parts]).astype(np.int64)
+
+# ---- Index ----
+class _Vocab:
+    """Sorted terms as one byte buffer plus offsets; indexable, so ``bisect`` works on it."""
+
+    __slots__ = ("offsets", "data")
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def find(self, term: str) -> int:
+        key = term.encode("utf-8")
+        i = bisect_left(self, key)
+        return i if i < len(self) and self[i] == key else -1
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        key = prefix.encode("utf-8")
+        return bisect_left(self, key), bisect_left(self, key + b"\xff")   # 0xff never occurs in UTF-8
+
+_DISPLAY = ["id", "title", "company", "location", "type", "region", "field", "salary", "link", "createdAt", "snippet"]
+
+class SearchIndex:
+    def __init__(self, vocab: _Vocab, offsets: np.ndarray, docs: np.ndarray, store: pa.Table, build_id: str):
+        self.vocab = vocab
+        self.offsets = offsets     # term id -> docs[offsets[t]:offsets[t + 1]]
+        self.docs = docs           # int32 doc ids, ascending within each term
+        self.store = store         # display columns, one row per doc id
+        self.build_id = build_id
+
+    def __len__(self) -> int:
+        return self.store.num_rows
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "SearchIndex":
+        """Index postings *df* (``load_postings`` schema, already in display order)."""
+        terms, rows = _doc_terms(df)
+        vocab = pc.unique(terms)
+        vocab = pc.take(vocab, pc.sort_indices(vocab))
+        codes = pc.index_in(terms, value_set=vocab).to_numpy().astype(np.int64)
+        pairs = np.unique(codes * max(len(df), 1) + rows)             # one posting per (term, doc), sorted
+        term_of, docs = np.divmod(pairs, max(len(df), 1))
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_of, minlength=len(vocab)), out=offsets[1:])
+        bufs = vocab.buffers()
+        v_offsets = np.frombuffer(bufs[1], dtype=np.int64)[vocab.offset:vocab.offset + len(vocab) + 1]
+        v_data = np.frombuffer(bufs[2], dtype=np.uint8)
+        store = df.assign(snippet=df["summary"].astype(object).where(df["summary"].notna(), "").astype(str).str.slice(0, 240))
+        store = store[_DISPLAY].astype(object).where(store[_DISPLAY].notna(), None)
+        store["createdAt"] = store["createdAt"].map(lambda t: t.isoformat() if t is not None else None)
+        table = pa.Table.from_pandas(store.astype(str).where(store.notna(), None), preserve_index=False)
+        return cls(_Vocab(v_offsets.copy(), v_data.copy()), offsets, docs.astype(np.int32), table,
+                   uuid.uuid4().hex[:12])
+
+    # ---- Clauses (each a list of sorted doc-id arrays, OR-ed) ----
+    def _postings(self, term_id: int) -> np.ndarray:
+        return self.docs[self.offsets[term_id]:self.offsets[term_id + 1]]
+
+    def _term(self, term: str) -> List[np.ndarray]:
+        t = self.vocab.find(term)
+        return [self._postings(t)] if t >= 0 else []
+
+    def _prefix(self, prefix: str) -> List[np.ndarray]:
+        lo, hi = self.vocab.prefix_range(prefix)
+        if hi - lo > SEARCH_PREFIX_EXPANSIONS:
+            df = np.diff(self.offsets[lo:hi + 1])
+            ids = lo + np.argpartition(-df, SEARCH_PREFIX_EXPANSIONS - 1)[:SEARCH_PREFIX_EXPANSIONS]
+        else:
+            ids = range(lo, hi)
+        return [self._postings(int(t)) for t in ids]
+
+    def _clauses(self, q: str, title: str, facets: Dict[str, Optional[str]]) -> Optional[List[List[np.ndarray]]]:
+        clauses = []
+        for text, ns in ((q, ""), (title, "t:")):
+            words = [w for w in _QUERY_SEPARATORS.split(text.lower()) if w]
+            for i, word in enumerate(words):
+                last = i == len(words) - 1 and not text[-1:].isspace()   # still being typed
+                if last and len(word) >= SEARCH_PREFIX_MIN:
+                    clauses.append(self._prefix(ns + word))
+                else:
+                    clauses.append(self._term(ns + word))
+        for facet, value in facets.items():
+            if value:
+                clauses.append(self._term(f"{facet}:{_facet_value(value)}"))
+        if any(not c for c in clauses):
+            return None                                                   # some clause matches nothing
+        return sorted(clauses, key=lambda c: sum(len(a) for a in c))
+
+    # ---- Cursors ----
+    def _encode_cursor(self, doc: int) -> str:
+        return base64.urlsafe_b64encode(f"{self.build_id}:{doc}".encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str) -> int:
+        try:
+            build_id, doc = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":")
+            doc = int(doc)
+        except ValueError:
+            raise ValueError("Malformed cursor") from None
+        if build_id != self.build_id:
+            raise StaleCursor("The search index was rebuilt; start from the first page")
+        if not 0 <= doc < len(self):
+            raise ValueError("Malformed cursor")
+        return doc
+
+    # ---- Search ----
+    def search(
+        self,
+        q: str = "",
+        *,
+        title: str = "",
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        **facets: Optional[str],
+    ) -> Dict[str, Any]:
+        """One page of postings matching every word of *q* (last word as a prefix), every
+        word of *title* in the title, and the given facet values; newest first."""
+        unknown = set(facets) - set(FACETS)
+        if unknown:
+            raise ValueError(f"Unknown facets: {sorted(unknown)}")
+        start = self._decode_cursor(cursor) + 1 if cursor else 0
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+        clauses = self._clauses(q, title, facets)
+        if clauses is None:
+            hits = np.zeros(0, dtype=np.int64)
+        elif not clauses:
+            hits = np.arange(start, min(start + limit + 1, len(self)))
+        else:
+            hits = _intersect(clauses, start, limit + 1, len(self))
+        more = len(hits) > limit
+        hits = hits[:limit]
+        results = self.store.take(pa.array(hits, pa.int64())).to_pylist() if len(hits) else []
+        return {"results": results, "next_cursor": self._encode_cursor(int(hits[-1])) if more else None}
+
+    # ---- Persistence ----
+    def save(self, path: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        path = Path(path)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name, arr in (("vocab.offsets", self.vocab.offsets), ("vocab.data", self.vocab.data),
+                          ("offsets", self.offsets), ("docs", self.docs)):
+            np.save(tmp / f"{name}.npy", np.asarray(arr))
+        feather.write_feather(self.store, tmp / "store.arrow", compression="uncompressed",
+                             chunksize=max(self.store.num_rows, 1))     # one chunk: take() stays a gather
+        (tmp / "meta.json").write_text(json.dumps({**(meta or {}), "build_id": self.build_id}))
+        old = path.with_name(f"{path.name}.{os.getpid()}.old")
+        if path.exists():
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["SearchIndex", Dict[str, Any]]:
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        arr = lambda name: np.asarray(np.load(path / f"{name}.npy", mmap_mode="r"))  # noqa: E731  (plain views index faster than np.memmap)
+        with pa.memory_map(str(path / "store.arrow")) as mm:
+            store = pa.ipc.open_file(mm).read_all()
+        index = cls(_Vocab(arr("vocab.offsets"), arr("vocab.data")), arr("offsets"), arr("docs"), store,
+                    meta["build_id"])
+        return index, meta
+
+def _window(clause: List[np.ndarray], start: int, n: int) -> np.ndarray:
+    """The first *n* doc ids >= *start* in the union of *clause*."""
+    start = np.int32(start)                  # a Python int would make searchsorted cast the whole array
+    parts = [a[np.searchsorted(a, start):][:n] for a in clause]
+    if len(parts) == 1:
+        return parts[0]
+    return np.unique(np.concatenate(parts))[:n]
+
+def _member(clause: List[np.ndarray], cand: np.ndarray) -> np.ndarray:
+    """Mask of *cand* (sorted) that occur in the union of *clause*."""
+    lo, hi = cand[0], cand[-1]
+    mask = np.zeros(len(cand), dtype=bool)
+    for a in clause:
+        part = a[np.searchsorted(a, lo):np.searchsorted(a, hi, side="right")]
+        if len(part):
+            idx = np.minimum(np.searchsorted(part, cand), len(part) - 1)
+            mask |= part[idx] == cand
+    return mask
+
+def _intersect(clauses: List[List[np.ndarray]], start: int, n: int, n_docs: int) -> np.ndarray:
+    """First *n* doc ids >= *start* in every clause, walking the rarest clause in windows."""
+    driver, rest = clauses[0], clauses[1:]
+    found: List[np.ndarray] = []
+    total = 0
+    # size the first window for the expected hit rate, treating the clauses as independent
+    rate = float(np.prod([sum(len(a) for a in c) / max(n_docs, 1) for c in rest])) if rest else 1.0
+    window = n if not rest else int(min(max(2 * n / max(rate, 1e-9), _WINDOW), _WINDOW_MAX))
+    while total < n:
+        cand = _window(driver, start, window)
+        if not len(cand):
+            break
+        start = int(cand[-1]) + 1
+        for clause in rest:
+            cand = cand[_member(clause, cand)]
+            if not len(cand):
+                break
+        if len(cand):
+            found.append(cand[:n - total])
+            total += len(found[-1])
+        window = min(window * 2, _WINDOW_MAX)     # sparse intersections: fewer, larger windows
+    return np.concatenate(found).astype(np.int64) if found else np.zeros(0, dtype=np.int64)
+
+# ---- Open ----
+def open_index(sources: Sequence[str] = SEARCH_SOURCES, path: str = SEARCH_INDEX_DIR) -> SearchIndex:
+    """The index for *sources*: loaded from *path* when the sources are unchanged, else rebuilt."""
+    sources = [s for s in sources if os.path.exists(s)]
+    fingerprint = _fingerprint(sources)
+    try:
+        index, meta = SearchIndex.load(path)
+        if meta.get("sources") == fingerprint:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    t0 = time.perf_counter()
+    index = SearchIndex.build(load_postings(sources))
+    index.save(path, {"sources": fingerprint, "build_seconds": round(time.perf_counter() - t0, 2)})
+    return SearchIndex.load(path)[0]
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    idx = open_index()
+    print(f"{len(idx)} postings, {len(idx.vocab)} terms, {len(idx.docs)} postings entries "
+          f"from {', '.join(SEARCH_SOURCES)} in {time.perf_counter() - t0:.2f}s -> {SEARCH_INDEX_DIR}")
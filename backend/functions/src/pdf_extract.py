@@ -0,0 +1,120 @@
+# pdf_extract.py
+# In-memory PDF text extraction on a process pool (no temp files, size/page limits)
+
+import os
+import sys
+import asyncio
+import hashlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # cv_digest lives in backend/functions
+from cv_digest import parse_cv, split_sections  # noqa: E402
+
+# ---- Env ----
+CV_MAX_BYTES = int(os.getenv("CV_MAX_BYTES", str(10 * 1024 * 1024)))
+CV_MAX_PAGES = int(os.getenv("CV_MAX_PAGES", "50"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PARALLEL_PAGES = int(os.getenv("PDF_PARALLEL_PAGES", "16"))   # split documents longer than this
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+PARSE_VERSION = "1"  # bump when the structured output changes; part of the cache key
+
+class PDFError(ValueError):
+    """The upload is not a readable PDF."""
+
+class PDFLimitError(ValueError):
+    """The upload exceeds CV_MAX_BYTES or CV_MAX_PAGES."""
+
+# ---- Workers (run in the pool; everything here is picklable) ----
+def _open(data: bytes) -> fitz.Document:
+    try:
+        return fitz.open(stream=data, filetype="pdf")
+    except Exception as e:
+        raise PDFError(f"Could not open PDF: {e}") from None
+
+def _pages(doc: fitz.Document, start: int, stop: int) -> List[str]:
+    return [doc[i].get_text() for i in range(start, stop)]
+
+def _extract_head(data: bytes, max_pages: int, split_over: int) -> Tuple[int, Optional[List[str]]]:
+    """Page count plus, for short documents, their text in the same round-trip."""
+    with _open(data) as doc:
+        n = doc.page_count
+        if n > max_pages:
+            raise PDFLimitError(f"PDF has {n} pages (limit {max_pages})")
+        return n, (_pages(doc, 0, n) if n <= split_over else None)
+
+def _extract_range(data: bytes, start: int, stop: int) -> List[str]:
+    with _open(data) as doc:
+        return _pages(doc, start, stop)
+
+# ---- Sync API ----
+def check_size(data: bytes, max_bytes: int = CV_MAX_BYTES) -> None:
+    if len(data) > max_bytes:
+        raise PDFLimitError(f"PDF is larger than {max_bytes} bytes")
+
+def extract_pages(data: bytes, *, max_bytes: int = CV_MAX_BYTES, max_pages: int = CV_MAX_PAGES) -> List[str]:
+    """Per-page text of an in-memory PDF, in the calling process."""
+    check_size(data, max_bytes)
+    return _extract_head(data, max_pages, max_pages)[1]
+
+def extract_text(data: bytes, **limits) -> str:
+    return "".join(extract_pages(data, **limits))
+
+def structure(pages: List[str]) -> Dict[str, Any]:
+    """Full text, per-page text, sections and the CV digest (skills, roles, ...)."""
+    text = "".join(pages)
+    digest = parse_cv(text)
+    return {
+        "text": text,
+        "pages": len(pages),
+        "page_text": pages,
+        "sections": split_sections(text),
+        "skills": digest["skills"],
+        "digest": digest,
+    }
+
+def parse_pdf(data: bytes, **limits) -> Dict[str, Any]:
+    return structure(extract_pages(data, **limits))
+
+def content_key(data: bytes) -> str:
+    """Cache key of an upload: its SHA-256 plus the output format version."""
+    return f"{hashlib.sha256(data).hexdigest()}-v{PARSE_VERSION}"
+
+# ---- Async API ----
+def make_pool(workers: int = PDF_WORKERS) -> ProcessPoolExecutor:
+    # spawn: the server process runs an event loop and threads, unsafe to fork
+    return ProcessPoolExecutor(max_workers=max(1, workers), mp_context=mp.get_context("spawn"))
+
+async def extract_pages_async(
+    data: bytes,
+    pool: ProcessPoolExecutor,
+    *,
+    max_bytes: int = CV_MAX_BYTES,
+    max_pages: int = CV_MAX_PAGES,
+    split_over: int = PDF_PARALLEL_PAGES,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+) -> List[str]:
+    """Per-page text of an in-memory PDF, extracted off the event loop.
+
+    Short documents take one pool round-trip; longer ones are split into
+    page ranges that are extracted in parallel across the pool.
+    """
+    check_size(data, max_bytes)
+    loop = asyncio.get_running_loop()
+    n, pages = await loop.run_in_executor(pool, _extract_head, data, max_pages, split_over)
+    if pages is not None:
+        return pages
+    step = max(1, pages_per_task)
+    chunks = await asyncio.gather(*(
+        loop.run_in_executor(pool, _extract_range, data, start, min(start + step, n))
+        for start in range(0, n, step)
+    ))
+    return [page for chunk in chunks for page in chunk]
+
+async def parse_pdf_async(data: bytes, pool: ProcessPoolExecutor, **limits) -> Dict[str, Any]:
+    pages = await extract_pages_async(data, pool, **limits)
+    return await asyncio.to_thread(structure, pages)
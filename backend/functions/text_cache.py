@@ -0,0 +1,216 @@
+# text_cache.py
+# Content-addressed text cache (memory LRU + optional disk tier) with single-flight fills
+
+import os
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+class TextCache:
+    """Two-tier text cache with single-flight deduplication.
+
+    Identical concurrent requests share one in-flight computation; failures
+    are propagated to every waiter and never cached.  A waiter that is
+    cancelled leaves the computation running for the others.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_s: float,
+        disk_dir: Optional[str] = None,
+        disk_max_entries: int = 20000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_entries = disk_max_entries
+        self._mem: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, "_Fill"] = {}
+        self._disk_writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.deduped = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    # -- memory tier --
+    def _mem_get(self, key: str) -> Optional[str]:
+        item = self._mem.get(key)
+        if item is None:
+            return None
+        created, text = item
+        if time.time() - created > self.ttl_s:
+            del self._mem[key]
+            return None
+        self._mem.move_to_end(key)
+        return text
+
+    def _mem_put(self, key: str, text: str, created: float) -> None:
+        self._mem[key] = (created, text)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    # -- disk tier (blocking; called via asyncio.to_thread) --
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str]]:
+        try:
+            data = json.loads(self._disk_path(key).read_text(encoding="utf-8"))
+            text = data["text"] if "text" in data else data["letter"]   # entries from older letter caches
+        except (OSError, ValueError, KeyError):
+            return None
+        if time.time() - data["created"] > self.ttl_s:
+            self._disk_path(key).unlink(missing_ok=True)
+            return None
+        return data["created"], text
+
+    def _disk_put(self, key: str, text: str, created: float) -> None:
+        path = self._disk_path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"created": created, "text": text}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        self._disk_writes += 1
+        if self._disk_writes % 64 == 0:
+            self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        now = time.time()
+        entries = []
+        for p in self.disk_dir.glob("*.json"):
+            try:
+                mtime = p.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime > self.ttl_s:
+                p.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, p))
+        entries.sort()
+        for _, p in entries[: max(0, len(entries) - self.disk_max_entries)]:
+            p.unlink(missing_ok=True)
+
+    # -- public --
+    async def get(self, key: str) -> Optional[str]:
+        text = self._mem_get(key)
+        if text is None and self.disk_dir:
+            item = await asyncio.to_thread(self._disk_get, key)
+            if item is not None:
+                self._mem_put(key, item[1], item[0])
+                text = item[1]
+        return text
+
+    async def put(self, key: str, text: str) -> None:
+        created = time.time()
+        self._mem_put(key, text, created)
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_put, key, text, created)
+
+    async def get_or_create(self, key: str, factory: Callable[[], Awaitable[str]]) -> str:
+        text = await self.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+
+        fill = self._join(key, lambda fill: self._fill(key, factory, fill))
+        try:
+            return await asyncio.shield(fill.task)
+        finally:
+            self._leave(key, fill)
+
+    async def stream_or_create(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Yield the text for *key* as deltas.
+
+        A cached value comes in one piece.  Otherwise *factory*'s deltas are
+        drained on a task of their own and cached, stripped and joined, once
+        complete; identical concurrent streams share that one generation, each
+        replaying the deltas it missed before following along.
+        """
+        text = await self.get(key)
+        if text is not None:
+            self.hits += 1
+            yield text
+            return
+
+        fill = self._join(key, lambda fill: self._fill_stream(key, factory, fill), streamed=True)
+        try:
+            if fill.parts is None:   # joined a non-streamed fill: the text arrives whole
+                yield await asyncio.shield(fill.task)
+                return
+            sent = 0
+            while True:
+                changed = fill.changed
+                while sent < len(fill.parts):
+                    sent += 1
+                    yield fill.parts[sent - 1]
+                if fill.task.done():
+                    fill.task.result()   # re-raise the generation's error
+                    return
+                await changed.wait()
+        finally:
+            self._leave(key, fill)
+
+    # -- single flight --
+    def _join(self, key: str, start: Callable[["_Fill"], Awaitable[str]], *, streamed: bool = False) -> "_Fill":
+        fill = self._inflight.get(key)
+        if fill is None:
+            self.misses += 1
+            # the fill runs as its own task, so a cancelled caller only stops
+            # waiting; it is cancelled once nobody is waiting for it any more
+            fill = self._inflight[key] = _Fill(streamed)
+            fill.task = asyncio.create_task(start(fill))
+        else:
+            self.deduped += 1
+        fill.waiters += 1
+        return fill
+
+    def _leave(self, key: str, fill: "_Fill") -> None:
+        fill.waiters -= 1
+        if fill.waiters == 0 and not fill.task.done():
+            fill.task.cancel()
+            if self._inflight.get(key) is fill:
+                del self._inflight[key]
+
+    async def _fill(self, key: str, factory: Callable[[], Awaitable[str]], fill: "_Fill") -> str:
+        try:
+            text = await factory()
+            await self.put(key, text)
+            return text
+        finally:
+            if self._inflight.get(key) is fill:
+                del self._inflight[key]
+
+    async def _fill_stream(self, key: str, factory: Callable[[], AsyncIterator[str]], fill: "_Fill") -> str:
+        try:
+            async for delta in factory():
+                fill.parts.append(delta)
+                fill.notify()
+            text = "".join(fill.parts).strip()
+            await self.put(key, text)
+            return text
+        finally:
+            if self._inflight.get(key) is fill:
+                del self._inflight[key]
+            fill.notify()
+
+class _Fill:
+    """One in-flight generation: its task, how many callers wait on it and,
+    when streamed, the deltas produced so far."""
+
+    __slots__ = ("task", "waiters", "parts", "changed")
+
+    def __init__(self, streamed: bool):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.parts: Optional[List[str]] = [] if streamed else None
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        # a fresh event per change, so no waiter can miss one between wait() and clear()
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
@@ -0,0 +1,309 @@
+"""Nightly bulk refresh: score every user and materialise recommendations in one pass.
+
+    python batch_recommend.py --users firestore --sink firestore
+    python batch_recommend.py --users uids.txt --sink recs.jsonl --processes 8 --chunk-size 512
+
+Users are streamed in chunks; each chunk is scored with one ``X @ W`` product
+against the shared model and catalog, and the picked jobs go out through a
+single ``bulk_writer`` sink.  Jobs a user has already swiped are never picked
+for them.  Swipes are read per chunk, for that chunk's users only: Firestore is
+queried by user id, and a JSONL export is first copied into a temporary SQLite
+table indexed by user, so memory stays bounded by the chunks in flight.
+
+Progress is checkpointed after every chunk whose writes all committed, and
+stops advancing at the first chunk with a failed user, so a rerun with the
+same checkpoint resumes there and retries it.  Chunks redone on a rerun are
+not duplicated: Firestore writes are idempotent by document path, and a
+JSONL sink is truncated back to its size at the checkpoint.
+"""
+from __future__ import annotations
+
+import argparse, itertools, json, multiprocessing as mp, os, sqlite3, sys, tempfile, time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+import numpy as np
+
+import job_recommendation as jr
+import personalization as ps
+from bulk_writer import FirestoreBackend, JsonlBackend, push_bulk
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+CHUNK_SIZE      = 256      # users per scoring chunk (chunk × jobs float64 matrix)
+CHECKPOINT_PATH = "batch_recommend.ckpt.json"
+USERS_COLLECTION = "users"
+SQLITE_IN_MAX   = 500      # user ids per SQLite "IN (...)" lookup
+
+# ---------------------------------------------------------------------------
+# USER & SWIPE SOURCES
+# ---------------------------------------------------------------------------
+
+def _firestore_user_ids(after: str | None) -> Iterator[str]:
+    db = jr._init_firestore()
+    coll = db.collection(USERS_COLLECTION)
+    query = coll.order_by("__name__").select([])
+    if after:
+        query = query.start_after(coll.document(after).get())
+    for doc in query.stream():
+        yield doc.id
+
+
+def _file_user_ids(path: str, skip: int) -> Iterator[str]:
+    with open(path, encoding="utf-8") as f:
+        uids = (line.strip() for line in f)
+        yield from itertools.islice((u for u in uids if u), skip, None)
+
+
+def iter_user_ids(source: str, checkpoint: Mapping[str, Any]) -> Iterator[str]:
+    """Stream user ids from Firestore or a one-uid-per-line file, past the checkpoint."""
+    if source == "firestore":
+        return _firestore_user_ids(checkpoint.get("last_uid"))
+    return _file_user_ids(source, int(checkpoint.get("done", 0)))
+
+
+class NoSwipes:
+    """Global scores for everyone."""
+
+    def for_users(self, uids: List[str]) -> Dict[str, List[ps.Swipe]]:
+        return {}
+
+    def close(self) -> None:
+        pass
+
+
+class FirestoreSwipes(NoSwipes):
+    """The `swipes` collection, queried for one chunk of users at a time."""
+
+    def for_users(self, uids: List[str]) -> Dict[str, List[ps.Swipe]]:
+        return ps.load_swipes(uids)
+
+
+class JsonlSwipes(NoSwipes):
+    """A JSONL export of the `swipes` collection, spilled once into a temporary
+    SQLite table indexed by user so each chunk reads only its users' rows."""
+
+    def __init__(self, path: str):
+        fd, self.db_path = tempfile.mkstemp(prefix="swipes-", suffix=".sqlite")
+        os.close(fd)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute("CREATE TABLE swipes (uid TEXT, job TEXT, liked INTEGER)")
+        with open(path, encoding="utf-8") as f:
+            records = (json.loads(line) for line in f if line.strip())
+            self.db.executemany("INSERT INTO swipes VALUES (?, ?, ?)",
+                                ((d["userId"], d["jobId"], bool(d.get("liked"))) for d in records))
+        self.db.execute("CREATE INDEX swipes_uid ON swipes (uid)")
+        self.db.commit()
+
+    def for_users(self, uids: List[str]) -> Dict[str, List[ps.Swipe]]:
+        grouped: Dict[str, List[ps.Swipe]] = {}
+        for i in range(0, len(uids), SQLITE_IN_MAX):
+            group = uids[i:i + SQLITE_IN_MAX]
+            marks = ",".join("?" * len(group))
+            cur = self.db.execute(f"SELECT uid, job, liked FROM swipes WHERE uid IN ({marks}) ORDER BY rowid", group)
+            for uid, job, liked in cur:
+                grouped.setdefault(uid, []).append((job, bool(liked)))
+        return grouped
+
+    def close(self) -> None:
+        self.db.close()
+        os.remove(self.db_path)
+
+
+def open_swipes(source: str | None) -> NoSwipes:
+    """Swipes from Firestore, a JSONL export of the `swipes` collection, or nothing."""
+    if not source:
+        return NoSwipes()
+    if source == "firestore":
+        return FirestoreSwipes()
+    return JsonlSwipes(source)
+
+
+def _chunks(it: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(it)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+# ---------------------------------------------------------------------------
+# CHUNK SCORING
+# ---------------------------------------------------------------------------
+
+def _top_k_rows(S: np.ndarray, n: int, excluded: np.ndarray | None = None) -> np.ndarray:
+    """Per-row positions of the *n* largest values, best first; *excluded* cells rank last."""
+    if excluded is not None:
+        S = np.where(excluded, -np.inf, S)
+    n = min(n, S.shape[1])
+    if n < S.shape[1]:
+        idx = np.argpartition(-S, n - 1, axis=1)[:, :n]
+    else:
+        idx = np.broadcast_to(np.arange(S.shape[1]), S.shape)
+    order = np.argsort(-np.take_along_axis(S, idx, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def _weighted_rows(S: np.ndarray, n: int, rng: np.random.Generator, excluded: np.ndarray | None = None) -> np.ndarray:
+    """Per-row score-weighted sample without replacement (Gumbel top-k)."""
+    with np.errstate(divide="ignore"):
+        keys = np.log(np.clip(S, 0.0, None)) - np.log(-np.log(rng.random(S.shape)))
+    return _top_k_rows(keys, n, excluded)
+
+
+def _swiped_mask(uids: List[str], swipes_by_user: Mapping[str, List[ps.Swipe]], n_jobs: int) -> np.ndarray:
+    """Boolean ``(users, jobs)`` mask of the jobs each user has already swiped."""
+    cat = jr._catalog()
+    excluded = np.zeros((len(uids), n_jobs), dtype=bool)
+    for i, uid in enumerate(uids):
+        positions, _ = cat.resolve(swipes_by_user.get(uid, ()))
+        excluded[i, positions] = True
+    return excluded
+
+
+def recommend_chunk(
+    uids: List[str],
+    swipes_by_user: Mapping[str, List[ps.Swipe]],
+    n: int,
+    randomize: bool,
+    seed: int,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Job objects for every user in *uids* from one batched scoring pass."""
+    scorer, cat = ps._scorer(), jr._catalog()
+    zero = scorer.zero_preference()
+    prefs = np.vstack([ps.learn_preference(swipes_by_user[u]) if u in swipes_by_user else zero
+                       for u in uids])
+    S = scorer.score_many(prefs)
+    excluded = _swiped_mask(uids, swipes_by_user, S.shape[1])
+    picks = (_weighted_rows(S, n, np.random.default_rng(seed), excluded) if randomize
+             else _top_k_rows(S, n, excluded))
+    return {uid: [cat.job_object(pos, S[i, pos]) for pos in picks[i].tolist() if not excluded[i, pos]]
+            for i, uid in enumerate(uids)}
+
+
+def _init_worker() -> None:
+    ps._scorer(); jr._catalog()   # no-op after fork from a warmed parent
+
+
+def _run_chunk(task: Tuple[List[str], Mapping[str, List[ps.Swipe]], int, bool, int]) -> Dict[str, List[Dict[str, Any]]]:
+    uids, swipes_by_user, n, randomize, seed = task
+    return recommend_chunk(uids, swipes_by_user, n, randomize, seed)
+
+# ---------------------------------------------------------------------------
+# DRIVER
+# ---------------------------------------------------------------------------
+
+def _bounded_imap(pool, fn, tasks: Iterable[Any], window: int) -> Iterator[Any]:
+    """Ordered ``pool.imap`` that keeps at most *window* tasks in flight."""
+    pending: deque = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(fn, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def _read_checkpoint(path: str) -> Dict[str, Any]:
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_checkpoint(path: str, state: Mapping[str, Any]) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    Path(tmp).write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+def run(
+    users: str,
+    sink,
+    *,
+    n: int = 3,
+    chunk_size: int = CHUNK_SIZE,
+    processes: int = 1,
+    randomize: bool = True,
+    swipes: str | None = None,
+    checkpoint: str = CHECKPOINT_PATH,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Score and push every user from *users*; returns the final checkpoint state.
+
+    ``done`` counts users in chunks that committed completely, ``failed`` the
+    users whose writes failed in this run.
+    """
+    state = _read_checkpoint(checkpoint)
+    state.setdefault("done", 0)
+    state["failed"] = 0
+    if hasattr(sink, "truncate"):
+        if "sink_position" in state:
+            sink.truncate(state["sink_position"])   # drop writes past the last committed chunk
+        else:
+            state["sink_position"] = sink.position()
+            _write_checkpoint(checkpoint, state)
+    ps._scorer(); jr._catalog()   # warm once; forked workers share the pages
+    source = open_swipes(swipes)
+
+    chunk_no = int(state.get("chunks", 0))
+    # swipes are looked up as each chunk is handed out, so only chunks in flight hold them
+    tasks = ((uids, source.for_users(uids), n, randomize, seed * 1_000_003 + chunk_no + i)
+             for i, uids in enumerate(_chunks(iter_user_ids(users, state), chunk_size)))
+
+    pool = None
+    if processes > 1:
+        pool = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else None).Pool(
+            processes, initializer=_init_worker)
+        results = _bounded_imap(pool, _run_chunk, tasks, window=2 * processes)
+    else:
+        _init_worker()
+        results = map(_run_chunk, tasks)
+
+    t0, users_done, committed = time.perf_counter(), 0, True
+    try:
+        for jobs_by_user in results:
+            outcomes = push_bulk(jobs_by_user, sink)
+            failed = sum(not r["ok"] for r in outcomes.values())
+            users_done += len(jobs_by_user)
+            state["failed"] += failed
+            # the checkpoint only moves past an unbroken run of fully committed chunks
+            committed = committed and not failed
+            if committed:
+                state["done"] += len(jobs_by_user)
+                state["last_uid"] = next(reversed(jobs_by_user))
+                state["chunks"] = state.get("chunks", 0) + 1
+                if hasattr(sink, "position"):
+                    state["sink_position"] = sink.position()
+                _write_checkpoint(checkpoint, state)
+            rate = users_done / max(time.perf_counter() - t0, 1e-9)
+            print(f"[batch_rec] {users_done} users ({state['failed']} failed), {rate:,.0f} users/s", flush=True)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        source.close()
+    state["users_per_sec"] = users_done / max(time.perf_counter() - t0, 1e-9)
+    return state
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--users", default="firestore", help="'firestore' or a file with one uid per line")
+    ap.add_argument("--sink", default="firestore", help="'firestore' or a .jsonl output path")
+    ap.add_argument("--swipes", default=None, help="'firestore', a swipes .jsonl export, or omit for global scores")
+    ap.add_argument("-n", type=int, default=3, help="jobs per user")
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    ap.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    ap.add_argument("--top", action="store_true", help="take the top-n instead of a score-weighted sample")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    sink = FirestoreBackend() if args.sink == "firestore" else JsonlBackend(args.sink)
+    state = run(args.users, sink, n=args.n, chunk_size=args.chunk_size, processes=args.processes,
+                randomize=not args.top, swipes=args.swipes, checkpoint=args.checkpoint, seed=args.seed)
+    print(f"[batch_rec] done: {state['done']} users, {state['failed']} failed, "
+          f"{state['users_per_sec']:,.0f} users/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,118 @@
+"""Compare job-object building: per-call ``set_index``/``df.loc`` vs JobCatalog.
+
+Run from the repository root:
+    python benchmarks/bench_catalog.py [--rows 10000 100000] [--calls 50]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import job_recommendation as jr  # noqa: E402
+
+
+def _legacy_to_list(value: Any) -> List[str]:
+    # verbatim copy of the eval-based parser the catalog replaced
+    if isinstance(value, str):
+        try:
+            parsed = eval(value)
+            return list(parsed) if isinstance(parsed, (list, tuple)) else [value]
+        except Exception:
+            return [value]
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [] if pd.isna(value) else [str(value)]
+
+
+def _legacy_build_job_object(row, score: float) -> Dict[str, Any]:
+    # verbatim copy of the pre-catalog builder, kept for comparison
+    if isinstance(row, pd.DataFrame):
+        row = row.iloc[0]
+
+    def _get(k: str, default: Any = None):
+        return row[k] if k in row and pd.notna(row[k]) else default
+
+    job: Dict[str, Any] = {
+        "id"        : str(uuid.uuid4()),
+        "company"   : _get("firm_name", "Unknown Co"),
+        "name"      : _get("primary_position", "Engineer"),
+        "logo"      : _get("logo"),
+        "industry"  : _get("industry", "Software"),
+        "size"      : str(_get("size", _get("size_employees", "-"))),
+        "location"  : _get("location", "Remote"),
+        "rating"    : _get("rating"),
+        "founded"   : int(_get("founded", _get("founded_year", 2000))),
+        "position"  : _get("primary_position", "Engineer"),
+        "salary"    : _get("salary"),
+        "type"      : _get("type"),
+        "experience": [int(x) for x in _legacy_to_list(_get("experience"))[:2]],
+        "skills"    : _legacy_to_list(_get("skills")),
+        "description": _get("description"),
+        "benefits"  : _legacy_to_list(_get("benefits")),
+        "posted"    : _get("posted"),
+        "createdAt" : _get("createdAt"),
+        "aiScore"   : round(score, 3),
+    }
+    return jr._fill_missing(job)
+
+
+def _legacy_recommend(df: pd.DataFrame, ranked: List[Tuple[str, float]], n: int) -> List[Dict[str, Any]]:
+    indexed = df.set_index(jr.ID_COL)
+    return [_legacy_build_job_object(indexed.loc[fid], sc) for fid, sc in ranked[:n]]
+
+
+def _catalog_recommend(cat: jr.JobCatalog, scores: np.ndarray, n: int) -> List[Dict[str, Any]]:
+    picks = jr._top_k(scores, np.zeros(len(cat), dtype=bool), n)
+    return [cat.job_object(pos, scores[pos]) for pos in picks.tolist()]
+
+
+def synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Tile ``prediction.xlsx`` up to *rows* rows with unique firm names."""
+    base = jr._pred_df()
+    reps = -(-rows // len(base))
+    df = pd.concat([base] * reps, ignore_index=True).iloc[:rows].copy()
+    df[jr.ID_COL] = [f"{name}-{i}" for i, name in enumerate(df[jr.ID_COL])]
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def _time_calls(fn, calls: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - t0) / calls
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--calls", type=int, default=50)
+    ap.add_argument("-n", type=int, default=3, help="jobs returned per call")
+    args = ap.parse_args()
+
+    random.seed(0)
+    print(f"{'rows':>8} {'legacy ms/call':>15} {'catalog ms/call':>16} {'catalog build ms':>17} {'speedup':>8}")
+    for rows in args.rows:
+        df = synthetic_frame(rows)
+        scores = np.random.default_rng(0).random(rows)
+        ranked = sorted(zip(df[jr.ID_COL], scores), key=lambda x: x[1], reverse=True)
+
+        t0 = time.perf_counter()
+        cat = jr.JobCatalog.from_frame(df)
+        build = time.perf_counter() - t0
+
+        legacy = _time_calls(lambda: _legacy_recommend(df, ranked, args.n), args.calls)
+        fast = _time_calls(lambda: _catalog_recommend(cat, scores, args.n), args.calls)
+        print(f"{rows:>8} {legacy * 1e3:>15.3f} {fast * 1e3:>16.4f} {build * 1e3:>17.1f} {legacy / fast:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
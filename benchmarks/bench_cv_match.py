@@ -0,0 +1,127 @@
+"""CV-match index on synthetic postings: build time, search latency and recall@k.
+
+Run from the repository root:
+    python benchmarks/bench_cv_match.py [--jobs 100000] [--queries 200] [--k 10]
+
+Postings are a title, 3-6 skills, an industry and a Zipf-distributed body;
+each query CV shares the title and skills of one posting with a different
+body.  Recall is measured against exhaustive search over every query term; "own
+job@k" is how often the posting the CV was drawn from makes the top k.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import cv_match as cm  # noqa: E402
+import jobs_etl  # noqa: E402
+
+_TITLES = ["Software Engineer", "Backend Developer", "Data Scientist", "Product Manager", "DevOps Engineer",
+           "Frontend Developer", "Mobile Developer", "Data Engineer", "QA Engineer", "Support Engineer"]
+_SKILLS = sorted(jobs_etl.SKILLS)
+_INDUSTRIES = sorted(jobs_etl.INDUSTRIES) + ["Software"]
+
+
+class Corpus:
+    def __init__(self, seed: int = 0, vocab: int = 20_000):
+        self.rng = np.random.default_rng(seed)
+        self.words = np.array([f"w{i}" for i in range(vocab)])
+        p = 1.0 / np.arange(1, vocab + 1)
+        self.p = p / p.sum()
+
+    def body(self, n: int) -> str:
+        return " ".join(self.words[self.rng.choice(len(self.words), n, p=self.p)])
+
+    def posting(self):
+        rng = self.rng
+        title = _TITLES[rng.integers(len(_TITLES))]
+        skills = list(rng.choice(_SKILLS, rng.integers(3, 7), replace=False))
+        text = (f"{title} . {_INDUSTRIES[rng.integers(len(_INDUSTRIES))]} . {', '.join(skills)} . "
+                f"{', '.join(skills)} . {self.body(int(rng.integers(60, 120)))}")
+        return title, skills, text
+
+    def cv(self, title: str, skills) -> str:
+        extra = list(self.rng.choice(_SKILLS, 2, replace=False))
+        return f"{title}. Skills: {', '.join(skills + extra)}. {self.body(150)}"
+
+
+def _timed(fn, queries):
+    lat, results = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append(fn(q))
+        lat.append(time.perf_counter() - t0)
+    return np.array(lat) * 1e3, results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--jobs", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    args = ap.parse_args()
+
+    corpus = Corpus()
+    postings = [corpus.posting() for _ in range(args.jobs)]
+    ids = [f"job{i}" for i in range(args.jobs)]
+    picks = corpus.rng.choice(args.jobs, args.queries, replace=False)
+    queries = [corpus.cv(postings[i][0], postings[i][1]) for i in picks]
+
+    index = cm.MatchIndex()
+    t0 = time.perf_counter()
+    index.add(ids, [text for _, _, text in postings])
+    t_add = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index.compact()
+    t_compact = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index.build_ann()
+    t_ann = time.perf_counter() - t0
+    print(f"{args.jobs} postings: hashed {t_add:.1f} s, compacted {t_compact:.1f} s "
+          f"({index.postings.nnz / 1e6:.1f}M postings), IVF with {index.ann.centroids.shape[0]} lists {t_ann:.1f} s")
+
+    modes = {
+        "postings, every term": dict(max_df=1.0, nprobe=None),
+        "postings, max_df=0.2": dict(max_df=0.2, nprobe=None),
+        f"IVF nprobe={cm.NPROBE}": dict(max_df=1.0, nprobe=cm.NPROBE),
+        f"IVF nprobe={cm.NPROBE * 4}": dict(max_df=1.0, nprobe=cm.NPROBE * 4),
+    }
+    truth = None
+    print(f"{'mode':<26}{'p50 ms':>9}{'p95 ms':>9}{f'recall@{args.k}':>12}{'own job@k':>11}")
+    for name, opts in modes.items():
+        lat, results = _timed(lambda q: index.search(q, args.k, **opts)[0], queries)
+        if truth is None:
+            truth = results
+        recall = np.mean([len(set(r) & set(t)) / max(len(t), 1) for r, t in zip(results, truth)])
+        own = np.mean([ids[i] in r for i, r in zip(picks, results)])
+        print(f"{name:<26}{np.percentile(lat, 50):9.2f}{np.percentile(lat, 95):9.2f}{recall:12.3f}{own:11.3f}")
+
+    fresh = [corpus.posting() for _ in range(1000)]
+    t0 = time.perf_counter()
+    index.add([f"new{i}" for i in range(len(fresh))], [text for _, _, text in fresh])
+    index.remove(ids[:1000])
+    t_update = time.perf_counter() - t0
+    lat, _ = _timed(lambda q: index.search(q, args.k), queries)
+    print(f"add 1000 + remove 1000: {t_update * 1e3:.0f} ms; search with pending rows p50 {np.percentile(lat, 50):.2f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        index.save(Path(tmp) / "index")
+        t_save = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        loaded = cm.MatchIndex.load(Path(tmp) / "index")
+        t_load = time.perf_counter() - t0
+        size = sum(f.stat().st_size for f in (Path(tmp) / "index").iterdir()) / 1e6
+        lat, _ = _timed(lambda q: loaded.search(q, args.k), queries)
+        print(f"save {t_save:.1f} s ({size:.0f} MB), memory-mapped load {t_load * 1e3:.0f} ms, "
+              f"search p50 {np.percentile(lat, 50):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Job full-text search on synthetic postings: build time, index size and query latency.
+
+Run from the repository root:
+    python benchmarks/bench_job_search.py [--jobs 1000000] [--queries 500]
+
+Postings are a title, a company, a location, facet values and a short
+Zipf-distributed summary.  Each query kind is timed for one page of 20 results;
+"deep cursor" follows the next_cursor of a common term 50 pages in.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend" / "functions" / "src"))
+import job_search as js  # noqa: E402
+
+_TITLES = ["Software Engineer", "Backend Developer", "Data Scientist", "Product Manager", "DevOps Engineer",
+           "Frontend Developer", "Mobile Developer", "Data Engineer", "QA Engineer", "Support Specialist",
+           "Sales Manager", "Marketing Analyst"]
+_TYPES = ["full-time", "part-time", "contract", "internship"]
+_REGIONS = ["AMER", "EMEA", "APAC"]
+_FIELDS = ["FinTech", "HealthTech", "E-commerce", "Software", "Education", "Gaming", "Media"]
+_CITIES = ["Austin", "New York", "London", "Berlin", "Dubai", "Singapore", "Toronto", "Istanbul", "Remote"]
+
+
+def synthetic_postings(n: int, seed: int = 0, vocab: int = 50_000, words: int = 30) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    p = 1.0 / np.arange(1, vocab + 1)
+    lexicon = np.array([f"w{i}" for i in range(vocab)])
+    body = lexicon[rng.choice(vocab, (n, words), p=p / p.sum())]
+    pick = lambda xs: np.asarray(xs, dtype=object)[rng.integers(len(xs), size=n)]  # noqa: E731
+    return pd.DataFrame({
+        "id": [f"job{i}" for i in range(n)],
+        "title": pick(_TITLES),
+        "company": [f"Company {c}" for c in rng.integers(20_000, size=n)],
+        "location": pick(_CITIES),
+        "summary": [" ".join(row) for row in body],
+        "type": pick(_TYPES),
+        "region": pick(_REGIONS),
+        "field": pick(_FIELDS),
+        "salary": None,
+        "link": None,
+        "createdAt": pd.Timestamp("2025-01-01", tz="UTC") - pd.to_timedelta(np.arange(n), unit="s"),
+    })
+
+
+def _timed(fn, n):
+    lat = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i)
+        lat.append(time.perf_counter() - t0)
+    return np.array(lat) * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--jobs", type=int, default=1_000_000)
+    ap.add_argument("--queries", type=int, default=500)
+    args = ap.parse_args()
+
+    df = synthetic_postings(args.jobs)
+    t0 = time.perf_counter()
+    built = js.SearchIndex.build(df)
+    t_build = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        built.save(Path(tmp) / "index")
+        size = sum(f.stat().st_size for f in (Path(tmp) / "index").iterdir()) / 1e6
+        t0 = time.perf_counter()
+        index, _ = js.SearchIndex.load(Path(tmp) / "index")
+        t_load = time.perf_counter() - t0
+        print(f"{args.jobs} postings: built in {t_build:.1f} s ({len(index.vocab)} terms, "
+              f"{len(index.docs) / 1e6:.1f}M postings, {size:.0f} MB), memory-mapped load {t_load * 1e3:.0f} ms")
+
+        rng = np.random.default_rng(1)
+        rare = [f"w{i}" for i in rng.integers(1_000, 50_000, size=args.queries)]
+        mid = [f"w{i}" for i in rng.integers(50, 1_000, size=args.queries)]
+        cursors = []
+        page = index.search("w1")
+        for _ in range(50):
+            cursors.append(page["next_cursor"])
+            page = index.search("w1", cursor=page["next_cursor"])
+
+        kinds = {
+            "rare term": lambda i: index.search(rare[i]),
+            "common term": lambda i: index.search("w3"),
+            "two terms (AND)": lambda i: index.search(f"{mid[i]} {mid[-i - 1]}"),
+            "prefix": lambda i: index.search(f"w{i % 90 + 10}"),
+            "facets + term": lambda i: index.search(mid[i], type="contract", region="EMEA", field="Gaming"),
+            "facets only": lambda i: index.search("", type="internship", region="APAC"),
+            "title + company prefix": lambda i: index.search(f"company {i % 900 + 100}", title="engineer"),
+            "deep cursor": lambda i: index.search("w1", cursor=cursors[i % len(cursors)]),
+        }
+        print(f"{'query':<24}{'p50 µs':>9}{'p95 µs':>9}{'hits/page':>11}")
+        for name, fn in kinds.items():
+            lat = _timed(fn, args.queries)
+            hits = np.mean([len(fn(i)["results"]) for i in range(min(args.queries, 50))])
+            print(f"{name:<24}{np.percentile(lat, 50):9.0f}{np.percentile(lat, 95):9.0f}{hits:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
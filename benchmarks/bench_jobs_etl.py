@@ -0,0 +1,68 @@
+"""Scraped-jobs ETL throughput: full extraction vs an incremental run with a few new postings.
+
+Run from the repository root:
+    python benchmarks/bench_jobs_etl.py [--rows 100000] [--new 0.01]
+
+Synthetic postings reuse the real summaries in indeed_jobs.csv with fresh job
+keys, titles, locations and salary strings, so the regexes see realistic text
+lengths.  Files go to a temporary directory.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import jobs_etl  # noqa: E402
+
+_TITLES = ["Software Engineer", "Senior Backend Developer", "Data Scientist", "Product Manager",
+           "Customer Support Specialist", "DevOps Engineer", "Marketing Manager", "Frontend Developer"]
+_LOCATIONS = ["Austin, TX", "Remote", "New York, NY 10001", "Hybrid work in Seattle, WA", "Toronto, ON", ""]
+_SALARIES = ["$90,000 - $120,000 a year", "$45 - $60 an hour", "$150K", "", ""]
+
+
+def synthetic_postings(rows: int, start: int = 0, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed + start)
+    summaries = pd.read_csv(jobs_etl.SOURCE_CSV, dtype=str)["Summary"].dropna().tolist()
+    return pd.DataFrame({
+        "Title": [rng.choice(_TITLES) for _ in range(rows)],
+        "Company": [f"Company {rng.randint(0, 5000)}" for _ in range(rows)],
+        "Location": [rng.choice(_LOCATIONS) for _ in range(rows)],
+        "Salary": [rng.choice(_SALARIES) for _ in range(rows)],
+        "Summary": [rng.choice(summaries) for _ in range(rows)],
+        "Link": [f"https://www.indeed.com/rc/clk?jk={start + i:016x}" for i in range(rows)],
+    })
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--new", type=float, default=0.01, help="fraction of new postings in the second run")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = Path(tmp) / "jobs.csv", str(Path(tmp) / "jobs.arrow")
+        base = synthetic_postings(args.rows)
+        base.to_csv(src, index=False)
+        mb = src.stat().st_size / 1e6
+
+        full = jobs_etl.run([str(src)], out)
+        added = synthetic_postings(int(args.rows * args.new), start=args.rows)
+        pd.concat([base, added]).to_csv(src, index=False)
+        inc = jobs_etl.run([str(src)], out)
+
+        df = pd.read_feather(out)
+        print(f"{args.rows} postings ({mb:.0f} MB CSV) -> {len(df)} catalog rows")
+        print(f"  full run         {full['seconds']:6.2f} s  {full['extracted'] / full['seconds']:9,.0f} postings/s")
+        print(f"  incremental run  {inc['seconds']:6.2f} s  {inc['extracted']} extracted, {inc['unchanged']} unchanged")
+        for col in ("salary", "experience", "skills", "benefits", "type"):
+            print(f"  {col:<11} filled {df[col].notna().mean():6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Micro-benchmark: per-row ``eval`` vs the catalog's interned list-column parse.
+
+Run from the repository root:
+    python benchmarks/bench_list_parse.py [--rows 100000] [--distinct 50]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import job_recommendation as jr  # noqa: E402
+from bench_catalog import _legacy_to_list  # noqa: E402
+
+_SKILLS = ["Python", "Django", "PostgreSQL", "React", "TypeScript", "CSS", "Go", "gRPC",
+           "Kubernetes", "Node.js", "Express", "MongoDB", "Flutter", "Dart", "Firebase"]
+
+
+def synthetic_cells(rows: int, distinct: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    pool = [str(rng.sample(_SKILLS, rng.randint(1, 5))) for _ in range(distinct)]
+    pool += ["Python, Django; Docker", "[1, 9]"]
+    return [rng.choice(pool) for _ in range(rows)]
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--distinct", type=int, default=50, help="distinct cell strings")
+    args = ap.parse_args()
+
+    cells = synthetic_cells(args.rows, args.distinct)
+    legacy = _best_of(lambda: [_legacy_to_list(v) for v in cells])
+    per_row = _best_of(lambda: [jr._to_list(v) for v in cells])
+    column = _best_of(lambda: jr._list_column(cells))
+
+    print(f"{args.rows} cells, {len(set(cells))} distinct")
+    print(f"  eval per row          {legacy * 1e3:9.1f} ms  ({legacy / args.rows * 1e6:.2f} µs/cell)")
+    print(f"  safe parse per row    {per_row * 1e3:9.1f} ms  ({per_row / args.rows * 1e6:.2f} µs/cell)")
+    print(f"  interned column pass  {column * 1e3:9.1f} ms  ({column / args.rows * 1e6:.2f} µs/cell)"
+          f"  {legacy / column:.0f}x vs eval")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Prompt size: verbatim CV + indented job JSON vs CV digest + compact job JSON.
+
+Run from the repository root:
+    python benchmarks/bench_prompt_tokens.py [--jobs 10]
+
+Token counts use ``tiktoken`` (o200k_base) when it is installed and fall back
+to a chars/4 estimate otherwise.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("EMAIL_USER", "bench@example.com")
+os.environ.setdefault("EMAIL_PASS", "bench")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend" / "functions"))
+import cv_digest  # noqa: E402
+import server  # noqa: E402
+
+try:
+    import tiktoken
+    _enc = tiktoken.get_encoding("o200k_base")
+    count_tokens = lambda text: len(_enc.encode(text))  # noqa: E731
+    TOKENIZER = "o200k_base"
+except ImportError:
+    count_tokens = lambda text: (len(text) + 3) // 4  # noqa: E731
+    TOKENIZER = "chars/4 estimate"
+
+SAMPLE_CVS = {
+    "backend": """Ayşe Yılmaz
+Senior Backend Engineer
+ayse.yilmaz@example.com | +90 555 123 45 67 | linkedin.com/in/ayseyilmaz | github.com/ayse
+
+SUMMARY
+Backend engineer with 7 years of experience building high-throughput APIs and data pipelines. I enjoy
+turning slow, fragile systems into fast and observable ones, and mentoring engineers along the way.
+Outside of work I contribute to open-source Python tooling and speak at local meetups.
+
+SKILLS
+Languages: Python, Go, SQL, TypeScript
+Frameworks: FastAPI, Django, Flask, gRPC
+Data: PostgreSQL, Redis, Kafka, BigQuery, Airflow
+Infrastructure: Docker, Kubernetes, Terraform, AWS, GCP
+
+EXPERIENCE
+Senior Backend Engineer, Trendyol — Istanbul
+Jan 2021 - Present
+- Redesigned the checkout service in Go; p99 latency dropped from 480 ms to 95 ms.
+- Led migration of 40+ cron jobs to Airflow, cutting failed nightly runs by 70%.
+- Introduced contract testing across 12 services, reducing integration incidents.
+- Ran the weekly architecture review and onboarded six new engineers.
+- Wrote internal guides on observability and structured logging.
+
+Backend Engineer, Getir — Istanbul
+Mar 2018 - Dec 2020
+- Built the courier assignment API serving 2M requests per day.
+- Added Redis caching to the catalogue service, lowering DB load by 60%.
+- Maintained the PostgreSQL schema and wrote data migrations.
+- Participated in on-call rotation.
+
+Junior Developer, Local Agency
+Jun 2016 - Feb 2018
+- Built and maintained Django websites for small business clients.
+- Set up CI pipelines on GitLab.
+
+PROJECTS
+fastqueue — open-source task queue (2022 - 2023)
+- 1.2k GitHub stars; used in production by 3 companies.
+
+EDUCATION
+BSc Computer Engineering, Boğaziçi University, 2016
+
+LANGUAGES
+Turkish (native), English (C1), German (A2)
+
+HOBBIES
+Climbing, photography, board games.
+
+REFERENCES
+Available upon request.
+""",
+    "data": """Mehmet Demir
+Data Scientist
+mehmet.demir@example.com · +90 532 000 11 22
+
+PROFILE
+Data scientist focused on recommendation systems and experimentation. Comfortable owning models
+end-to-end, from feature pipelines to A/B tests and stakeholder reporting.
+
+TECHNICAL SKILLS
+Python, pandas, NumPy, scikit-learn, PyTorch, LightGBM, SQL, Spark, dbt, Looker, A/B testing, causal inference
+
+WORK EXPERIENCE
+Data Scientist — Hepsiburada
+2020 - Present
+- Shipped a two-tower retrieval model that raised click-through by 8%.
+- Built the experimentation platform's sequential testing module used by 30 teams.
+- Automated weekly KPI reporting, saving 10 analyst hours per week.
+- Presented quarterly model reviews to product leadership.
+
+Data Analyst — Turkcell
+2017 - 2020
+- Churn model on 15M subscribers; retention campaign ROI up 22%.
+- Maintained Tableau dashboards for the marketing department.
+- Cleaned and documented the customer data warehouse.
+
+EDUCATION
+MSc Statistics, METU, 2017
+BSc Mathematics, METU, 2015
+
+CERTIFICATIONS
+AWS Certified Machine Learning – Specialty
+""",
+}
+
+SAMPLE_JOB = {
+    "id": "3c9a1f9e-2d1b-5c47-8f0e-5b0f6a1d2e33",
+    "company": "Acme Analytics",
+    "firm_name": "Acme Analytics",
+    "position": "Backend Developer",
+    "primary_position": "Backend Developer",
+    "industry": "Software",
+    "location": "Istanbul",
+    "skills": ["Python", "FastAPI", "PostgreSQL", "Docker", "Kubernetes"],
+    "experience": [3, 7],
+    "benefits": ["Remote work", "Health insurance", "Stock options", "Learning budget"],
+    "salary": "90,000 - 120,000 TRY",
+    "work_type": "Hybrid",
+    "aiScore": 0.873,
+    "logo": "https://example.com/logos/acme.png",
+    "created_at": "2024-05-01T10:00:00Z",
+    "firm_code": 17,
+}
+
+
+def prompt_sizes(cv_text: str, job: dict, compact: bool) -> tuple:
+    text = server.build_prompt(cv_text, job, {}, compact=compact)
+    return len(text), count_tokens(text)
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--jobs", type=int, default=10, help="letters per CV (prefix re-used across them)")
+    args = ap.parse_args(argv)
+
+    print(f"tokenizer: {TOKENIZER}")
+    print(f"{'cv':<10}{'verbatim tok':>14}{'compact tok':>13}{'saved':>8}   digest useful")
+    total_before = total_after = 0
+    for label, cv in SAMPLE_CVS.items():
+        _, before = prompt_sizes(cv, SAMPLE_JOB, compact=False)
+        _, after = prompt_sizes(cv, SAMPLE_JOB, compact=True)
+        total_before += before * args.jobs
+        total_after += after * args.jobs
+        useful = cv_digest.get_digest(cv)["useful"]
+        print(f"{label:<10}{before:>14,}{after:>13,}{1 - after / before:>8.0%}   {useful}")
+    print(f"{args.jobs} letters per CV: {total_before:,} -> {total_after:,} input tokens "
+          f"({1 - total_after / total_before:.0%} fewer)")
+
+    cv_digest._cache.clear()
+    cv = SAMPLE_CVS["backend"]
+    t0 = time.perf_counter()
+    cv_digest.get_digest(cv)
+    cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        cv_digest.get_digest(cv)
+    warm = (time.perf_counter() - t0) / 1000
+    print(f"digest: {cold * 1e3:.2f} ms first parse, {warm * 1e6:.1f} us cached")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,111 @@
+"""Recommendation service memory per worker: preloaded master + fork vs loading in every worker.
+
+Run from the repository root (Linux; memory is read from /proc):
+    python benchmarks/bench_recommend_service.py [--workers 1 2 4] [--requests 400]
+
+For each worker count the service is started on a free port, waited on until
+/ready answers, and sent a round of concurrent /recommendations and
+/recommendations/personal requests.  Reported per worker: private memory
+(USS, pages only that worker holds) and proportional set size (PSS, shared
+pages split between the processes mapping them); plus total PSS of the
+workers and request throughput.
+"""
+from __future__ import annotations
+
+import argparse
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _memory_kb(pid: int) -> dict:
+    out = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        key, value = line.split(":", 1)
+        out[key] = int(value.split()[0])
+    return out
+
+
+def _children(pid: int) -> list:
+    return [int(p) for p in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()]
+
+
+def _measure(workers: int, preload: bool, requests: int) -> dict:
+    port = _free_port()
+    cmd = [sys.executable, "recommend_service.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)]
+    proc = subprocess.Popen(cmd + ([] if preload else ["--no-preload"]), cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(base_url=base, timeout=30) as client:
+            t0, streak = time.perf_counter(), 0
+            while streak < 4 * workers:               # consecutive 200s: every worker has answered
+                try:
+                    streak = streak + 1 if client.get("/ready").status_code == 200 else 0
+                except httpx.TransportError:
+                    streak = 0
+                    time.sleep(0.05)
+            t_ready = time.perf_counter() - t0
+
+            def one(i: int) -> float:
+                s = time.perf_counter()
+                if i % 2:
+                    r = client.get("/recommendations", params={"n": 5, "randomize": True})
+                else:
+                    r = client.post("/recommendations/personal",
+                                    json={"swipes": [{"jobId": "unknown", "liked": True}], "n": 5})
+                r.raise_for_status()
+                return time.perf_counter() - s
+
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(16) as pool:
+                lat = list(pool.map(one, range(requests)))
+            rps = requests / (time.perf_counter() - t0)
+        mem = [_memory_kb(pid) for pid in _children(proc.pid)]
+        master = _memory_kb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    uss = [m["Private_Clean"] + m["Private_Dirty"] for m in mem]
+    return {
+        "ready_s": t_ready,
+        "uss_mb": np.mean(uss) / 1024,
+        "pss_mb": np.mean([m["Pss"] for m in mem]) / 1024,
+        "total_pss_mb": (sum(m["Pss"] for m in mem) + master["Pss"]) / 1024,
+        "rps": rps,
+        "p50_ms": np.percentile(lat, 50) * 1e3,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--requests", type=int, default=400)
+    args = ap.parse_args()
+
+    print(f"{'mode':<12}{'workers':>8}{'ready s':>9}{'USS/worker':>12}{'PSS/worker':>12}"
+          f"{'total PSS':>11}{'req/s':>8}{'p50 ms':>8}")
+    for preload in (True, False):
+        for workers in args.workers:
+            r = _measure(workers, preload, args.requests)
+            print(f"{'preload' if preload else 'per-worker':<12}{workers:>8}{r['ready_s']:9.2f}"
+                  f"{r['uss_mb']:10.1f}MB{r['pss_mb']:10.1f}MB{r['total_pss_mb']:9.0f}MB"
+                  f"{r['rps']:8.0f}{r['p50_ms']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Scraping engine against a local fixture server: sequential vs concurrent fetching.
+
+Run from the repository root:
+    python benchmarks/bench_scraper.py [--jobs 200] [--latency 0.1] [--concurrency 16]
+
+Listing and detail pages are generated in Indeed's markup (div.tapItem,
+h2.jobTitle > span, #jobDescriptionText, ...) and served by a threaded
+http.server that sleeps *latency* seconds per request, so no network or
+browser is involved.  Every third card has no snippet, which forces a detail
+page fetch the way real listings do.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import html
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "neomind" / "src"))
+import scrape_engine as se  # noqa: E402
+
+_TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "Frontend Developer", "SRE"]
+
+
+def listing_page(start: int, total: int) -> str:
+    cards = []
+    for i in range(start, min(start + se.PAGE_SIZE, total)):
+        new = '<span class="label">new</span>' if i % 4 == 0 else ""
+        snippet = "" if i % 3 == 0 else f'<div class="job-snippet"><ul><li>Build &amp; ship service #{i}</li></ul></div>'
+        cards.append(f"""
+<div class="job_seen_beacon"><div class="cardOutline tapItem fs-unmask result">
+  <h2 class="jobTitle">{new}<span title="t">{_TITLES[i % len(_TITLES)]} {i}</span></h2>
+  <a href="/viewjob?jk={i:016x}" class="jcs-JobTitle">apply</a>
+  <div class="company_location"><span class="companyName">Company {i % 37}</span>
+  <div class="companyLocation">Remote, US</div></div>
+  <div class="metadata salary-snippet-container"><div>${80 + i % 50},000 a year</div></div>
+  {snippet}
+</div></div>""")
+    return f"<html><head><script>var x='<div>';</script></head><body>{''.join(cards)}</body></html>"
+
+
+def detail_page(jk: str) -> str:
+    return (f'<html><body><div id="jobDescriptionText"><p>Full description for {html.escape(jk)}.</p>'
+            f"<ul><li>Python</li><li>Kubernetes</li></ul></div></body></html>")
+
+
+def serve(total: int, latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            url = urllib.parse.urlsplit(self.path)
+            qs = urllib.parse.parse_qs(url.query)
+            if url.path == "/jobs":
+                body = listing_page(int(qs.get("start", ["0"])[0]), total)
+            elif url.path == "/viewjob":
+                body = detail_page(qs["jk"][0])
+            else:
+                self.send_error(404)
+                return
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256   # default backlog of 5 drops concurrent connects (1 s SYN retry)
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(base_url: str, jobs: int, concurrency: int):
+    t0 = time.perf_counter()
+    rows = asyncio.run(se.scrape("Software Engineer", "United States", jobs, base_url=base_url,
+                                 concurrency=concurrency, rate=0, browser="never"))
+    return rows, time.perf_counter() - t0
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--jobs", type=int, default=200)
+    ap.add_argument("--latency", type=float, default=0.1, help="seconds the fixture server waits per request")
+    ap.add_argument("--concurrency", type=int, default=16)
+    args = ap.parse_args(argv)
+
+    server = serve(args.jobs, args.latency)
+    base_url = f"http://127.0.0.1:{server.server_port}/jobs"
+    try:
+        rows, _ = run(base_url, min(args.jobs, 20), 1)   # sanity check the parse
+        assert rows[0][0] == f"{_TITLES[0]} 0" and rows[0][4].startswith("Full description"), rows[0]
+        assert rows[1][4] == "Build & ship service #1" and rows[1][3] == "$81,000 a year", rows[1]
+
+        details = sum(1 for i in range(args.jobs) if i % 3 == 0)
+        requests = -(-args.jobs // se.PAGE_SIZE) + details
+        print(f"{args.jobs} jobs, {requests} requests, {args.latency * 1e3:.0f} ms server latency")
+        print(f"old Selenium waits alone: ~{-(-args.jobs // se.PAGE_SIZE) * 4 + details * 2:,} s")
+        for conc in (1, args.concurrency):
+            rows, secs = run(base_url, args.jobs, conc)
+            assert len(rows) == args.jobs and all(r[4] for r in rows)
+            print(f"concurrency {conc:>3}: {secs:6.2f} s  {len(rows) / secs:8.1f} jobs/s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
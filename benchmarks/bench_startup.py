@@ -0,0 +1,71 @@
+"""Cold-start cost of the Python services: import time and time to the first response.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [--runs 5] [--max-import-ms 300]
+
+Every measurement runs in a fresh interpreter, so nothing is already imported
+or cached in memory (the on-disk dataset cache is, as it would be in a
+deployed worker).  With --max-import-ms the script exits non-zero when a
+median import time is over budget, so it can guard against heavy imports
+creeping back in at module level.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+FUNCTIONS = ROOT / "backend" / "functions"
+
+_TIMER = "import time; t0 = time.perf_counter()\n"
+_REPORT = "\nprint(time.perf_counter() - t0)"
+
+CASES = {
+    "import job_recommendation": (ROOT, "import job_recommendation"),
+    "first recommendation (cold)": (ROOT, "import job_recommendation as jr\njr.recommend_job_objects(3)"),
+    "warm_up()": (ROOT, "import job_recommendation as jr\njr.warm_up()"),
+    "recommendation after warm-up": (
+        ROOT, "import job_recommendation as jr\njr.warm_up()\nt0 = time.perf_counter()\njr.recommend_job_objects(3)"),
+    "import server": (FUNCTIONS, "import server"),
+    "server startup + /health": (
+        FUNCTIONS,
+        "import server\nfrom fastapi.testclient import TestClient\n"
+        "with TestClient(server.app) as c:\n    c.get('/health')"),
+}
+IMPORTS = ("import job_recommendation", "import server")
+
+
+def _run(cwd: Path, code: str) -> float:
+    env = dict(os.environ, OPENAI_API_KEY="bench", EMAIL_USER="bench@example.com", EMAIL_PASS="bench")
+    out = subprocess.run([sys.executable, "-c", _TIMER + code + _REPORT], cwd=cwd, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1]) * 1e3
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--max-import-ms", type=float, default=None, help="fail if a median import exceeds this")
+    args = ap.parse_args()
+
+    _run(ROOT, "import job_recommendation as jr\njr.warm_up()")   # model and dataset cache on disk
+    print(f"{'stage':<30}{'median ms':>11}{'min ms':>9}")
+    over = []
+    for name, (cwd, code) in CASES.items():
+        ms = np.array([_run(cwd, code) for _ in range(args.runs)])
+        print(f"{name:<30}{np.median(ms):11.0f}{ms.min():9.0f}")
+        if args.max_import_ms is not None and name in IMPORTS and np.median(ms) > args.max_import_ms:
+            over.append(name)
+    if over:
+        print(f"over the {args.max_import_ms:.0f} ms import budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
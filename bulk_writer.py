@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json, os, random, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+FIRESTORE_BATCH_LIMIT = 500   # max writes per Firestore batch
+MAX_WORKERS  = 8              # concurrent batch commits
+MAX_ATTEMPTS = 5
+BASE_DELAY   = 0.2            # seconds; doubled per retry, plus jitter
+
+Write = Tuple[str, Dict[str, Any]]   # (document path, data)
+
+# ---------------------------------------------------------------------------
+# BACKENDS
+# ---------------------------------------------------------------------------
+
+class FirestoreBackend:
+    """Commits write batches through the Admin SDK.
+
+    Point ``FIRESTORE_EMULATOR_HOST`` at a local emulator to run against it
+    instead of production.
+    """
+
+    max_batch_size = FIRESTORE_BATCH_LIMIT
+    _RETRYABLE = {"Aborted", "DeadlineExceeded", "InternalServerError",
+                  "ResourceExhausted", "ServiceUnavailable", "TooManyRequests"}
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def db(self):
+        if self._db is None:
+            from job_recommendation import _init_firestore
+            self._db = _init_firestore()
+        return self._db
+
+    def commit(self, writes: Sequence[Write]) -> None:
+        db = self.db
+        batch = db.batch()
+        for path, data in writes:
+            batch.set(db.document(path), data)
+        batch.commit()
+
+    def retryable(self, exc: Exception) -> bool:
+        return type(exc).__name__ in self._RETRYABLE or isinstance(exc, (ConnectionError, TimeoutError))
+
+
+class MemoryBackend:
+    """In-process stand-in: documents land in ``self.docs`` keyed by path."""
+
+    def __init__(self, max_batch_size: int = FIRESTORE_BATCH_LIMIT):
+        self.max_batch_size = max_batch_size
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.commits = 0
+        self._lock = threading.Lock()
+
+    def commit(self, writes: Sequence[Write]) -> None:
+        with self._lock:
+            for path, data in writes:
+                self.docs[path] = data
+            self.commits += 1
+
+    def retryable(self, exc: Exception) -> bool:
+        return True
+
+class JsonlBackend:
+    """Local file sink: one ``{"path": ..., "data": ...}`` line per document write."""
+
+    max_batch_size = 10_000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def commit(self, writes: Sequence[Write]) -> None:
+        lines = "".join(json.dumps({"path": p, "data": d}, ensure_ascii=False, default=str) + "\n"
+                        for p, d in writes)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def position(self) -> int:
+        """Current size of the file; pass it to ``truncate`` to drop later writes."""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def truncate(self, position: int) -> None:
+        with self._lock:
+            if self.position() > position:
+                os.truncate(self.path, position)
+
+    def retryable(self, exc: Exception) -> bool:
+        return False
+
+# ---------------------------------------------------------------------------
+# PACKING
+# ---------------------------------------------------------------------------
+
+def recommendation_path(uid: str, job: Dict[str, Any]) -> str:
+    return f"users/{uid}/recommendation/{job['id']}"
+
+
+def _coalesce(jobs_by_user: Mapping[str, Iterable[Dict[str, Any]]]) -> Dict[str, List[Write]]:
+    """Per-user writes with repeated document paths collapsed (last write wins)."""
+    out: Dict[str, List[Write]] = {}
+    for uid, jobs in jobs_by_user.items():
+        docs = {recommendation_path(uid, job): job for job in jobs}
+        out[uid] = list(docs.items())
+    return out
+
+
+def _pack(writes_by_user: Mapping[str, List[Write]], limit: int) -> List[Tuple[List[str], List[Write]]]:
+    """Greedily fill batches of up to *limit* writes without splitting a user,
+    unless one user alone exceeds the limit."""
+    batches: List[Tuple[List[str], List[Write]]] = []
+    uids: List[str] = []
+    cur: List[Write] = []
+    for uid, writes in writes_by_user.items():
+        if len(writes) > limit:
+            for i in range(0, len(writes), limit):
+                batches.append(([uid], writes[i:i + limit]))
+            continue
+        if len(cur) + len(writes) > limit:
+            batches.append((uids, cur))
+            uids, cur = [], []
+        uids.append(uid)
+        cur.extend(writes)
+    if cur:
+        batches.append((uids, cur))
+    return batches
+
+# ---------------------------------------------------------------------------
+# BULK PUSH
+# ---------------------------------------------------------------------------
+
+def _commit_with_retry(backend, writes: Sequence[Write], max_attempts: int, base_delay: float) -> None:
+    """Commit one batch, re-raising the last error once retries are exhausted."""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            backend.commit(writes)
+            return
+        except Exception as e:
+            if attempt == max_attempts or not backend.retryable(e):
+                raise
+            time.sleep(base_delay * 2 ** (attempt - 1) * (1 + random.random()))
+
+
+def push_bulk(
+    jobs_by_user: Mapping[str, Iterable[Dict[str, Any]]],
+    backend=None,
+    *,
+    max_workers: int = MAX_WORKERS,
+    max_attempts: int = MAX_ATTEMPTS,
+    base_delay: float = BASE_DELAY,
+) -> Dict[str, Dict[str, Any]]:
+    """Write ``users/{uid}/recommendation/{jobId}`` docs for many users at once.
+
+    Writes are coalesced, packed into batches of up to the backend's batch
+    limit and committed concurrently by at most *max_workers* threads, each
+    batch retried with exponential backoff. Returns per-user outcomes:
+    ``{uid: {"ok": bool, "jobs": int, "error": str | None}}``.
+    """
+    backend = backend if backend is not None else FirestoreBackend()
+    writes_by_user = _coalesce(jobs_by_user)
+    results = {uid: {"ok": True, "jobs": len(w), "error": None}
+               for uid, w in writes_by_user.items()}
+    batches = _pack(writes_by_user, backend.max_batch_size)
+    if not batches:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+        futures = {pool.submit(_commit_with_retry, backend, writes, max_attempts, base_delay): uids
+                   for uids, writes in batches}
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+            except Exception as e:
+                for uid in futures[fut]:
+                    results[uid]["ok"] = False
+                    results[uid]["error"] = f"{type(e).__name__}: {e}"
+    return results
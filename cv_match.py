@@ -0,0 +1,461 @@
+"""CV → job matching: a sparse retrieval index over the job catalog.
+
+Job texts (title, industry, skills, description, and the full summary of
+scraped postings) are hashed into unigram+bigram vectors, so there is no
+vocabulary to refit and postings can be added or removed one at a time.
+Term weights are log-tf × idf.  Document frequencies are kept as counts and
+idf is applied at query time, so it follows additions without reindexing;
+removals only tombstone a row until the next compaction recounts.
+
+Search is term-at-a-time over a term-major (postings) CSR matrix: only the
+posting lists of the CV's terms are read (a few ms at 100k postings; see
+benchmarks/bench_cv_match.py).  Past that, QUERY_MAX_DF skips the longest
+lists, and an optional IVF structure (spherical k-means with sparse
+centroids) stores rows cluster-contiguously on disk, so a query reads NPROBE
+clusters through a memory map instead of every posting list.
+
+    python cv_match.py cv.pdf --top 10          # or a .txt file, or /parse-cv JSON
+"""
+from __future__ import annotations
+
+import argparse, json, os, shutil, sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+
+import job_recommendation as jr
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+N_FEATURES    = 1 << 20
+QUERY_MAX_DF  = float(os.getenv("NEOMIND_MATCH_MAX_DF", "1.0"))     # skip query terms in more rows than this
+CANDIDATES    = 200          # retrieved per CV before blending with aiScore
+BLEND_WEIGHT  = float(os.getenv("NEOMIND_MATCH_WEIGHT", "0.5"))     # 0 = model only, 1 = CV match only
+COMPACT_AT    = 0.2          # merge pending rows / drop removed ones past this fraction of the index
+ANN_MIN_DOCS  = int(os.getenv("NEOMIND_MATCH_ANN_DOCS", "0"))       # build the IVF from this many rows up; 0 = never
+ANN_TERMS     = 256          # nonzeros kept per centroid
+NPROBE        = 8
+INDEX_DIR     = os.getenv("NEOMIND_MATCH_INDEX", ".match_index")
+TOKEN_PATTERN = r"(?u)\b\w[\w+#]*(?:\.\w+)*"    # keeps c++, c#, node.js
+TEXT_COLUMNS  = ["position", "primary_position", "industry", "type", "skills", "skills", "description", "summary"]
+
+_vectorizer = HashingVectorizer(n_features=N_FEATURES, ngram_range=(1, 2), token_pattern=TOKEN_PATTERN,
+                                alternate_sign=False, norm=None, dtype=np.float32)
+
+
+def _tf(texts: Sequence[str]) -> sp.csr_matrix:
+    """Sublinear term frequencies, one row per text."""
+    X = _vectorizer.transform(texts)
+    X.sum_duplicates()
+    np.log(X.data, out=X.data)
+    X.data += 1.0
+    return X
+
+
+def _hashes(texts: Sequence[str]) -> np.ndarray:
+    return pd.util.hash_array(np.asarray(texts, dtype=object)).astype(np.uint64)
+
+# ---------------------------------------------------------------------------
+# IVF (approximate search)
+# ---------------------------------------------------------------------------
+
+def _unit_rows(X: sp.csr_matrix) -> sp.csr_matrix:
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix(sp.diags(1.0 / norms).astype(np.float32) @ X)
+
+
+def _assign(W: sp.csr_matrix, C: sp.csr_matrix, chunk: int = 8192) -> np.ndarray:
+    Ct = C.T.tocsc()
+    return np.concatenate([np.asarray((W[i:i + chunk] @ Ct).toarray().argmax(axis=1)).ravel()
+                           for i in range(0, W.shape[0], chunk)])
+
+
+def _truncate(C: sp.csr_matrix, keep: int) -> sp.csr_matrix:
+    """Keep the *keep* largest weights of every centroid."""
+    rows = []
+    for i in range(C.shape[0]):
+        lo, hi = C.indptr[i], C.indptr[i + 1]
+        idx, val = C.indices[lo:hi], C.data[lo:hi]
+        if len(val) > keep:
+            top = np.argpartition(-val, keep - 1)[:keep]
+            idx, val = idx[top], val[top]
+        rows.append(sp.csr_matrix((val, (np.zeros(len(idx), dtype=np.int64), idx)), shape=(1, C.shape[1])))
+    return _unit_rows(sp.vstack(rows, format="csr"))
+
+
+class IVF:
+    """Inverted-file ANN: unit tf-idf rows grouped by nearest centroid, each group contiguous."""
+
+    __slots__ = ("centroids", "offsets", "order", "rows")
+
+    def __init__(self, centroids: sp.csr_matrix, offsets: np.ndarray, order: np.ndarray, rows: sp.csr_matrix):
+        self.centroids = centroids   # (n_lists, F) sparse, unit length
+        self.offsets = offsets       # group g is rows[offsets[g]:offsets[g + 1]]
+        self.order = order           # index position of every stored row
+        self.rows = rows
+
+    @classmethod
+    def build(cls, W: sp.csr_matrix, n_lists: int | None = None, iters: int = 4, seed: int = 0) -> "IVF":
+        """Spherical k-means over the unit rows *W*; centroids stay sparse (ANN_TERMS nonzeros)."""
+        n = W.shape[0]
+        n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        C = _truncate(W[rng.choice(n, n_lists, replace=False)], ANN_TERMS)
+        for _ in range(iters + 1):
+            labels = _assign(W, C)
+            if _ == iters:
+                break
+            members = sp.csr_matrix((np.ones(n, dtype=np.float32), (labels, np.arange(n))), shape=(n_lists, n))
+            sums = members @ W
+            empty = np.diff(sums.indptr) == 0
+            if empty.any():              # keep the old centroid of a cluster that lost every member
+                sums = sp.vstack([C[i] if empty[i] else sums[i] for i in range(n_lists)], format="csr")
+            C = _truncate(sums, ANN_TERMS)
+        order = np.argsort(labels, kind="stable")
+        offsets = np.searchsorted(labels[order], np.arange(n_lists + 1))
+        return cls(C, offsets, order, W[order])
+
+    def search(self, q: np.ndarray, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Index positions and scores of the rows in the *nprobe* groups nearest to dense query *q*."""
+        near = self.centroids @ q
+        probe = np.argsort(-near)[:nprobe]
+        pos, scores = [], []
+        for g in probe.tolist():
+            lo, hi = int(self.offsets[g]), int(self.offsets[g + 1])
+            if hi > lo:
+                pos.append(self.order[lo:hi])
+                scores.append(self.rows[lo:hi] @ q)
+        if not pos:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return np.concatenate(pos), np.concatenate(scores)
+
+# ---------------------------------------------------------------------------
+# INDEX
+# ---------------------------------------------------------------------------
+
+class MatchIndex:
+    """Hashed TF-IDF index over job texts, searchable by CV text and updatable in place.
+
+    Rows ``0..n_main-1`` live in the term-major ``postings`` matrix; rows added
+    since the last compaction are kept doc-major in ``pending`` and scored
+    exactly on every search.  Removed rows are masked by ``alive``.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.hashes = np.zeros(0, dtype=np.uint64)      # text hash per row (for sync)
+        self.norms = np.zeros(0, dtype=np.float32)      # ||tf * idf|| per row, idf as of indexing
+        self.alive = np.zeros(0, dtype=bool)
+        self.df = np.zeros(N_FEATURES, dtype=np.int64)
+        self.postings = sp.csr_matrix((N_FEATURES, 0), dtype=np.float32)
+        self.pending = sp.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self.ann: IVF | None = None
+        self.use_ann = False
+        self._pos_of: Dict[str, int] = {}
+        self._idf: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self._pos_of)
+
+    @property
+    def n_main(self) -> int:
+        return self.postings.shape[1]
+
+    def idf(self) -> np.ndarray:
+        if self._idf is None:
+            self._idf = (np.log((1.0 + len(self)) / (1.0 + self.df)) + 1.0).astype(np.float32)
+        return self._idf
+
+    # -- updates ---------------------------------------------------------------
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]) -> None:
+        """Index *texts* under *ids*; an id that is already indexed is replaced."""
+        ids = list(ids)
+        self.remove([i for i in ids if i in self._pos_of])
+        X = _tf(texts)
+        self.df += np.bincount(X.indices, minlength=N_FEATURES)
+        self._idf = None
+        W = X.copy()
+        W.data *= self.idf()[W.indices]
+        norms = np.sqrt(np.asarray(W.multiply(W).sum(axis=1)).ravel()).astype(np.float32)
+        norms[norms == 0] = 1.0
+        start = len(self.ids)
+        self.ids.extend(ids)
+        self._pos_of.update((job_id, start + i) for i, job_id in enumerate(ids))
+        self.hashes = np.concatenate([self.hashes, _hashes(texts)])
+        self.norms = np.concatenate([self.norms, norms])
+        self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+        self.pending = sp.vstack([self.pending, X], format="csr")
+        self._maybe_compact()
+
+    def remove(self, ids: Iterable[str]) -> None:
+        for job_id in ids:
+            pos = self._pos_of.pop(job_id, None)
+            if pos is not None:
+                self.alive[pos] = False
+        self._maybe_compact()
+
+    def sync(self, ids: Sequence[str], texts: Sequence[str]) -> int:
+        """Make the index hold exactly ``ids → texts``; re-indexes only what changed."""
+        hashes = _hashes(texts)
+        wanted = dict(zip(ids, range(len(ids))))
+        gone = [job_id for job_id in self._pos_of if job_id not in wanted]
+        changed = [i for job_id, i in wanted.items()
+                   if job_id not in self._pos_of or self.hashes[self._pos_of[job_id]] != hashes[i]]
+        self.remove(gone)
+        if changed:
+            self.add([ids[i] for i in changed], [texts[i] for i in changed])
+        return len(gone) + len(changed)
+
+    def _maybe_compact(self) -> None:
+        stale = self.pending.shape[0] + (len(self.ids) - len(self))
+        if stale > COMPACT_AT * max(len(self.ids), 1) and stale > 256:
+            self.compact()
+
+    def compact(self) -> None:
+        """Merge pending rows into the postings, drop removed rows, recount df and rebuild the IVF."""
+        keep = np.flatnonzero(self.alive)
+        docs = sp.vstack([self.postings.T.tocsr(), self.pending], format="csr")[keep]
+        docs.sort_indices()
+        self.ids = [self.ids[i] for i in keep.tolist()]
+        self._pos_of = {job_id: i for i, job_id in enumerate(self.ids)}
+        self.hashes = self.hashes[keep]
+        self.alive = np.ones(len(keep), dtype=bool)
+        self.df = np.bincount(docs.indices, minlength=N_FEATURES).astype(np.int64)
+        self._idf = None
+        W = docs.copy()
+        W.data *= self.idf()[W.indices]
+        norms = np.sqrt(np.asarray(W.multiply(W).sum(axis=1)).ravel()).astype(np.float32)
+        norms[norms == 0] = 1.0
+        self.norms = norms
+        self.postings = docs.T.tocsr()
+        self.pending = sp.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self.ann = None
+        if (self.use_ann or (ANN_MIN_DOCS and len(self) >= ANN_MIN_DOCS)) and len(self):
+            self.build_ann(W=_unit_rows(W))
+
+    def build_ann(self, n_lists: int | None = None, *, W: sp.csr_matrix | None = None) -> None:
+        """Cluster the compacted rows for approximate search (rebuilt by every later compaction)."""
+        self.use_ann = True
+        if self.pending.shape[0] or len(self) != self.n_main:
+            self.compact()
+            return
+        if W is None:
+            W = self.postings.T.tocsr()
+            W.data *= self.idf()[W.indices]
+            W = _unit_rows(W)
+        self.ann = IVF.build(W, n_lists)
+
+    # -- search ----------------------------------------------------------------
+
+    def query_vector(self, text: str, max_df: float = QUERY_MAX_DF) -> Tuple[np.ndarray, np.ndarray]:
+        """Feature ids and unit tf-idf weights of *text*'s indexed terms.
+
+        Terms in more than *max_df* of the rows are dropped: their posting
+        lists are the longest to read and, at that idf, move scores the least.
+        """
+        q = _tf([text])
+        t = q.indices
+        df = self.df[t]
+        keep = (df > 0) & (df <= max(max_df, 0.0) * len(self)) if max_df < 1 else df > 0
+        t, w = t[keep], q.data[keep] * self.idf()[t[keep]]
+        norm = np.linalg.norm(w)
+        return t, (w / norm if norm else w)
+
+    def search(self, text: str, k: int = 10, *, max_df: float = QUERY_MAX_DF,
+               nprobe: int | None = NPROBE) -> Tuple[List[str], np.ndarray]:
+        """Ids and cosine scores of the *k* rows closest to *text*, best first.
+
+        ``nprobe=None`` (or an index without IVF) searches every posting list.
+        """
+        t, w = self.query_vector(text, max_df)
+        if len(t) == 0 or len(self) == 0:
+            return [], np.zeros(0, dtype=np.float32)
+        if self.ann is not None and nprobe:
+            q = np.zeros(N_FEATURES, dtype=np.float32)
+            q[t] = w
+            pos, scores = self.ann.search(q, nprobe)
+        else:
+            wd = w * self.idf()[t]
+            scores = self.postings[t].T @ wd / self.norms[:self.n_main]
+            pos = np.arange(self.n_main)
+        if self.pending.shape[0]:
+            q_idf = np.zeros(N_FEATURES, dtype=np.float32)
+            q_idf[t] = w * self.idf()[t]
+            pending_scores = self.pending @ q_idf / self.norms[self.n_main:]
+            pos = np.concatenate([pos, np.arange(self.n_main, len(self.ids))])
+            scores = np.concatenate([scores, pending_scores])
+        live = self.alive[pos] & (scores > 0)
+        pos, scores = pos[live], scores[live]
+        if k < len(pos):
+            top = np.argpartition(-scores, k - 1)[:k]
+            pos, scores = pos[top], scores[top]
+        best = np.argsort(-scores, kind="stable")
+        return [self.ids[i] for i in pos[best].tolist()], scores[best]
+
+    # -- persistence -----------------------------------------------------------
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Write the compacted index to directory *path* (replaced atomically)."""
+        if self.pending.shape[0] or len(self) != self.n_main:
+            self.compact()
+        path = Path(path)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        arrays = {"norms": self.norms, "hashes": self.hashes, "df": self.df,
+                  "postings.indptr": self.postings.indptr, "postings.indices": self.postings.indices,
+                  "postings.data": self.postings.data}
+        if self.ann is not None:
+            C = self.ann.centroids
+            arrays.update({"ann.offsets": self.ann.offsets, "ann.order": self.ann.order,
+                           "ann.rows.indptr": self.ann.rows.indptr, "ann.rows.indices": self.ann.rows.indices,
+                           "ann.rows.data": self.ann.rows.data, "ann.centroids.indptr": C.indptr,
+                           "ann.centroids.indices": C.indices, "ann.centroids.data": C.data})
+        for name, arr in arrays.items():
+            np.save(tmp / f"{name}.npy", np.asarray(arr))
+        (tmp / "meta.json").write_text(json.dumps({"n_features": N_FEATURES, "ids": self.ids,
+                                                   "n_lists": None if self.ann is None else C.shape[0]}))
+        old = path.with_name(f"{path.name}.{os.getpid()}.old")
+        if path.exists():
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "MatchIndex":
+        """Open an index written by :meth:`save`; the large arrays stay memory-mapped."""
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        if meta["n_features"] != N_FEATURES:
+            raise ValueError(f"{path} was built with {meta['n_features']} features")
+
+        def arr(name: str, mmap: bool = True) -> np.ndarray:
+            return np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None)
+
+        def csr(name: str, shape: Tuple[int, int]) -> sp.csr_matrix:
+            return sp.csr_matrix((arr(f"{name}.data"), arr(f"{name}.indices"), arr(f"{name}.indptr")),
+                                 shape=shape, copy=False)
+
+        index = cls()
+        index.ids = list(meta["ids"])
+        index._pos_of = {job_id: i for i, job_id in enumerate(index.ids)}
+        index.hashes = arr("hashes", mmap=False)
+        index.norms = arr("norms", mmap=False)
+        index.df = arr("df", mmap=False)
+        index.alive = np.ones(len(index.ids), dtype=bool)
+        index.postings = csr("postings", (N_FEATURES, len(index.ids)))
+        if meta.get("n_lists"):
+            index.use_ann = True
+            index.ann = IVF(csr("ann.centroids", (meta["n_lists"], N_FEATURES)), arr("ann.offsets", mmap=False),
+                            arr("ann.order", mmap=False), csr("ann.rows", (len(index.ids), N_FEATURES)))
+        return index
+
+    @classmethod
+    def open(cls, path: str | os.PathLike) -> "MatchIndex":
+        try:
+            return cls.load(path)
+        except (OSError, ValueError, KeyError):
+            return cls()
+
+# ---------------------------------------------------------------------------
+# CATALOG
+# ---------------------------------------------------------------------------
+
+def job_texts(df: pd.DataFrame) -> List[str]:
+    """Searchable text per catalog row (skills twice: they carry the most signal)."""
+    text = pd.Series("", index=df.index, dtype=object)
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            text = text + " . " + df[col].astype(object).where(df[col].notna(), "").astype(str)
+    return text.tolist()
+
+
+def cv_query_text(cv: str | Mapping[str, Any]) -> str:
+    """Query text for a CV: plain text, or the ``/parse-cv`` JSON (its skills are weighted up)."""
+    if isinstance(cv, str):
+        return cv
+    skills = " . ".join(cv.get("skills") or ())
+    return f"{skills} . {skills} . {cv.get('text') or ''}"
+
+
+@lru_cache(maxsize=1)
+def _catalog_index() -> MatchIndex:
+    """The catalog's index, loaded from INDEX_DIR and synced with the current prediction rows."""
+    index = MatchIndex.open(INDEX_DIR)
+    if index.sync(jr._catalog().ids, job_texts(jr._pred_df())):
+        index.save(INDEX_DIR)
+    return index
+
+
+def match_scores(cv: str | Mapping[str, Any], *, candidates: int = CANDIDATES) -> np.ndarray:
+    """CV similarity per catalog row, scaled so the best match is 1 (0 outside the top *candidates*)."""
+    cat = jr._catalog()
+    ids, sims = _catalog_index().search(cv_query_text(cv), candidates)
+    positions, values = cat.resolve(zip(ids, sims.tolist()))
+    out = np.zeros(len(cat), dtype=np.float64)
+    out[positions] = values
+    best = out.max() if len(out) else 0.0
+    return out / best if best > 0 else out
+
+
+def blend(match: np.ndarray, ai: np.ndarray, weight: float = BLEND_WEIGHT) -> np.ndarray:
+    return weight * match + (1.0 - weight) * ai
+
+
+def matched_job_objects(
+    cv: str | Mapping[str, Any],
+    n: int = 3,
+    *,
+    weight: float = BLEND_WEIGHT,
+    shown: Iterable[str] | None = None,
+    randomize: bool = False,
+) -> List[Dict[str, Any]]:
+    """Jobs ranked by CV match blended with the model score; objects carry both scores."""
+    cat, ai = jr._catalog(), jr._scores()
+    match = match_scores(cv)
+    blended = blend(match, ai, weight)
+    excluded = cat.exclusion_mask(shown or ())
+    picks = jr._weighted_sample(blended, excluded, n) if randomize else jr._top_k(blended, excluded, n)
+    jobs = []
+    for pos in picks.tolist():
+        job = cat.job_object(pos, ai[pos])
+        job["matchScore"] = round(float(match[pos]), 3)
+        jobs.append(job)
+    return jobs
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _read_cv(path: str) -> str | Dict[str, Any]:
+    p = Path(path)
+    if p.suffix.lower() == ".json":
+        return json.loads(p.read_text(encoding="utf-8"))
+    if p.suffix.lower() == ".pdf":
+        sys.path.insert(0, str(Path(__file__).resolve().parent / "backend" / "functions" / "src"))
+        from pdf_extract import parse_pdf
+        return parse_pdf(p.read_bytes(), max_bytes=sys.maxsize, max_pages=sys.maxsize)   # local file: no upload limits
+    return p.read_text(encoding="utf-8")
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("cv", help="CV as .pdf, .txt, or /parse-cv .json")
+    ap.add_argument("--top", type=int, default=5)
+    ap.add_argument("--weight", type=float, default=BLEND_WEIGHT, help="CV match share of the ranking score")
+    args = ap.parse_args(argv)
+    for job in matched_job_objects(_read_cv(args.cv), args.top, weight=args.weight):
+        print(f"{job['matchScore']:.3f} match  {job['aiScore']:.3f} ai  {job['position']} @ {job['company']}"
+              f"  [{', '.join(job['skills'])}]")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
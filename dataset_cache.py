@@ -0,0 +1,128 @@
+"""Columnar on-disk cache for the Excel datasets.
+
+``training.xlsx`` / ``prediction.xlsx`` stay the import source; the first load
+converts them to an uncompressed Arrow IPC (Feather v2) file that later loads
+memory-map instead of re-parsing Excel.  Cache entries are keyed by a content
+hash of the source, with the source's mtime/size remembered so the hash is
+only recomputed when the file actually changes.
+
+Pre-convert (e.g. at image build time):
+    python dataset_cache.py training.xlsx prediction.xlsx
+"""
+from __future__ import annotations
+
+import hashlib, json, os, sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # fall back to pickled frames (no mmap)
+    pa = feather = None
+
+if TYPE_CHECKING:  # pandas itself is imported on first read, not at import time
+    import pandas as pd
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+CACHE_DIR = os.getenv("NEOMIND_DATA_CACHE", ".data_cache")
+_SUFFIX   = ".arrow" if pa is not None else ".pkl"
+
+# ---------------------------------------------------------------------------
+# CACHE KEYS
+# ---------------------------------------------------------------------------
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _meta_path(src: Path) -> Path:
+    # same-named sources in different directories must not share an entry
+    where = hashlib.sha256(str(src.resolve()).encode()).hexdigest()[:12]
+    return Path(CACHE_DIR) / f"{src.name}.{where}.meta.json"
+
+
+def _read_meta(src: Path) -> Dict[str, object]:
+    try:
+        return json.loads(_meta_path(src).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def cache_path(source: str | os.PathLike) -> Path:
+    """Columnar cache file for *source*; hashes the source only if its mtime/size changed."""
+    src = Path(source)
+    st = src.stat()
+    meta = _read_meta(src)
+    if meta.get("mtime_ns") == st.st_mtime_ns and meta.get("size") == st.st_size:
+        digest = str(meta["sha256"])
+    else:
+        digest = _sha256(src)
+        Path(CACHE_DIR).mkdir(parents=True, exist_ok=True)
+        _atomic_write_text(_meta_path(src), json.dumps(
+            {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}))
+    return Path(CACHE_DIR) / f"{src.stem}-{digest[:16]}{_SUFFIX}"
+
+# ---------------------------------------------------------------------------
+# CONVERT & LOAD
+# ---------------------------------------------------------------------------
+
+def _read_source(src: Path) -> pd.DataFrame:
+    import pandas as pd
+    if src.suffix.lower() in (".xlsx", ".xls"):
+        return pd.read_excel(src)
+    if src.suffix.lower() == ".csv":
+        return pd.read_csv(src)
+    if src.suffix.lower() == ".parquet":
+        return pd.read_parquet(src)
+    raise ValueError(f"Unsupported dataset source: {src}")
+
+
+def convert(source: str | os.PathLike) -> Path:
+    """Write the columnar cache for *source* (no-op if it is current)."""
+    dst = cache_path(source)
+    if dst.exists():
+        return dst
+    df = _read_source(Path(source)).reset_index(drop=True)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    if pa is not None:
+        feather.write_feather(df, tmp, compression="uncompressed")
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, dst)
+    return dst
+
+
+def load_frame(source: str | os.PathLike) -> pd.DataFrame:
+    """*source* as a DataFrame, served from the memory-mapped columnar cache."""
+    if Path(source).suffix.lower() in (".arrow", ".feather") and pa is not None:
+        path = Path(source)      # already Arrow IPC (e.g. jobs_etl output): map it directly
+    else:
+        path = convert(source)
+    if pa is None:
+        import pandas as pd
+        return pd.read_pickle(path)
+    with pa.memory_map(str(path)) as mm:
+        table = pa.ipc.open_file(mm).read_all()
+    # numeric columns stay views over the mapped file where Arrow allows it
+    return table.to_pandas(split_blocks=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python dataset_cache.py <dataset.xlsx> [...]")
+        sys.exit(1)
+    for arg in sys.argv[1:]:
+        print(f"{arg} -> {convert(arg)}")
@@ -1,21 +1,21 @@
 from __future__ import annotations
 
-import random, uuid, os
+import ast, copy, random, re, sys, threading, time, uuid, os
 from datetime import datetime, timedelta
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Set, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Tuple
 
-import joblib
 import numpy as np
-import pandas as pd
-from pandas import Timestamp
-from sklearn.compose import ColumnTransformer
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from bulk_writer import push_bulk
+from dataset_cache import load_frame
+
+# pandas, joblib and sklearn are imported where they are first needed, so importing
+# this module stays cheap; warm_up() pays for them (and the model) ahead of requests
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.linear_model import SGDClassifier
 
 firebase_admin = None  # will import later only if function is used
 
@@ -23,10 +23,12 @@ firebase_admin = None  # will import later only if function is used
 # CONFIG
 # ---------------------------------------------------------------------------
 TRAIN_XLSX  = "training.xlsx"
-PREDICT_XLSX = "prediction.xlsx"
+PREDICT_XLSX = os.getenv("NEOMIND_PREDICT_PATH", "prediction.xlsx")   # or jobs_etl output
 TARGET_COL  = "label_recommendable"
 ID_COL      = "firm_name"
 MODEL_PATH  = "model.joblib"
+SGD_ALPHA   = 1e-4    # incremental updates: L2 strength
+SGD_ETA0    = 0.01    # incremental updates: constant step size
 
 # ---------------------------------------------------------------------------
 # TRAIN & CACHE
@@ -35,7 +37,14 @@ MODEL_PATH  = "model.joblib"
 def _train_and_save_model() -> None:
     if Path(MODEL_PATH).exists():
         return
-    df = pd.read_excel(TRAIN_XLSX)
+    from sklearn.compose import ColumnTransformer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import classification_report
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    df = load_frame(TRAIN_XLSX)
     if TARGET_COL not in df.columns:
         raise ValueError(f"Missing {TARGET_COL} in {TRAIN_XLSX}")
 
@@ -55,43 +64,175 @@ def _train_and_save_model() -> None:
 
     X_tr, X_val, y_tr, y_val = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
     pipe.fit(X_tr, y_tr)
-    joblib.dump(pipe, MODEL_PATH)
+    _publish_model(pipe)
     print("[job_rec] validation\n", classification_report(y_val, pipe.predict(X_val)))
 
-@lru_cache(maxsize=1)
-def _load_model():
+def _publish_model(pipe) -> None:
+    """Atomically replace MODEL_PATH, so readers never see a partial file."""
+    import joblib
+    tmp = f"{MODEL_PATH}.{os.getpid()}.tmp"
+    joblib.dump(pipe, tmp)
+    os.replace(tmp, MODEL_PATH)
+
+def _model_version() -> Tuple[int, int, int]:
+    """Identity of the currently published model file (changes on publish)."""
     if not Path(MODEL_PATH).exists():
         _train_and_save_model()
+    st = os.stat(MODEL_PATH)
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+def _load_model():
+    """Current model; hot-swapped when a new version is published."""
+    return _load_model_at(_model_version())
+
+@lru_cache(maxsize=1)
+def _load_model_at(version: Tuple[int, int, int]):
+    import joblib
     return joblib.load(MODEL_PATH)
 
 @lru_cache(maxsize=1)
 def _pred_df() -> pd.DataFrame:
-    return pd.read_excel(PREDICT_XLSX)
+    return load_frame(PREDICT_XLSX)
+
+def _features(df: pd.DataFrame) -> pd.DataFrame:
+    return df.drop(columns=[ID_COL]) if ID_COL in df.columns else df
+
+def _scores() -> np.ndarray:
+    """Model score per prediction row, aligned with catalog positions."""
+    return _scores_at(_model_version())
+
+@lru_cache(maxsize=1)
+def _scores_at(version: Tuple[int, int, int]) -> np.ndarray:
+    pipe = _load_model_at(version)
+    Xp = _features(_pred_df())
+    return np.ascontiguousarray(pipe.predict_proba(Xp)[:, 1], dtype=np.float64)
+
+def _ranking() -> np.ndarray:
+    """Row positions ordered by descending score (computed once per model version)."""
+    return _ranking_at(_model_version())
 
 @lru_cache(maxsize=1)
-def _ranked_scores() -> List[Tuple[str, float]]:
-    pipe = _load_model()
-    df  = _pred_df()
-    names = df[ID_COL] if ID_COL in df.columns else pd.Series(range(len(df)))
-    Xp = df.drop(columns=[ID_COL]) if ID_COL in df.columns else df
-    scores = pipe.predict_proba(Xp)[:, 1]
-    return sorted(zip(names, scores), key=lambda x: x[1], reverse=True)
+def _ranking_at(version: Tuple[int, int, int]) -> np.ndarray:
+    return np.argsort(-_scores_at(version), kind="stable")
+
+# ---------------------------------------------------------------------------
+# INCREMENTAL UPDATES
+# ---------------------------------------------------------------------------
+_update_lock = threading.Lock()
+
+
+def _class_weight(model) -> Dict[Any, float] | None:
+    """*model*'s ``class_weight`` as a dict SGD's partial_fit accepts.
+
+    ``"balanced"`` is resolved against the training labels, i.e. the weights
+    the model was originally fitted with.
+    """
+    weight = getattr(model, "class_weight", None)
+    if weight != "balanced":
+        return weight
+    from sklearn.utils.class_weight import compute_class_weight
+    y = load_frame(TRAIN_XLSX)[TARGET_COL].astype(int).to_numpy()
+    return dict(zip(model.classes_.tolist(), compute_class_weight("balanced", classes=model.classes_, y=y).tolist()))
+
+
+def _as_sgd(model, n_features: int) -> SGDClassifier:
+    """*model* if it already supports partial_fit, else an SGD warm-started from its weights.
+
+    The class weighting carries over, so online updates keep the class balance
+    the model was trained with.
+    """
+    if hasattr(model, "partial_fit"):
+        return model
+    from sklearn.linear_model import SGDClassifier
+    sgd = SGDClassifier(loss="log_loss", alpha=SGD_ALPHA, learning_rate="constant", eta0=SGD_ETA0,
+                        class_weight=_class_weight(model))
+    # a zero-weight sample allocates the solver state; then adopt the fitted weights
+    sgd.partial_fit(np.zeros((1, n_features)), model.classes_[:1], classes=model.classes_, sample_weight=np.zeros(1))
+    sgd.coef_ = np.array(model.coef_, dtype=np.float64)
+    sgd.intercept_ = np.array(model.intercept_, dtype=np.float64)
+    return sgd
+
+
+def update_model(events: Iterable[Tuple[str, int]]) -> int:
+    """Apply one mini-batch of labelled ``(jobId, label)`` events and publish it.
+
+    Labels are 1 for a right swipe or an application and 0 for a left swipe.
+    The preprocessing step stays frozen; only the classifier takes a
+    ``partial_fit`` step (a LogisticRegression model is converted to an
+    equivalent SGDClassifier, class weights included, on first use). The
+    new version is published atomically and picked up by ``_load_model`` on
+    its next call.
+    Returns the number of events that matched a catalog row.
+    """
+    positions, labels = _catalog().resolve(events)
+    if not positions:
+        return 0
+    with _update_lock:
+        pipe = copy.deepcopy(_load_model())
+        prep = pipe.named_steps["prep"]
+        Xt = prep.transform(_features(_pred_df()).iloc[positions])
+        model = _as_sgd(pipe.named_steps["model"], Xt.shape[1])
+        model.partial_fit(Xt, np.asarray(labels, dtype=int))
+        pipe.steps[-1] = ("model", model)
+        _publish_model(pipe)
+    return len(positions)
 
 # ---------------------------------------------------------------------------
 # JS/TS‑friendly job‑object builder
 # ---------------------------------------------------------------------------
 
-def _to_list(value: Any) -> List[str]:
-    if isinstance(value, str):
+_LIST_SEP = re.compile(r"\s*[,;|]\s*")
+
+
+def _parse_list(text: str) -> Tuple[Any, ...]:
+    """Parse a list-valued cell without executing it.
+
+    Handles Python list/tuple literals as written to the spreadsheets
+    (``"['Python', 'Django']"``, ``"[1, 9]"``) and plain delimited text
+    (``"Python, Django"``, ``"a; b | c"``).
+    """
+    s = text.strip()
+    if not s:
+        return ()
+    if s[0] in "[(":
         try:
-            parsed = eval(value)
-            return list(parsed) if isinstance(parsed, (list, tuple)) else [value]
-        except Exception:
-            return [value]
+            parsed = ast.literal_eval(s)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            parsed = None
+        if isinstance(parsed, (list, tuple, set)):
+            return tuple(sys.intern(x) if isinstance(x, str) else x for x in parsed)
+        s = s.strip("[]()")
+    parts = (p.strip("'\" ") for p in _LIST_SEP.split(s))
+    return tuple(sys.intern(p) for p in parts if p)
+
+
+def _to_list(value: Any) -> List[Any]:
+    if isinstance(value, str):
+        return list(_parse_list(value))
     if isinstance(value, (list, tuple, set)):
         return list(value)
+    import pandas as pd
     return [] if pd.isna(value) else [str(value)]
 
+
+def _list_column(values: List[Any], convert: Callable[[Tuple[Any, ...]], Tuple[Any, ...]] = tuple) -> List[Tuple[Any, ...]]:
+    """Parse a list-valued column once per distinct cell; equal cells share one tuple."""
+    parsed: Dict[str, Tuple[Any, ...]] = {}
+    out: List[Tuple[Any, ...]] = []
+    for v in values:
+        if isinstance(v, str):
+            t = parsed.get(v)
+            if t is None:
+                t = parsed[v] = convert(_parse_list(v))
+        else:
+            t = convert(tuple(_to_list(v)))
+        out.append(t)
+    return out
+
+
+def _experience_range(items: Tuple[Any, ...]) -> Tuple[int, ...]:
+    return tuple(int(x) for x in items[:2])
+
 # pools for random fallback values
 _benefits_pool   = [["Health insurance", "Remote work"], ["Stock options", "Flexible hours"], ["Gym membership", "Learning budget"]]
 _description_pool = [
@@ -132,59 +273,269 @@ def _fill_missing(job: Dict[str, Any]) -> Dict[str, Any]:
     return job
 
 
-def _build_job_object(row: pd.Series | pd.DataFrame, score: float) -> Dict[str, Any]:
-    # duplicates → first row
-    if isinstance(row, pd.DataFrame):
-        row = row.iloc[0]
-
-    def _get(k: str, default: Any = None):
-        return row[k] if k in row and pd.notna(row[k]) else default
-
-    job: Dict[str, Any] = {
-        "id"        : str(uuid.uuid4()),
-        "company"   : _get("firm_name", "Unknown Co"),
-        "name"      : _get("primary_position", "Engineer"),
-        "logo"      : _get("logo"),
-        "industry"  : _get("industry", "Software"),
-        "size"      : str(_get("size", _get("size_employees", "-"))),
-        "location"  : _get("location", "Remote"),
-        "rating"    : _get("rating"),
-        "founded"   : int(_get("founded", _get("founded_year", 2000))),
-        "position"  : _get("primary_position", "Engineer"),
-        "salary"    : _get("salary"),
-        "type"      : _get("type"),
-        "experience": [int(x) for x in _to_list(_get("experience"))[:2]],
-        "skills"    : _to_list(_get("skills")),
-        "description": _get("description"),
-        "benefits"  : _to_list(_get("benefits")),
-        "posted"    : _get("posted"),
-        "createdAt" : _get("createdAt"),
-        "aiScore"   : round(score, 3),
-    }
-
-    return _fill_missing(job)
+# ---------------------------------------------------------------------------
+# JOB CATALOG (built once, indexed by row position)
+# ---------------------------------------------------------------------------
+
+def _column(df: pd.DataFrame, key: str) -> List[Any]:
+    """Column *key* as plain Python values, with NaN/missing mapped to None."""
+    if key not in df.columns:
+        return [None] * len(df)
+    col = df[key].astype(object)
+    return col.where(col.notna(), None).tolist()
+
+
+def _coalesce(*cols: List[Any], default: Any) -> List[Any]:
+    return [next((v for v in vals if v is not None), default) for vals in zip(*cols)]
+
+
+_JOB_ID_NS = uuid.UUID("6f1f7c64-3f0e-4d43-9a8e-2b7c1a0d5e91")
+_JK = re.compile(r"[?&]v?jk=([0-9A-Za-z]+)")
+
+
+def _row_keys(df: pd.DataFrame) -> List[str]:
+    """A key per row that survives re-sorting and regenerating the source file.
+
+    The indeed ``jk`` (jobs_etl output carries it; otherwise parsed from the
+    link), else the link itself, else a hash of the row's content.  Identical
+    rows are told apart by their occurrence number.
+    """
+    import pandas as pd
+    jk = _column(df, "jk")
+    link = _column(df, "link") if "link" in df.columns else _column(df, "Link")
+    content = None
+    keys: List[str] = []
+    seen: Dict[str, int] = {}
+    for pos, (k, url) in enumerate(zip(jk, link)):
+        if k is None and url is not None:
+            m = _JK.search(str(url))
+            k = m.group(1) if m else f"link:{url}"
+        if k is None:
+            if content is None:
+                text = df.astype(object).where(df.notna(), "").astype(str)
+                content = pd.util.hash_pandas_object(text, index=False).to_numpy()
+            k = f"row:{content[pos]:016x}"
+        n = seen[k] = seen.get(k, -1) + 1
+        keys.append(k if n == 0 else f"{k}#{n}")
+    return keys
+
+
+class JobCatalog:
+    """Columnar, read-only view of the prediction frame.
+
+    Every field a job object needs is stored as a plain list indexed by row
+    position, with list-valued columns already parsed and fallbacks applied,
+    so building a job costs a few list lookups instead of a ``set_index``
+    copy and ``pd.Series`` access per row.
+    """
+
+    __slots__ = ("names", "ids", "codes", "_code_of", "_pos_of_id", "_cols")
+
+    def __init__(self, names: List[str], cols: Dict[str, List[Any]], keys: List[str]):
+        self.names = names
+        self._cols = cols
+        # ids follow the row's key rather than its position, so stored swipes,
+        # model labels and cv_match entries keep pointing at the same job when
+        # the source file is regenerated or re-sorted
+        self.ids = [str(uuid.uuid5(_JOB_ID_NS, key)) for key in keys]
+        self._pos_of_id = {job_id: pos for pos, job_id in enumerate(self.ids)}
+        # firm name → integer code; rows sharing a firm share a code
+        self._code_of: Dict[str, int] = {}
+        self.codes = np.fromiter(
+            (self._code_of.setdefault(name, len(self._code_of)) for name in names),
+            dtype=np.int64, count=len(names),
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "JobCatalog":
+        names = _column(df, ID_COL) if ID_COL in df.columns else list(range(len(df)))
+        position = _coalesce(_column(df, "primary_position"), default="Engineer")
+        cols = {
+            "company"    : _coalesce(names, default="Unknown Co"),
+            "name"       : position,
+            "logo"       : _column(df, "logo"),
+            "industry"   : _coalesce(_column(df, "industry"), default="Software"),
+            "size"       : [str(v) for v in _coalesce(_column(df, "size"), _column(df, "size_employees"), default="-")],
+            "location"   : _coalesce(_column(df, "location"), default="Remote"),
+            "rating"     : _column(df, "rating"),
+            "founded"    : [int(v) for v in _coalesce(_column(df, "founded"), _column(df, "founded_year"), default=2000)],
+            "position"   : position,
+            "salary"     : _column(df, "salary"),
+            "type"       : _column(df, "type"),
+            "experience" : _list_column(_column(df, "experience"), _experience_range),
+            "skills"     : _list_column(_column(df, "skills")),
+            "description": _column(df, "description"),
+            "benefits"   : _list_column(_column(df, "benefits")),
+            "posted"     : _column(df, "posted"),
+            "createdAt"  : _column(df, "createdAt"),
+        }
+        return cls(names, cols, _row_keys(df))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def resolve(self, events: Iterable[Tuple[str, Any]]) -> Tuple[List[int], List[Any]]:
+        """Split ``(jobId, value)`` events into row positions and values, dropping unknown ids."""
+        get = self._pos_of_id.get
+        positions: List[int] = []
+        values: List[Any] = []
+        for job_id, value in events:
+            pos = get(job_id)
+            if pos is not None:
+                positions.append(pos)
+                values.append(value)
+        return positions, values
+
+    def exclusion_mask(self, names: Iterable[str]) -> np.ndarray:
+        """Boolean mask over rows whose firm is in *names*."""
+        wanted = [self._code_of[n] for n in set(names) if n in self._code_of]
+        if not wanted:
+            return np.zeros(len(self.names), dtype=bool)
+        return np.isin(self.codes, np.asarray(wanted, dtype=np.int64))
+
+    def job_object(self, pos: int, score: float) -> Dict[str, Any]:
+        c = self._cols
+        job: Dict[str, Any] = {
+            "id"         : self.ids[pos],
+            "company"    : c["company"][pos],
+            "name"       : c["name"][pos],
+            "logo"       : c["logo"][pos],
+            "industry"   : c["industry"][pos],
+            "size"       : c["size"][pos],
+            "location"   : c["location"][pos],
+            "rating"     : c["rating"][pos],
+            "founded"    : c["founded"][pos],
+            "position"   : c["position"][pos],
+            "salary"     : c["salary"][pos],
+            "type"       : c["type"][pos],
+            "experience" : list(c["experience"][pos]),
+            "skills"     : list(c["skills"][pos]),
+            "description": c["description"][pos],
+            "benefits"   : list(c["benefits"][pos]),
+            "posted"     : c["posted"][pos],
+            "createdAt"  : c["createdAt"][pos],
+            "aiScore"    : round(float(score), 3),
+        }
+        return _fill_missing(job)
+
+
+@lru_cache(maxsize=1)
+def _catalog() -> JobCatalog:
+    return JobCatalog.from_frame(_pred_df())
 
 # ---------------------------------------------------------------------------
 # PUBLIC PICKERS
 # ---------------------------------------------------------------------------
 
+_rng_local = threading.local()
+
+
+def _rng() -> np.random.Generator:
+    """This thread's generator; a numpy Generator is not safe to share between
+    threads, and recommend_service runs pickers on ``asyncio.to_thread``."""
+    rng = getattr(_rng_local, "rng", None)
+    if rng is None:
+        rng = _rng_local.rng = np.random.default_rng()
+    return rng
+
+
+def _top_k(scores: np.ndarray, excluded: np.ndarray, n: int) -> np.ndarray:
+    """Positions of the *n* best non-excluded scores, best first; ties go to the earlier
+    row, so the picks are a prefix of the stable full ranking."""
+    candidates = np.flatnonzero(~excluded)
+    if n <= 0 or candidates.size == 0:
+        return candidates[:0]
+    cand_scores = scores[candidates]
+    if n < candidates.size:
+        cut = -np.partition(-cand_scores, n - 1)[n - 1]      # the n-th best score
+        above = cand_scores > cut
+        tied = cand_scores == cut
+        keep = above | (tied & (np.cumsum(tied) <= n - np.count_nonzero(above)))
+        candidates, cand_scores = candidates[keep], cand_scores[keep]
+    return candidates[np.argsort(-cand_scores, kind="stable")]
+
+
+def _weighted_sample(scores: np.ndarray, excluded: np.ndarray, n: int) -> np.ndarray:
+    """Up to *n* non-excluded positions drawn without replacement, weighted by score."""
+    candidates = np.flatnonzero(~excluded)
+    k = min(max(n, 0), candidates.size)
+    if k == 0:
+        return candidates[:0]
+    weights = np.clip(scores[candidates], 0.0, None)
+    total = weights.sum()
+    p = weights / total if total > 0 else None
+    if p is not None and np.count_nonzero(p) < k:
+        p = None  # not enough positive weights to draw k distinct rows
+    return _rng().choice(candidates, size=k, replace=False, p=p)
+
+
+def _pick_job_objects(scores: np.ndarray, n: int, shown: Iterable[str] | None, randomize: bool) -> List[Dict[str, Any]]:
+    cat = _catalog()
+    excluded = cat.exclusion_mask(shown or ())
+    picks = _weighted_sample(scores, excluded, n) if randomize else _top_k(scores, excluded, n)
+    return [cat.job_object(pos, scores[pos]) for pos in picks.tolist()]
+
+
 def recommend_job_objects(n: int = 3, *, shown: Iterable[str] | None = None, randomize: bool = False) -> List[Dict[str, Any]]:
-    shown_set: Set[str] = set(shown or [])
-    remaining = [(fid, sc) for fid, sc in _ranked_scores() if fid not in shown_set]
-    if randomize:
-        random.shuffle(remaining)
-    df = _pred_df().set_index(ID_COL)
-    return [_build_job_object(df.loc[fid], sc) for fid, sc in remaining[:n]]
+    return _pick_job_objects(_scores(), n, shown, randomize)
 
 
 def random_block_job_objects(n: int = 3) -> List[Dict[str, Any]]:
-    ranked = _ranked_scores()
-    if len(ranked) <= n:
-        picks = ranked
+    ranking = _ranking()
+    if len(ranking) <= n:
+        picks = ranking
     else:
-        picks = random.choice([ranked[i:i+n] for i in range(len(ranked)-n)])
-    df = _pred_df().set_index(ID_COL)
-    return [_build_job_object(df.loc[fid], sc) for fid, sc in picks]
+        start = random.randrange(len(ranking) - n)
+        picks = ranking[start:start + n]
+    cat, scores = _catalog(), _scores()
+    return [cat.job_object(pos, scores[pos]) for pos in picks.tolist()]
+
+# ---------------------------------------------------------------------------
+# WARM-UP (load the model and catalog before the first request needs them)
+# ---------------------------------------------------------------------------
+_ready = threading.Event()
+_warm_error: BaseException | None = None
+
+
+def warm_up() -> float:
+    """Load the model, the catalog and the score ranking now; returns the seconds it took.
+
+    Everything here is otherwise loaded lazily by the first recommendation
+    call. Safe to call repeatedly (later calls hit the caches).
+    """
+    global _warm_error
+    t0 = time.perf_counter()
+    try:
+        _catalog()
+        _ranking()
+    except BaseException as e:
+        _warm_error = e
+        raise
+    _warm_error = None
+    _ready.set()
+    return time.perf_counter() - t0
+
+
+def warm_up_in_background() -> threading.Event:
+    """Run ``warm_up`` on a daemon thread; the returned event is set once it succeeds."""
+    def run():
+        try:
+            print(f"[job_rec] warmed up in {warm_up():.2f}s")
+        except Exception as e:
+            print(f"[job_rec] warm-up failed, loading on first request instead: {e!r}")
+
+    threading.Thread(target=run, name="job-rec-warm-up", daemon=True).start()
+    return _ready
+
+
+def is_ready() -> bool:
+    """True once a warm-up has loaded the model and catalog."""
+    return _ready.is_set()
+
+
+def warm_up_error() -> BaseException | None:
+    """The exception of the last failed warm-up, if any."""
+    return _warm_error
 
 # ---------------------------------------------------------------------------
 # FIRESTORE PUSH
@@ -209,20 +560,39 @@ def _init_firestore():
     return firestore.client()
 
 
-def push_job_recommendations(uid: str, n: int = 3, *, use_block: bool = False) -> List[Dict[str, Any]]:
+def _next_jobs(n: int, use_block: bool) -> List[Dict[str, Any]]:
+    return random_block_job_objects(n) if use_block else recommend_job_objects(n, randomize=True)
 
-    jobs = random_block_job_objects(n) if use_block else recommend_job_objects(n, randomize=True)
 
-    db = _init_firestore()
-    batch = db.batch()
-    coll_ref = db.collection("users").document(uid).collection("recommendation")
+def push_job_recommendations(uid: str, n: int = 3, *, use_block: bool = False, backend=None) -> List[Dict[str, Any]]:
 
-    for job in jobs:
-        batch.set(coll_ref.document(job["id"]), job)
-    batch.commit()
+    jobs = _next_jobs(n, use_block)
+
+    outcome = push_bulk({uid: jobs}, backend)[uid]
+    if not outcome["ok"]:
+        raise RuntimeError(f"Failed to push recommendations for {uid}: {outcome['error']}")
     print(f"[job_rec] pushed {len(jobs)} jobs to users/{uid}/recommendation")
     return jobs
 
+
+def push_job_recommendations_bulk(
+    uids: Iterable[str],
+    n: int = 3,
+    *,
+    use_block: bool = False,
+    backend=None,
+    max_workers: int = 8,
+) -> Dict[str, Dict[str, Any]]:
+    """Recommend and push for many users with packed, concurrent batch commits.
+
+    Returns ``push_bulk``'s per-user outcomes instead of raising.
+    """
+    jobs_by_user = {uid: _next_jobs(n, use_block) for uid in uids}
+    results = push_bulk(jobs_by_user, backend, max_workers=max_workers)
+    failed = sum(not r["ok"] for r in results.values())
+    print(f"[job_rec] pushed recommendations for {len(results) - failed}/{len(results)} users")
+    return results
+
 # ---------------------------------------------------------------------------
 # DEMO (push skipped unless FIRESTORE env is set)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,473 @@
+"""Scraped postings → prediction catalog: turn ``indeed_jobs.csv`` into ``prediction.xlsx``-schema rows.
+
+    python jobs_etl.py                                  # indeed_jobs.csv -> scraped_jobs.arrow
+    python jobs_etl.py more_jobs.csv --out scraped_jobs.arrow --country USA
+    NEOMIND_PREDICT_PATH=scraped_jobs.arrow python main.py
+
+Salary ranges and experience years come from regexes run over the whole
+summary column at once (in Arrow's RE2 engine); skills, benefits, industry,
+job type and the remote flag from one keyword-automaton pass over the
+summaries' tokens; primary position from priority-ordered title rules.
+Company facts a listing doesn't show (size, revenue,
+founding year, rating, collaborations) are imputed with the training-set
+medians so the model's scaler sees in-range values.
+
+The output is an Arrow IPC (Feather v2) file that ``dataset_cache.load_frame``
+memory-maps.  Runs are incremental: each output row keeps the posting's job
+key and a hash of its source row, and only new or changed postings are
+re-extracted.
+"""
+from __future__ import annotations
+
+import argparse, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+SOURCE_CSV  = "indeed_jobs.csv"
+OUTPUT_PATH = "scraped_jobs.arrow"
+TRAIN_XLSX  = "training.xlsx"
+MAX_SKILLS  = 8
+CHUNK_ROWS  = 20_000
+SOURCE_COLS = ["Title", "Company", "Location", "Salary", "Summary", "Link"]
+HOURS_PER_YEAR = 2080
+
+# ---------------------------------------------------------------------------
+# VOCABULARIES
+# ---------------------------------------------------------------------------
+SKILLS: Dict[str, Sequence[str]] = {
+    "Python": ["python"], "Java": ["java"], "JavaScript": ["javascript", "ecmascript"],
+    "TypeScript": ["typescript"], "Go": ["golang"], "Rust": ["rust"], "C++": ["c++"], "C#": ["c#"],
+    ".NET": [".net", "asp.net", "dotnet"], "Kotlin": ["kotlin"], "Swift": ["swift"], "Scala": ["scala"],
+    "Ruby": ["ruby"], "Rails": ["ruby on rails", "rails"], "PHP": ["php"], "R": ["r programming"],
+    "SQL": ["sql"], "PostgreSQL": ["postgresql", "postgres"], "MySQL": ["mysql"], "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"], "Kafka": ["kafka"], "Spark": ["spark", "pyspark"], "Airflow": ["airflow"],
+    "Snowflake": ["snowflake"], "BigQuery": ["bigquery"], "Elasticsearch": ["elasticsearch"],
+    "AWS": ["aws", "amazon web services"], "GCP": ["gcp", "google cloud"], "Azure": ["azure"],
+    "Docker": ["docker"], "Kubernetes": ["kubernetes", "k8s"], "Terraform": ["terraform"],
+    "Linux": ["linux", "unix"], "Git": ["git", "github", "gitlab"], "CI/CD": ["ci/cd", "continuous integration"],
+    "React": ["react", "react.js", "reactjs"], "Angular": ["angular"], "Vue": ["vue", "vue.js", "vuejs"],
+    "Node.js": ["node.js", "nodejs", "node"], "Express": ["express.js", "expressjs"],
+    "Django": ["django"], "Flask": ["flask"], "FastAPI": ["fastapi"], "Spring": ["spring boot", "spring"],
+    "HTML": ["html", "html5"], "CSS": ["css", "css3", "tailwind"], "GraphQL": ["graphql"],
+    "REST": ["rest api", "rest apis", "restful"], "gRPC": ["grpc"], "Microservices": ["microservices"],
+    "Machine Learning": ["machine learning", "ml"], "Deep Learning": ["deep learning"],
+    "TensorFlow": ["tensorflow"], "PyTorch": ["pytorch"], "Pandas": ["pandas"], "NumPy": ["numpy"],
+    "LLM": ["llm", "llms", "large language models"], "Computer Vision": ["computer vision"],
+    "Flutter": ["flutter"], "Dart": ["dart"], "Firebase": ["firebase"], "iOS": ["ios"], "Android": ["android"],
+    "Figma": ["figma"], "Tableau": ["tableau"], "Power BI": ["power bi"], "Excel": ["microsoft excel", "ms excel", "spreadsheets"],
+    "Salesforce": ["salesforce"], "Jira": ["jira"], "Agile": ["agile", "scrum", "kanban"],
+    "Security": ["cybersecurity", "security clearance", "infosec"],
+}
+BENEFITS: Dict[str, Sequence[str]] = {
+    "Health insurance": ["health insurance", "medical", "dental", "vision insurance", "health benefits"],
+    "Remote work": ["remote work", "work from home", "fully remote", "remote-first", "remote first"],
+    "Stock options": ["stock options", "equity", "rsu", "rsus", "espp"],
+    "Flexible hours": ["flexible hours", "flexible schedule", "flexible working"],
+    "Paid parental leave": ["parental leave", "maternity leave", "paternity leave"],
+    "Learning budget": ["learning budget", "tuition", "professional development", "education stipend", "training budget"],
+    "Unlimited PTO": ["unlimited pto", "unlimited vacation", "unlimited paid time off"],
+    "Paid time off": ["paid time off", "pto", "vacation", "paid holidays", "time off"],
+    "401(k)": ["401(k)", "401k", "retirement plan", "pension"],
+    "Gym membership": ["gym", "wellness stipend", "fitness"],
+    "Bonus": ["bonus", "bonuses"],
+}
+# first matching rule wins; titles are checked before the summary's lead
+POSITION_RULES: List[Tuple[str, str]] = [
+    ("Data Scientist", r"data scien|machine learning (?:engineer|scientist)|\bml engineer|data analy"),
+    ("Product Manager", r"product manag|product owner"),
+    ("Developer", r"engineer|developer|programmer|software|devops|\bsre\b|architect|full.?stack|back.?end|front.?end"),
+    ("Marketing", r"marketing|\bseo\b|growth|brand|content"),
+    ("Sales", r"\bsales\b|account exec|business develop"),
+    ("Support", r"support|customer success|help ?desk|service desk"),
+    ("HR", r"recruit|human resources|\bhr\b|talent"),
+    ("Finance", r"financ|accountant|accounting|controller"),
+    ("Operations", r"operations|logistic|supply chain"),
+]
+# the industry with the most mentions wins, ties go to the earlier entry; "Software" otherwise
+INDUSTRIES: Dict[str, Sequence[str]] = {
+    "FinTech": ["fintech", "banking", "bank", "banks", "payments", "financial services", "trading", "insurtech",
+                "lending", "capital markets"],
+    "HealthTech": ["healthcare", "health care", "healthtech", "medical device", "medical devices", "clinical",
+                   "clinicians", "patient", "patients", "pharma", "pharmaceutical", "hospital", "hospitals"],
+    "Education": ["edtech", "education technology", "students", "school", "schools", "universities",
+                  "learners", "teachers"],
+    "Energy": ["energy", "oil and gas", "solar", "renewable", "renewables", "utilities"],
+    "Logistics": ["logistics", "freight", "supply chain", "fleet", "warehouse", "warehouses"],
+    "Manufacturing": ["manufacturing", "industrial", "factory", "factories", "aerospace", "defense", "automotive"],
+    "Retail": ["retail", "e-commerce", "ecommerce", "marketplace", "consumer goods"],
+    "Telecom": ["telecom", "telecommunications", "wireless", "5g", "network operator"],
+}
+JOB_TYPES: Dict[str, Sequence[str]] = {
+    "full-time": ["full-time", "full time", "fulltime"], "part-time": ["part-time", "part time"],
+    "contract": ["contract", "contractor", "contract-to-hire"], "internship": ["internship", "intern"],
+    "temporary": ["temporary"],
+}
+REMOTE: Dict[str, Sequence[str]] = {"remote": ["remote", "remote-first", "fully remote", "work from home"]}
+_US_STATES = ("AL AK AZ AR CA CO CT DE DC FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO MT NE NV NH NJ "
+              "NM NY NC ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY").split()
+REGION_OF_COUNTRY = {
+    "USA": "AMER", "Canada": "AMER", "Mexico": "AMER", "Brazil": "AMER",
+    "United Kingdom": "EMEA", "Germany": "EMEA", "Türkiye": "EMEA", "UAE": "EMEA", "France": "EMEA",
+    "Netherlands": "EMEA", "Japan": "APAC", "Singapore": "APAC", "South Korea": "APAC", "India": "APAC",
+}
+# company facts listings don't show: imputed from the training set (fallbacks if it is unavailable)
+IMPUTED_NUMERIC = {"size_employees": 208.5, "annual_revenue_musd": 8.375, "founded_year": 2004,
+                   "rating_1to5": 3.7, "past_collabs": 7.5}
+
+# ---------------------------------------------------------------------------
+# KEYWORD AUTOMATON
+# ---------------------------------------------------------------------------
+_SEPARATORS = r"[,;:()/|\[\]{}!?\"'*•·“”‘’]"   # besides whitespace; "c++", "c#", ".net", "node.js" survive
+
+
+_SPACE = pa.scalar(" ", pa.large_string())
+
+
+def _tokenize(text: pa.Array) -> Tuple[pa.Array, np.ndarray]:
+    """Lowercased words of every text, flattened, with the row each token came from."""
+    spaced = pc.replace_substring_regex(pc.utf8_lower(text), _SEPARATORS, " ")
+    lists = pc.ascii_split_whitespace(spaced)
+    tokens = pc.utf8_rtrim(pc.list_flatten(lists), characters=".")
+    return tokens, pc.list_parent_indices(lists).to_numpy()
+
+
+class KeywordMatcher:
+    """Keyword automaton over word tokens: all vocabularies in one pass, no per-row Python.
+
+    Aliases are tokenized like the text.  Single-word aliases are one hash
+    lookup over every token; longer ones are joined and looked up only at
+    tokens that start one.  Within a vocabulary, overlapping hits keep the
+    longest alias ("unlimited pto" rather than "pto").
+    """
+
+    def __init__(self, vocabs: Dict[str, Dict[str, Sequence[str]]]):
+        self.kinds = {kind: k for k, kind in enumerate(vocabs)}
+        self.labels: List[str] = []
+        label_kind: List[int] = []
+        by_len: Dict[int, Dict[str, int]] = {}
+        for kind, vocab in vocabs.items():
+            for name, aliases in vocab.items():
+                for alias in aliases:
+                    words = _tokenize(pa.array([alias], pa.large_string()))[0].to_pylist()
+                    by_len.setdefault(len(words), {}).setdefault(" ".join(words), len(self.labels))
+                self.labels.append(name)
+                label_kind.append(self.kinds[kind])
+        self.label_kind = np.asarray(label_kind)
+        self.grams = {n: (pa.array(list(grams), pa.large_string()), np.fromiter(grams.values(), dtype=np.int64))
+                      for n, grams in sorted(by_len.items(), reverse=True)}
+        self.starts = pa.array(sorted({g.split(" ", 1)[0] for n, grams in by_len.items() if n > 1 for g in grams}),
+                               pa.large_string())
+
+    def match(self, text: pd.Series) -> pd.DataFrame:
+        """Hits as ``row``/``pos``/``label`` columns, in text order."""
+        tokens, rows = _tokenize(pa.array(text.fillna(""), pa.large_string()))
+        n_tok = len(tokens)
+        covered = np.zeros((len(self.kinds), n_tok), dtype=bool)
+        found_pos, found_label = [], []
+        starts = None
+        for n, (values, ids) in self.grams.items():           # longest aliases first
+            if n == 1:
+                pos, grams = np.arange(n_tok), tokens
+            else:
+                if starts is None:
+                    starts = np.flatnonzero(pc.is_in(tokens, value_set=self.starts).to_numpy(zero_copy_only=False))
+                pos = starts[starts + n - 1 < n_tok]
+                pos = pos[rows[pos] == rows[pos + n - 1]]
+                grams = pc.take(tokens, pos)
+                for k in range(1, n):
+                    grams = pc.binary_join_element_wise(grams, pc.take(tokens, pos + k), _SPACE)
+            code = pc.fill_null(pc.index_in(grams, value_set=values), -1).to_numpy()
+            hit = code >= 0
+            pos, label = pos[hit], ids[code[hit]]
+            kind = self.label_kind[label]
+            free = np.ones(len(pos), dtype=bool)
+            for k in range(n):
+                free &= ~covered[kind, pos + k]
+            pos, label, kind = pos[free], label[free], kind[free]
+            if n > 1:
+                for k in range(n):
+                    covered[kind, pos + k] = True
+            found_pos.append(pos)
+            found_label.append(label)
+        pos = np.concatenate(found_pos) if found_pos else np.zeros(0, dtype=np.int64)
+        label = np.concatenate(found_label) if found_label else np.zeros(0, dtype=np.int64)
+        order = np.argsort(pos, kind="stable")
+        return pd.DataFrame({"row": rows[pos[order]], "pos": pos[order], "label": label[order]})
+
+    def _of_kind(self, hits: pd.DataFrame, kind: str) -> pd.DataFrame:
+        return hits[self.label_kind[hits["label"].to_numpy()] == self.kinds[kind]]
+
+    def lists(self, hits: pd.DataFrame, kind: str, n_rows: int, limit: int = 0) -> List[str | None]:
+        """Distinct *kind* labels per row in order of appearance, as prediction.xlsx list strings."""
+        h = self._of_kind(hits, kind).drop_duplicates(["row", "label"])
+        if limit:
+            h = h[h.groupby("row").cumcount().to_numpy() < limit]
+        out: List[str | None] = [None] * n_rows
+        if h.empty:
+            return out
+        quoted = [repr(name) for name in self.labels]
+        rows, labels = h["row"].to_numpy(), h["label"].to_numpy()
+        bounds = np.flatnonzero(np.diff(rows)) + 1
+        for row, chunk in zip(rows[np.r_[0, bounds]], np.split(labels, bounds)):
+            out[row] = "[" + ", ".join(quoted[i] for i in chunk) + "]"
+        return out
+
+    def dominant(self, hits: pd.DataFrame, kind: str, n_rows: int, default=None) -> np.ndarray:
+        """Per row, the *kind* label with the most hits (ties: earliest declared), else *default*."""
+        h = self._of_kind(hits, kind)
+        out = np.full(n_rows, default, dtype=object)
+        if h.empty:
+            return out
+        counts = h.groupby(["row", "label"]).size().reset_index(name="n")
+        best = counts.sort_values(["row", "n", "label"], ascending=[True, False, True]).drop_duplicates("row")
+        out[best["row"].to_numpy()] = np.asarray(self.labels, dtype=object)[best["label"].to_numpy()]
+        return out
+
+    def any(self, hits: pd.DataFrame, kind: str, n_rows: int) -> np.ndarray:
+        out = np.zeros(n_rows, dtype=bool)
+        out[self._of_kind(hits, kind)["row"].to_numpy()] = True
+        return out
+
+
+_matcher = KeywordMatcher({"skills": SKILLS, "benefits": BENEFITS, "industry": INDUSTRIES,
+                           "type": JOB_TYPES, "remote": REMOTE})
+
+# ---------------------------------------------------------------------------
+# FIELD EXTRACTORS (one pass over a whole column each; RE2-compatible patterns
+# so pandas runs them in Arrow)
+# ---------------------------------------------------------------------------
+_NUM = r"(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)"
+_SALARY_RE = (
+    r"\$\s?" + _NUM + r"\s?([kK])?(?:\.\d{2})?"
+    r"(?:\s*(?:-|–|—|to)\s*\$?\s?" + _NUM + r"\s?([kK])?(?:\.\d{2})?)?"
+    r"(?:\s*(?:per|an|a|/)\s*(hour|hr|year|yr|annum|month))?"
+)
+# on lowercased text: "3+ years of experience", "(5) years", "2-4 yrs of professional experience"
+_EXPERIENCE_RE = r"(\d\d?)\)?\+? ?(?:(?:-|–|to) ?(\d\d?)\+? ?)?(?:years?|yrs)[ a-z]{0,40}?experience"
+_SENTENCE_RE = r"(?i)^\s*(?:description|about the role|job description|summary)\s*:\s*"
+
+
+def _amount(num: pd.Series, k: pd.Series) -> pd.Series:
+    values = pd.to_numeric(num.str.replace(",", "", regex=False), errors="coerce")
+    return values.where(k.isna(), values * 1000)
+
+
+def parse_salaries(salary: pd.Series, summary: pd.Series) -> pd.DataFrame:
+    """Annual USD ``salary_min``/``salary_max`` and a display string like ``$75k-$83k``."""
+    text = salary.fillna("").where(salary.fillna("").str.contains("$", regex=False), summary.fillna(""))
+    m = text.str.extract(_SALARY_RE)
+    lo, hi = _amount(m[0], m[1]), _amount(m[2], m[3])
+    hi = hi.fillna(lo)
+    period = m[4].str.lower()
+    scale = np.select([period.isin(["hour", "hr"]).to_numpy(), (period == "month").to_numpy()],
+                      [HOURS_PER_YEAR, 12], 1.0)
+    lo, hi = lo * scale, hi * scale
+    sane = lo.between(10_000, 2_000_000) & hi.between(10_000, 2_000_000)
+    lo, hi = lo.where(sane), hi.where(sane)
+    lo_k = "$" + (lo / 1000).round().astype("Int64").astype(str) + "k"
+    hi_k = "$" + (hi / 1000).round().astype("Int64").astype(str) + "k"
+    display = lo_k.where(lo_k == hi_k, lo_k + "-" + hi_k)
+    return pd.DataFrame({"salary": display.where(sane, None), "salary_min": lo, "salary_max": hi})
+
+
+def parse_experience(lowered: pd.Series) -> pd.Series:
+    """``[min, max]`` years as a list string (the prediction.xlsx format), None when absent."""
+    m = lowered.fillna("").str.extract(_EXPERIENCE_RE)
+    lo = pd.to_numeric(m[0], errors="coerce").clip(0, 30)
+    hi = pd.to_numeric(m[1], errors="coerce").clip(0, 30)
+    hi = hi.fillna(lo + 3).where(hi.isna() | (hi >= lo), lo + 3)
+    out = "[" + lo.astype("Int64").astype(str) + ", " + hi.astype("Int64").astype(str) + "]"
+    return out.where(lo.notna(), None)
+
+
+def classify(text: pd.Series, rules: List[Tuple[str, str]], default) -> pd.Series:
+    """First matching rule per row (vectorized ``np.select`` over one ``str.contains`` per rule)."""
+    conds = [text.str.contains(pattern, regex=True, case=False).fillna(False).to_numpy() for _, pattern in rules]
+    return pd.Series(np.select(conds, [name for name, _ in rules], default=default), index=text.index)
+
+
+def parse_locations(location: pd.Series, default_country: str) -> pd.DataFrame:
+    loc = location.fillna("").str.replace(r"^(?:remote in|hybrid work in|hybrid remote in|in)\s+", "",
+                                          regex=True, case=False).str.strip()
+    parts = loc.str.extract(r"^([^,(]+?)\s*(?:,\s*([A-Za-z .]+?))?\s*(?:\d{5})?\s*(?:\(.*\))?$")
+    city = parts[0].str.strip()
+    region = parts[1].str.strip()
+    is_us = region.str.upper().isin(_US_STATES) | region.isin(["United States", "US", "USA"])
+    country = pd.Series(np.where(is_us, "USA", np.where(region.notna() & ~is_us, region, default_country)),
+                        index=loc.index)
+    city = city.where(~city.str.lower().isin(["", "remote", "united states", "hybrid"]), None)
+    return pd.DataFrame({
+        "city": city,
+        "country": country,
+        "market_region": country.map(REGION_OF_COUNTRY).fillna("AMER"),
+        "location": loc.where(loc != "", None),
+    })
+
+
+def _first_sentence(summary: pd.Series, limit: int = 160) -> pd.Series:
+    s = summary.fillna("").str.slice(0, 4 * limit).str.replace(_SENTENCE_RE, "", regex=True)
+    first = s.str.extract(r"^(.{20,}?[.!?])(?:\s|$)")[0].fillna(s)
+    short = first.str.len() > limit
+    first = first.where(~short, first.str.slice(0, limit).str.replace(r"\s+\S*$", "", regex=True) + "…")
+    return first.where(first.str.len() > 0, None)
+
+
+def imputed_numeric(train_path: str = TRAIN_XLSX) -> Dict[str, float]:
+    try:
+        from dataset_cache import load_frame
+        train = load_frame(train_path)
+        return {c: float(train[c].median()) for c in IMPUTED_NUMERIC if c in train.columns}
+    except (OSError, ValueError, ImportError):
+        return dict(IMPUTED_NUMERIC)
+
+# ---------------------------------------------------------------------------
+# TRANSFORM
+# ---------------------------------------------------------------------------
+
+def row_hashes(src: pd.DataFrame) -> pd.Series:
+    return pd.util.hash_pandas_object(src[SOURCE_COLS].fillna(""), index=False).astype("uint64")
+
+
+def job_keys(src: pd.DataFrame) -> pd.Series:
+    """Indeed's ``jk`` from each link, else a hash of the link, else (no link) a hash of the row."""
+    link = src["Link"].fillna("")
+    jk = link.str.extract(r"[?&]v?jk=([0-9A-Za-z]+)")[0]
+    by_link = "h" + pd.util.hash_pandas_object(link, index=False).astype(str)
+    by_row = "r" + row_hashes(src).astype(str)
+    return jk.fillna(by_link.where(link != "", by_row))
+
+
+def transform(src: pd.DataFrame, *, default_country: str = "USA",
+              numeric: Dict[str, float] | None = None) -> pd.DataFrame:
+    """Scraped rows (``SOURCE_COLS``) → prediction-schema rows, one column operation at a time."""
+    src = src.reset_index(drop=True)
+    numeric = numeric or dict(IMPUTED_NUMERIC)
+    n = len(src)
+    title = src["Title"].fillna("").astype(str)
+    summary = src["Summary"].fillna("").astype(str)
+    lowered = summary.str.lower()
+    hits = _matcher.match(title + " \n " + summary)
+
+    pos_by_title = classify(title.str.lower(), POSITION_RULES, default=None)
+    position = pos_by_title.fillna(classify(lowered.str.slice(0, 400), POSITION_RULES, default="Developer"))
+    company = src["Company"].astype(object).where(src["Company"].fillna("") != "", None)
+    salaries = parse_salaries(src["Salary"].fillna("").astype(str), summary)
+    locs = parse_locations(src["Location"].fillna("").astype(str), default_country)
+    remote = (_matcher.any(hits, "remote", n)
+              | locs["location"].fillna("").str.contains("remote", case=False, regex=False).to_numpy())
+
+    return pd.DataFrame({
+        "firm_name": company,
+        "city": locs["city"],
+        "country": locs["country"],
+        "market_region": locs["market_region"],
+        "industry": _matcher.dominant(hits, "industry", n, default="Software"),
+        "primary_position": position,
+        "size_employees": np.full(n, int(round(numeric["size_employees"])), dtype="int64"),
+        "annual_revenue_musd": np.full(n, numeric["annual_revenue_musd"], dtype="float64"),
+        "founded_year": np.full(n, int(round(numeric["founded_year"])), dtype="int64"),
+        "remote_friendly": remote.astype("int64"),
+        "rating_1to5": np.full(n, numeric["rating_1to5"], dtype="float64"),
+        "past_collabs": np.full(n, int(round(numeric["past_collabs"])), dtype="int64"),
+        "benefits": _matcher.lists(hits, "benefits", n),
+        "description": _first_sentence(summary),
+        "summary": summary.where(summary != "", None),
+        "experience": parse_experience(lowered),
+        "location": locs["location"].fillna(pd.Series(np.where(remote, "Remote", None), index=src.index)),
+        "name": company,
+        "position": title.where(title != "", position),
+        "salary": salaries["salary"],
+        "salary_min": salaries["salary_min"],
+        "salary_max": salaries["salary_max"],
+        "skills": _matcher.lists(hits, "skills", n, MAX_SKILLS),
+        "type": _matcher.dominant(hits, "type", n),
+        "link": src["Link"].astype(object).where(src["Link"].notna(), None),
+    })
+
+# ---------------------------------------------------------------------------
+# INCREMENTAL RUN
+# ---------------------------------------------------------------------------
+
+def _read_output(path: str) -> pd.DataFrame | None:
+    if not Path(path).exists():
+        return None
+    return feather.read_feather(path)
+
+
+def _write_output(df: pd.DataFrame, path: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(df.reset_index(drop=True), tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+
+def run(sources: Sequence[str] = (SOURCE_CSV,), out: str = OUTPUT_PATH, *, country: str = "USA",
+        full: bool = False, workers: int = 1) -> Dict[str, float]:
+    """Extract new/changed postings from *sources* into *out*; returns counts and timing."""
+    t0 = time.perf_counter()
+    src = pd.concat([pd.read_csv(p, engine="pyarrow", dtype=str) for p in sources], ignore_index=True)
+    for c in SOURCE_COLS:
+        if c not in src.columns:
+            src[c] = None
+    src["jk"] = job_keys(src)
+    src["row_hash"] = row_hashes(src)
+    src = src.drop_duplicates("jk", keep="last")
+
+    prev = None if full else _read_output(out)
+    if prev is not None and {"jk", "row_hash"} <= set(prev.columns):
+        known = dict(zip(prev["jk"], prev["row_hash"]))
+        same = src["jk"].map(known).eq(src["row_hash"]).fillna(False)
+        todo = src[~same.to_numpy()]
+        keep = prev[~prev["jk"].isin(todo["jk"])]
+    else:
+        todo, keep = src, None
+
+    # chunks bound the token arrays' memory, and are the unit of work for --workers
+    extract = partial(transform, default_country=country, numeric=imputed_numeric())
+    chunks = [todo.iloc[i:i + CHUNK_ROWS] for i in range(0, len(todo), CHUNK_ROWS)] or [todo]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            parts = list(pool.map(extract, chunks))
+    else:
+        parts = [extract(chunk) for chunk in chunks]
+    new = pd.concat(parts, ignore_index=True)
+    new["jk"] = todo["jk"].to_numpy()
+    new["row_hash"] = todo["row_hash"].to_numpy()
+    new["createdAt"] = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    if keep is not None and len(keep):
+        if len(new):
+            prev_created = dict(zip(prev["jk"], prev["createdAt"]))   # changed rows keep their first-seen time
+            new["createdAt"] = new["jk"].map(prev_created).fillna(new["createdAt"])
+        result = pd.concat([keep, new], ignore_index=True)
+    else:
+        result = new
+    _write_output(result, out)
+    return {"rows": len(result), "extracted": len(todo), "unchanged": len(src) - len(todo),
+            "seconds": time.perf_counter() - t0}
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("sources", nargs="*", default=[SOURCE_CSV], help="scraped CSV files (Title..Link columns)")
+    ap.add_argument("--out", default=OUTPUT_PATH, help="Arrow IPC output (load with NEOMIND_PREDICT_PATH)")
+    ap.add_argument("--country", default="USA", help="country for postings whose location has none")
+    ap.add_argument("--full", action="store_true", help="re-extract every posting")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for extraction")
+    args = ap.parse_args(argv)
+    stats = run(args.sources, args.out, country=args.country, full=args.full, workers=args.workers)
+    print(f"[jobs_etl] {stats['rows']} rows in {args.out}: {stats['extracted']} extracted, "
+          f"{stats['unchanged']} unchanged, {stats['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,302 @@
+"""Bulk CV ingestion: extract every PDF under directories/archives to JSONL or Parquet.
+
+    python bulk_pdf_to_text.py resumes/ batch1.zip batch2.tar.gz --out cvs.jsonl
+    python bulk_pdf_to_text.py resumes/ --out cvs_parquet/ --format parquet --processes 8 --structured
+
+Files are read and hashed in the parent, extracted by a process pool with a
+bounded number of files in flight, and streamed to the output as they finish,
+so memory stays flat however many files there are.  Content hashes of every
+extracted file go to a SQLite index next to the output; a rerun skips them
+(also duplicates inside one run).  Files that fail to extract are not written
+to the output: they go to the index's ``errors`` table instead, and a rerun
+tries them again.  Parquet output is a directory that gets one part file per
+run.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import sqlite3
+import sys
+import tarfile
+import time
+import zipfile
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pdf_to_text import NO_LIMITS
+from pdf_extract import PDFError, extract_pages, structure
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # JSONL output only
+    pa = pq = None
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+WINDOW_PER_PROCESS = 4      # files in flight per worker
+PARQUET_ROW_GROUP  = 512    # records buffered per Parquet row group
+REPORT_EVERY_S     = 5.0
+RECENT_HASHES      = 4096   # in-run dedup before a hash reaches the index
+
+Source = Tuple[str, bytes]  # (display name, file bytes)
+
+# ---------------------------------------------------------------------------
+# INPUTS
+# ---------------------------------------------------------------------------
+
+def _is_pdf(name: str) -> bool:
+    return name.lower().endswith(".pdf")
+
+
+def _iter_zip(path: Path) -> Iterator[Source]:
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if not info.is_dir() and _is_pdf(info.filename):
+                yield f"{path}!{info.filename}", zf.read(info)
+
+
+def _iter_tar(path: Path) -> Iterator[Source]:
+    with tarfile.open(path, "r:*") as tf:   # streamed in member order; fine for .tar.gz
+        for member in tf:
+            if member.isfile() and _is_pdf(member.name):
+                yield f"{path}!{member.name}", tf.extractfile(member).read()
+
+
+def _iter_path(path: Path) -> Iterator[Source]:
+    name = path.name.lower()
+    if path.is_dir():
+        for child in sorted(path.rglob("*")):
+            if child.is_file():
+                yield from _iter_path(child)
+    elif name.endswith(".zip"):
+        yield from _iter_zip(path)
+    elif name.endswith((".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")):
+        yield from _iter_tar(path)
+    elif _is_pdf(name):
+        yield str(path), path.read_bytes()
+
+
+def iter_sources(paths: Iterable[str]) -> Iterator[Source]:
+    """Lazily yield every PDF under *paths* (files, directories, zip/tar archives)."""
+    for p in paths:
+        yield from _iter_path(Path(p))
+
+# ---------------------------------------------------------------------------
+# SEEN-HASH INDEX
+# ---------------------------------------------------------------------------
+
+class SeenIndex:
+    """On-disk set of extracted content hashes (lookups don't grow process memory),
+    plus the latest error of every file that failed and is still to be retried."""
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen (sha256 TEXT PRIMARY KEY, source TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS errors (sha256 TEXT PRIMARY KEY, source TEXT, "
+                        "error TEXT, attempts INTEGER, failed_at REAL)")
+
+    def __contains__(self, digest: str) -> bool:
+        return self.db.execute("SELECT 1 FROM seen WHERE sha256 = ?", (digest,)).fetchone() is not None
+
+    def add(self, digest: str, source: str) -> None:
+        self.db.execute("INSERT OR IGNORE INTO seen VALUES (?, ?)", (digest, source))
+        self.db.execute("DELETE FROM errors WHERE sha256 = ?", (digest,))
+
+    def add_error(self, digest: str, source: str, error: str) -> None:
+        self.db.execute(
+            "INSERT INTO errors VALUES (?, ?, ?, 1, ?) ON CONFLICT(sha256) DO UPDATE SET "
+            "source = excluded.source, error = excluded.error, attempts = attempts + 1, failed_at = excluded.failed_at",
+            (digest, source, error, time.time()))
+
+    def errors(self) -> List[Tuple[str, str, str, int]]:
+        """``(sha256, source, error, attempts)`` of the files still failing."""
+        return self.db.execute("SELECT sha256, source, error, attempts FROM errors ORDER BY failed_at").fetchall()
+
+    def commit(self) -> None:
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+# ---------------------------------------------------------------------------
+# SINKS
+# ---------------------------------------------------------------------------
+
+class JsonlSink:
+    def __init__(self, path: str):
+        self.f = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def flush(self) -> None:
+        self.f.flush()
+
+    def close(self) -> None:
+        self.f.close()
+
+
+class ParquetSink:
+    """One ``part-<time>.parquet`` per run inside *directory*; nested fields as JSON strings."""
+
+    def __init__(self, directory: str, row_group: int = PARQUET_ROW_GROUP):
+        if pq is None:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.path = Path(directory) / f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.parquet"
+        self.schema = pa.schema([
+            ("source", pa.string()), ("sha256", pa.string()), ("bytes", pa.int64()),
+            ("pages", pa.int32()), ("text", pa.string()), ("structured", pa.string()),
+        ])
+        self.row_group = row_group
+        self.rows: List[Dict[str, Any]] = []
+        self.writer = None
+
+    def write(self, record: Dict[str, Any]) -> None:
+        extra = {k: v for k, v in record.items() if k not in self.schema.names}
+        row = {k: record.get(k) for k in self.schema.names}
+        row["structured"] = json.dumps(extra, ensure_ascii=False) if extra else None
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(pa.Table.from_pylist(self.rows, schema=self.schema))
+        self.rows = []
+
+    def close(self) -> None:
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+# ---------------------------------------------------------------------------
+# WORKERS
+# ---------------------------------------------------------------------------
+
+def _extract(task: Tuple[str, str, bytes, bool]) -> Dict[str, Any]:
+    source, digest, data, structured = task
+    record: Dict[str, Any] = {"source": source, "sha256": digest, "bytes": len(data),
+                              "pages": 0, "text": None, "error": None}
+    try:
+        pages = extract_pages(data, **NO_LIMITS)
+    except PDFError as e:
+        record["error"] = str(e)
+        return record
+    except Exception as e:  # one malformed file must not stop the batch
+        record["error"] = f"{type(e).__name__}: {e}"
+        return record
+    if structured:
+        record.update(structure(pages))
+    else:
+        record["text"] = "".join(pages)
+        record["pages"] = len(pages)
+    return record
+
+
+def _bounded_imap(pool, fn, tasks: Iterable[Any], window: int) -> Iterator[Any]:
+    """Ordered ``pool.imap`` that keeps at most *window* tasks (file bytes) in flight."""
+    pending: deque = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(fn, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+# ---------------------------------------------------------------------------
+# DRIVER
+# ---------------------------------------------------------------------------
+
+def run(
+    inputs: List[str],
+    out: str,
+    *,
+    fmt: Optional[str] = None,
+    processes: int = 1,
+    structured: bool = False,
+    index: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Extract every new PDF under *inputs* into *out*; returns run statistics."""
+    fmt = fmt or ("parquet" if out.endswith(".parquet") or out.endswith("/") else "jsonl")
+    sink = ParquetSink(out) if fmt == "parquet" else JsonlSink(out)
+    seen = SeenIndex(index or f"{out.rstrip('/')}.seen.sqlite")
+    stats = {"files": 0, "pages": 0, "errors": 0, "skipped": 0}
+
+    def tasks() -> Iterator[Tuple[str, str, bytes, bool]]:
+        recent: "OrderedDict[str, None]" = OrderedDict()   # duplicates whose first copy is in flight
+        for source, data in iter_sources(inputs):
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in recent or digest in seen:
+                stats["skipped"] += 1
+                continue
+            recent[digest] = None
+            if len(recent) > RECENT_HASHES:
+                recent.popitem(last=False)   # long since written to the index
+            yield source, digest, data, structured
+
+    pool = None
+    if processes > 1:
+        pool = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else None).Pool(processes)
+        results = _bounded_imap(pool, _extract, tasks(), window=WINDOW_PER_PROCESS * processes)
+    else:
+        results = map(_extract, tasks())
+
+    t0 = last = time.perf_counter()
+    try:
+        for record in results:
+            stats["files"] += 1
+            error = record.pop("error")
+            if error is not None:
+                seen.add_error(record["sha256"], record["source"], error)   # retried on the next run
+                stats["errors"] += 1
+            else:
+                sink.write(record)
+                seen.add(record["sha256"], record["source"])
+                stats["pages"] += record["pages"]
+            now = time.perf_counter()
+            if now - last >= REPORT_EVERY_S:
+                sink.flush()
+                seen.commit()   # only after the records are on disk
+                last = now
+                print(f"[ingest] {stats['files']} files, {stats['pages']} pages, "
+                      f"{stats['pages'] / (now - t0):,.1f} pages/s, {stats['skipped']} skipped, "
+                      f"{stats['errors']} errors", flush=True)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        sink.close()
+        seen.close()
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    stats["seconds"] = elapsed
+    stats["pages_per_sec"] = stats["pages"] / elapsed
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("inputs", nargs="+", help="PDF files, directories, .zip or .tar(.gz) archives")
+    ap.add_argument("--out", required=True, help=".jsonl file or Parquet output directory")
+    ap.add_argument("--format", choices=["jsonl", "parquet"], default=None, help="default: from --out")
+    ap.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--structured", action="store_true", help="add per-page text, sections, skills and digest")
+    ap.add_argument("--index", default=None, help="seen-hash SQLite file (default: <out>.seen.sqlite)")
+    args = ap.parse_args(argv)
+
+    stats = run(args.inputs, args.out, fmt=args.format, processes=args.processes,
+                structured=args.structured, index=args.index)
+    print(f"[ingest] done: {stats['files']} files, {stats['pages']} pages in {stats['seconds']:.1f}s "
+          f"({stats['pages_per_sec']:,.1f} pages/s), {stats['skipped']} skipped, {stats['errors']} errors")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,23 +1,34 @@
-import fitz  # PyMuPDF
 import sys
+import json
+from pathlib import Path
+
+# Same extraction engine as the /parse-cv endpoint
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend" / "functions" / "src"))
+from pdf_extract import extract_text, parse_pdf  # noqa: E402
+
+NO_LIMITS = {"max_bytes": sys.maxsize, "max_pages": sys.maxsize}  # local files: no upload limits
 
 def pdf_to_text(path: str) -> str:
     """Extract all text from a PDF file using PyMuPDF."""
-    doc = fitz.open(path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    doc.close()
-    return text
+    return extract_text(Path(path).read_bytes(), **NO_LIMITS)
+
+def pdf_to_structured(path: str) -> dict:
+    """Text, per-page text, sections, skills and CV digest of a PDF file."""
+    return parse_pdf(Path(path).read_bytes(), **NO_LIMITS)
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python script.py <path-to-pdf>")
+    args = sys.argv[1:]
+    as_json = "--json" in args
+    args = [a for a in args if a != "--json"]
+    if len(args) != 1:
+        print("Usage: python script.py <path-to-pdf> [--json]")
         sys.exit(1)
 
-    pdf_path = sys.argv[1]
-    text = pdf_to_text(pdf_path)
-    print(text)
+    pdf_path = args[0]
+    if as_json:
+        print(json.dumps(pdf_to_structured(pdf_path), ensure_ascii=False, indent=2))
+    else:
+        print(pdf_to_text(pdf_path))
 
 if __name__ == "__main__":
     main()
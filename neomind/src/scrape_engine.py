@@ -0,0 +1,502 @@
+"""Concurrent, browser-less scraping engine for Indeed-style job listings.
+
+Listing and detail pages are fetched over HTTP by a bounded pool of async
+requests with per-host rate limiting and retry/backoff, and parsed with a
+small stdlib HTML tree that understands the CSS selectors the Selenium
+scraper used.  A pool of Chrome instances is started only if a page comes
+back blocked (captcha / 403 / 429 after retries), and pages are handed to it
+one per free browser.
+
+Every URL is built from *base_url*, so the whole engine runs offline against
+fixture pages served from a local HTTP server.
+"""
+import asyncio
+import random
+import time
+import urllib.parse
+from html.parser import HTMLParser
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+INDEED_URL   = "https://www.indeed.com/jobs"
+PAGE_SIZE    = 10       # cards per listing page (the `start` step)
+CONCURRENCY  = 8        # requests in flight
+HOST_RATE    = 2.0      # requests/second per host (0 = unlimited)
+HOST_BURST   = 4
+TIMEOUT_S    = 20.0
+MAX_ATTEMPTS = 4
+BASE_DELAY   = 0.5      # seconds; doubled per retry, plus jitter
+MAX_RETRY_AFTER_S = 60.0   # longest server-requested Retry-After honoured
+BROWSERS     = 2        # fallback Chrome instances, started on first need
+USER_AGENT   = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36")
+
+_BLOCK_MARKERS = ("captcha", "cf-challenge", "verify you are human")
+
+Row = List[str]   # [title, company, location, salary, summary, link]
+
+# ---------------------------------------------------------------------------
+# HTML TREE + CSS SUBSET
+# ---------------------------------------------------------------------------
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+         "param", "source", "track", "wbr"}
+_SKIP_TEXT = {"script", "style", "noscript", "template"}
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Node"]):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[Any] = []   # Node or str
+        self.parent = parent
+
+    @property
+    def classes(self) -> List[str]:
+        return self.attrs.get("class", "").split()
+
+    def iter(self) -> Iterator["Node"]:
+        """Descendant elements in document order."""
+        stack = [c for c in reversed(self.children) if isinstance(c, Node)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(c for c in reversed(node.children) if isinstance(c, Node))
+
+    def _texts(self) -> Iterator[str]:
+        for c in self.children:
+            if isinstance(c, str):
+                yield c
+            elif c.tag not in _SKIP_TEXT:
+                yield from c._texts()
+
+    @property
+    def text(self) -> str:
+        """Whitespace-collapsed text content (what the Selenium scraper then cleaned)."""
+        return " ".join(" ".join(self._texts()).split())
+
+    def get(self, attr: str, default: str = "") -> str:
+        return self.attrs.get(attr, default)
+
+    def select(self, selector: str) -> List["Node"]:
+        chain = _parse_selector(selector)
+        return [n for n in self.iter() if _matches(n, chain)]
+
+    def select_one(self, selector: str) -> Optional["Node"]:
+        chain = _parse_selector(selector)
+        return next((n for n in self.iter() if _matches(n, chain)), None)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {}, None)
+        self.cur = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {k: v or "" for k, v in attrs}, self.cur)
+        self.cur.children.append(node)
+        if tag not in _VOID:
+            self.cur = node
+
+    def handle_startendtag(self, tag, attrs):
+        self.cur.children.append(Node(tag, {k: v or "" for k, v in attrs}, self.cur))
+
+    def handle_endtag(self, tag):
+        node = self.cur
+        while node is not self.root and node.tag != tag:   # tolerate unclosed tags
+            node = node.parent
+        if node is not self.root:
+            self.cur = node.parent
+
+    def handle_data(self, data):
+        self.cur.children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+Compound = Tuple[str, str, Tuple[str, ...]]   # (tag or "", id or "", classes)
+
+
+def _parse_compound(token: str) -> Compound:
+    tag, ident, classes, buf, kind = "", "", [], "", "tag"
+    for ch in token + ".":
+        if ch in ".#":
+            if kind == "tag":
+                tag = buf
+            elif kind == "id":
+                ident = buf
+            elif buf:
+                classes.append(buf)
+            buf, kind = "", ("id" if ch == "#" else "class")
+        else:
+            buf += ch
+    return tag.lower(), ident, tuple(classes)
+
+
+_selector_cache: Dict[str, List[Tuple[str, Compound]]] = {}
+
+
+def _parse_selector(selector: str) -> List[Tuple[str, Compound]]:
+    """``"h2.jobTitle > span"`` → [(" ", h2.jobTitle), (">", span)]; tag/#id/.class, descendant and child."""
+    chain = _selector_cache.get(selector)
+    if chain is None:
+        chain, comb = [], " "
+        for token in selector.replace(">", " > ").split():
+            if token == ">":
+                comb = ">"
+                continue
+            chain.append((comb, _parse_compound(token)))
+            comb = " "
+        _selector_cache[selector] = chain
+    return chain
+
+
+def _match_compound(node: Node, compound: Compound) -> bool:
+    tag, ident, classes = compound
+    if tag and node.tag != tag:
+        return False
+    if ident and node.attrs.get("id") != ident:
+        return False
+    if classes:
+        have = node.classes
+        return all(c in have for c in classes)
+    return True
+
+
+def _matches(node: Node, chain: List[Tuple[str, Compound]]) -> bool:
+    comb, compound = chain[-1]
+    if not _match_compound(node, compound):
+        return False
+    if len(chain) == 1:
+        return True
+    parent = node.parent
+    if comb == ">":
+        return parent is not None and parent.tag != "#document" and _matches(parent, chain[:-1])
+    while parent is not None and parent.tag != "#document":
+        if _matches(parent, chain[:-1]):
+            return True
+        parent = parent.parent
+    return False
+
+# ---------------------------------------------------------------------------
+# PAGE PARSING
+# ---------------------------------------------------------------------------
+
+def clean_text(text: Optional[str]) -> str:
+    # Remove problematic characters that break CSV formatting
+    if not text:
+        return ""
+    return (
+        text.replace('\n', ' ')
+            .replace('\r', ' ')
+            .replace('\t', ' ')
+            .replace('"', "'")
+            .strip()
+    )
+
+
+def _first_text(card: Node, *selectors: str) -> str:
+    for sel in selectors:
+        node = card.select_one(sel)
+        if node is not None:
+            return clean_text(node.text)
+    return ""
+
+
+def _title(card: Node) -> str:
+    spans = card.select("h2.jobTitle > span")
+    if not spans:
+        return ""
+    if len(spans) > 1 and spans[0].text.lower() == "new":
+        return clean_text(spans[1].text)
+    return clean_text(spans[0].text)
+
+
+def parse_listing(html: str, page_url: str) -> List[Row]:
+    """Cards of one listing page, in page order; links resolved against *page_url*."""
+    rows = []
+    for card in parse_html(html).select("div.tapItem"):
+        a = card.select_one("a")
+        link = urllib.parse.urljoin(page_url, a.get("href")) if a is not None and a.get("href") else ""
+        rows.append([
+            _title(card),
+            _first_text(card, "span.companyName", "span.company"),
+            _first_text(card, "div.companyLocation", "span.location"),
+            _first_text(card, "div.metadata.salary-snippet-container", "span.salary-snippet"),
+            _first_text(card, "div.job-snippet"),
+            link,
+        ])
+    return rows
+
+
+def parse_detail(html: str) -> str:
+    node = parse_html(html).select_one("#jobDescriptionText")
+    return clean_text(node.text) if node is not None else ""
+
+
+def looks_blocked(html: str) -> bool:
+    head = html[:20000].lower()
+    return any(m in head for m in _BLOCK_MARKERS)
+
+# ---------------------------------------------------------------------------
+# FETCHING
+# ---------------------------------------------------------------------------
+
+class RateLimiter:
+    """Async token bucket: *rate* requests/second with bursts of up to *burst*."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Blocked(Exception):
+    """The site answered with a challenge page or kept refusing the request."""
+
+
+class ListingError(Exception):
+    """A listing page could not be fetched; pages before it were yielded."""
+
+
+class BrowserPool:
+    """Lazily started pool of undetected-Chrome drivers, used only for blocked pages."""
+
+    def __init__(self, size: int = BROWSERS, settle_s: float = 2.0):
+        self.size = max(1, size)
+        self.settle_s = settle_s
+        self._drivers: Optional[asyncio.Queue] = None
+        self._all: List[Any] = []
+        self._start_lock = asyncio.Lock()
+
+    def _new_driver(self):
+        import undetected_chromedriver as uc   # only needed when a page is blocked
+
+        options = uc.ChromeOptions()
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument(f"user-agent={USER_AGENT}")
+        return uc.Chrome(options=options)
+
+    async def _ensure_started(self) -> None:
+        async with self._start_lock:
+            if self._drivers is None:
+                drivers = await asyncio.gather(*(asyncio.to_thread(self._new_driver) for _ in range(self.size)))
+                self._all = list(drivers)
+                self._drivers = asyncio.Queue()
+                for d in drivers:
+                    self._drivers.put_nowait(d)
+
+    def _load(self, driver, url: str) -> str:
+        driver.get(url)
+        time.sleep(self.settle_s)   # let client-side rendering finish
+        return driver.page_source
+
+    async def fetch(self, url: str) -> str:
+        await self._ensure_started()
+        driver = await self._drivers.get()
+        try:
+            return await asyncio.to_thread(self._load, driver, url)
+        finally:
+            self._drivers.put_nowait(driver)
+
+    async def close(self) -> None:
+        for d in self._all:
+            await asyncio.to_thread(d.quit)
+        self._all, self._drivers = [], None
+
+
+class Fetcher:
+    """Bounded, per-host rate-limited HTTP GETs with retries and a browser fallback.
+
+    *browser* is ``"auto"`` (fall back when blocked), ``"never"`` or ``"always"``.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = CONCURRENCY,
+        rate: float = HOST_RATE,
+        burst: int = HOST_BURST,
+        timeout: float = TIMEOUT_S,
+        max_attempts: int = MAX_ATTEMPTS,
+        base_delay: float = BASE_DELAY,
+        max_retry_after: float = MAX_RETRY_AFTER_S,
+        browser: str = "auto",
+        browsers: int = BROWSERS,
+    ):
+        self.client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"},
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self.slots = asyncio.Semaphore(concurrency)
+        self.rate, self.burst = rate, burst
+        self.limiters: Dict[str, RateLimiter] = {}
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_retry_after = max_retry_after
+        self.browser = browser
+        self.browsers = BrowserPool(browsers) if browser != "never" else None
+        self.stats = {"http": 0, "browser": 0, "retries": 0}
+
+    def _limiter(self, url: str) -> RateLimiter:
+        host = urllib.parse.urlsplit(url).netloc
+        if host not in self.limiters:
+            self.limiters[host] = RateLimiter(self.rate, self.burst)
+        return self.limiters[host]
+
+    async def _http(self, url: str) -> str:
+        for attempt in range(1, self.max_attempts + 1):
+            await self._limiter(url).acquire()
+            try:
+                async with self.slots:
+                    resp = await self.client.get(url)
+                self.stats["http"] += 1
+                if resp.status_code == 200:
+                    if looks_blocked(resp.text):
+                        raise Blocked(url)
+                    return resp.text
+                if resp.status_code not in (403, 429) and resp.status_code < 500:
+                    resp.raise_for_status()
+                retry_after = resp.headers.get("Retry-After", "")
+                delay = min(float(retry_after), self.max_retry_after) if retry_after.isdigit() else None
+            except (httpx.TransportError, httpx.TimeoutException):
+                delay = None
+            if attempt == self.max_attempts:
+                break
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay if delay is not None else
+                                self.base_delay * 2 ** (attempt - 1) * (1 + random.random()))
+        raise Blocked(url)
+
+    async def get(self, url: str) -> str:
+        if self.browser == "always":
+            self.stats["browser"] += 1
+            return await self.browsers.fetch(url)
+        try:
+            return await self._http(url)
+        except Blocked:
+            if self.browsers is None:
+                raise
+            self.stats["browser"] += 1
+            return await self.browsers.fetch(url)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+        if self.browsers is not None:
+            await self.browsers.close()
+
+# ---------------------------------------------------------------------------
+# SCRAPE
+# ---------------------------------------------------------------------------
+
+def listing_url(base_url: str, search_term: str, location: str, start: int) -> str:
+    q = urllib.parse.quote_plus(search_term)
+    l = urllib.parse.quote_plus(location)
+    return f"{base_url}?q={q}&l={l}&start={start}"
+
+
+async def fetch_detail(fetcher: Fetcher, link: str) -> str:
+    try:
+        return parse_detail(await fetcher.get(link))
+    except Exception as e:
+        print(f"Error fetching job details page: {e}")
+        return ""
+
+
+async def fill_details(fetcher: Fetcher, rows: List[Row]) -> None:
+    """Fetch detail pages, concurrently, for rows still missing a title or summary."""
+    todo = [r for r in rows if (not r[0] or not r[4]) and r[5]]
+    details = await asyncio.gather(*(fetch_detail(fetcher, r[5]) for r in todo))
+    for row, desc in zip(todo, details):
+        if not row[4]:
+            row[4] = desc
+
+
+async def scrape_listings(
+    fetcher: Fetcher,
+    search_term: str,
+    location: str,
+    num_jobs: int,
+    *,
+    base_url: str = INDEED_URL,
+    page_size: int = PAGE_SIZE,
+    first_start: int = 0,
+) -> AsyncIterator[Tuple[int, List[Row]]]:
+    """Yield ``(start, rows)`` per listing page, in order, fetching pages in concurrent waves."""
+    start, wanted = first_start, num_jobs
+    while wanted > 0:
+        starts = [start + i * page_size for i in range(-(-wanted // page_size))]
+        pages = await asyncio.gather(*(fetcher.get(listing_url(base_url, search_term, location, s))
+                                       for s in starts), return_exceptions=True)
+        for s, html in zip(starts, pages):
+            if isinstance(html, Exception):
+                raise ListingError(f"Listing page start={s} failed: {html}") from html
+            rows = parse_listing(html, listing_url(base_url, search_term, location, s))
+            if not rows:
+                print("No job cards found on this page.")
+                return
+            wanted -= len(rows)
+            yield s, rows
+            if wanted <= 0:
+                return
+        start = starts[-1] + page_size
+
+
+async def scrape(
+    search_term: str,
+    location: str,
+    num_jobs: int,
+    *,
+    base_url: str = INDEED_URL,
+    fetcher: Optional[Fetcher] = None,
+    **fetch_options,
+) -> List[Row]:
+    """Up to *num_jobs* rows ``[title, company, location, salary, summary, link]``."""
+    own = fetcher is None
+    fetcher = fetcher or Fetcher(**fetch_options)
+    rows: List[Row] = []
+    details = []   # detail pages of one listing page load while the next wave is fetched
+    try:
+        try:
+            async for _, page_rows in scrape_listings(fetcher, search_term, location, num_jobs, base_url=base_url):
+                page_rows = page_rows[: num_jobs - len(rows)]
+                rows.extend(page_rows)
+                details.append(asyncio.create_task(fill_details(fetcher, page_rows)))
+        except ListingError as e:
+            print(f"{e}; keeping {len(rows)} jobs")
+        await asyncio.gather(*details)
+    finally:
+        for task in details:   # only still running if something above failed
+            task.cancel()
+        await asyncio.gather(*details, return_exceptions=True)
+        if own:
+            await fetcher.close()
+    return rows
@@ -0,0 +1,225 @@
+"""Incremental, deduplicating store for scraped job postings (SQLite).
+
+Rows are upserted page by page as they are scraped, keyed by Indeed's job key
+(``jk`` in the link), so a crash loses at most the page in flight.  Each
+search keeps a checkpoint with the next listing ``start`` offset; a rerun of
+an interrupted search resumes there, and a completed search clears it so the
+next refresh starts from the first page again.
+
+Listing cards are fingerprinted; when a posting comes back with the same
+fingerprint its stored description is reused instead of fetching the detail
+page again, so daily refreshes only fetch pages for new or changed postings.
+"""
+import asyncio
+import csv
+import hashlib
+import sqlite3
+import time
+import urllib.parse
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from scrape_engine import INDEED_URL, PAGE_SIZE, Fetcher, ListingError, Row, fetch_detail, scrape_listings
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+STORE_PATH = "indeed_jobs.sqlite"
+CSV_HEADER = ["Title", "Company", "Location", "Salary", "Summary", "Link"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    jk          TEXT PRIMARY KEY,
+    title       TEXT, company TEXT, location TEXT, salary TEXT, summary TEXT, link TEXT,
+    card_hash   TEXT NOT NULL,
+    first_seen  REAL NOT NULL,
+    last_seen   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    query       TEXT PRIMARY KEY,
+    start       INTEGER NOT NULL,
+    collected   INTEGER NOT NULL,
+    updated_at  REAL NOT NULL
+);
+"""
+
+# ---------------------------------------------------------------------------
+# KEYS
+# ---------------------------------------------------------------------------
+
+def job_key(link: str) -> str:
+    """Indeed's ``jk`` (or ``vjk``) from a job link; a hash of the link if it has neither."""
+    qs = urllib.parse.parse_qs(urllib.parse.urlsplit(link).query)
+    for name in ("jk", "vjk"):
+        if qs.get(name):
+            return qs[name][0]
+    return "link-" + hashlib.sha1(link.encode("utf-8")).hexdigest()[:16]
+
+
+def card_hash(row: Row) -> str:
+    """Fingerprint of what the listing card shows (title, company, location, salary, snippet)."""
+    return hashlib.sha1("\x1f".join(row[:5]).encode("utf-8")).hexdigest()
+
+
+def query_key(search_term: str, location: str) -> str:
+    return f"{search_term.strip().lower()}|{location.strip().lower()}"
+
+# ---------------------------------------------------------------------------
+# STORE
+# ---------------------------------------------------------------------------
+
+class ScrapeStore:
+    def __init__(self, path: str = STORE_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+
+    def known(self, jks: List[str]) -> Dict[str, Tuple[str, str]]:
+        """``{jk: (card_hash, summary)}`` for the stored postings among *jks*."""
+        if not jks:
+            return {}
+        marks = ",".join("?" * len(jks))
+        cur = self.db.execute(f"SELECT jk, card_hash, summary FROM jobs WHERE jk IN ({marks})", jks)
+        return {jk: (h, s) for jk, h, s in cur}
+
+    def upsert(self, rows: List[Tuple[str, str, Row]]) -> None:
+        """Insert or refresh ``(jk, card_hash, row)`` records; first_seen is kept."""
+        now = time.time()
+        self.db.executemany(
+            """INSERT INTO jobs (jk, title, company, location, salary, summary, link, card_hash, first_seen, last_seen)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(jk) DO UPDATE SET
+                   title=excluded.title, company=excluded.company, location=excluded.location,
+                   salary=excluded.salary, summary=excluded.summary, link=excluded.link,
+                   card_hash=excluded.card_hash, last_seen=excluded.last_seen""",
+            [(jk, *row, h, now, now) for jk, h, row in rows],
+        )
+
+    def checkpoint(self, query: str) -> Tuple[int, int]:
+        """``(start, collected)`` of an unfinished run of *query*, else ``(0, 0)``."""
+        row = self.db.execute("SELECT start, collected FROM checkpoints WHERE query = ?", (query,)).fetchone()
+        return (row[0], row[1]) if row else (0, 0)
+
+    def save_checkpoint(self, query: str, start: int, collected: int) -> None:
+        self.db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                        (query, start, collected, time.time()))
+
+    def clear_checkpoint(self, query: str) -> None:
+        self.db.execute("DELETE FROM checkpoints WHERE query = ?", (query,))
+
+    def commit(self) -> None:
+        self.db.commit()
+
+    def rows(self) -> Iterator[Row]:
+        """All stored postings, oldest first, streamed from the database."""
+        cur = self.db.execute(
+            "SELECT title, company, location, salary, summary, link FROM jobs ORDER BY first_seen, rowid")
+        for row in cur:
+            yield list(row)
+
+    def export_csv(self, path: str) -> int:
+        """Write the store in the legacy indeed_jobs.csv layout; returns the row count."""
+        n = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL, quotechar='"')
+            writer.writerow(CSV_HEADER)
+            for row in self.rows():
+                writer.writerow(row)
+                n += 1
+        return n
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
+
+# ---------------------------------------------------------------------------
+# INCREMENTAL SCRAPE
+# ---------------------------------------------------------------------------
+
+async def _complete_page(fetcher: Fetcher, store: ScrapeStore, rows: List[Row], stats: Dict[str, int]):
+    """Fill descriptions for one listing page; detail pages only for new/changed postings."""
+    keyed, page_jks = [], set()
+    for r in rows:
+        jk = job_key(r[5]) if r[5] else None
+        if jk is not None and jk in page_jks:
+            continue                    # the same posting twice on one page
+        page_jks.add(jk)
+        keyed.append((jk, card_hash(r), r))
+    known = store.known([jk for jk, _, _ in keyed if jk])
+    todo = []
+    for jk, h, row in keyed:
+        if (row[0] and row[4]) or not row[5]:
+            continue
+        prev = known.get(jk)
+        if prev is not None and prev[0] == h and prev[1]:
+            row[4] = prev[1]            # unchanged card: reuse the stored description
+            stats["reused"] += 1
+        else:
+            todo.append(row)
+    details = await asyncio.gather(*(fetch_detail(fetcher, r[5]) for r in todo))
+    for row, desc in zip(todo, details):
+        if not row[4]:
+            row[4] = desc
+    stats["details"] += len(todo)
+    stats["new"] += sum(1 for jk, _, _ in keyed if jk and jk not in known)
+    return [(jk, h, row) for jk, h, row in keyed if jk]
+
+
+async def scrape_incremental(
+    store: ScrapeStore,
+    search_term: str,
+    location: str,
+    num_jobs: int,
+    *,
+    base_url: str = INDEED_URL,
+    fetcher: Optional[Fetcher] = None,
+    **fetch_options,
+) -> Dict[str, int]:
+    """Scrape up to *num_jobs* postings into *store*, resuming an interrupted run."""
+    query = query_key(search_term, location)
+    start, collected = store.checkpoint(query)
+    stats = {"pages": 0, "stored": 0, "new": 0, "details": 0, "reused": 0, "resumed_at": start}
+    own = fetcher is None
+    fetcher = fetcher or Fetcher(**fetch_options)
+    pending: List[Tuple[int, asyncio.Task]] = []
+    queued = collected
+    stored_jks: Set[str] = set()   # postings repeated on later pages count once
+
+    def flush_ready() -> None:
+        nonlocal collected
+        # pages are stored, and the checkpoint advanced, strictly in listing order
+        while pending and pending[0][1].done():
+            page_start, task = pending.pop(0)
+            records = task.result()
+            store.upsert(records)
+            fresh = {jk for jk, _, _ in records} - stored_jks
+            stored_jks.update(fresh)
+            collected += len(fresh)
+            store.save_checkpoint(query, page_start + PAGE_SIZE, collected)
+            store.commit()
+            stats["pages"] += 1
+            stats["stored"] += len(fresh)
+
+    try:
+        try:
+            async for page_start, rows in scrape_listings(fetcher, search_term, location, num_jobs - collected,
+                                                          base_url=base_url, first_start=start):
+                rows = rows[: num_jobs - queued]
+                queued += len(rows)
+                pending.append((page_start, asyncio.create_task(_complete_page(fetcher, store, rows, stats))))
+                flush_ready()
+        except ListingError:
+            # keep the pages before the failed one; the checkpoint now points at it
+            await asyncio.gather(*(task for _, task in pending))
+            flush_ready()
+            raise
+        await asyncio.gather(*(task for _, task in pending))
+        flush_ready()
+        store.clear_checkpoint(query)   # finished: the next refresh starts from page one
+        store.commit()
+    finally:
+        for _, task in pending:
+            task.cancel()
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+        if own:
+            await fetcher.close()
+    return stats
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+import job_recommendation as jr
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+SWIPES_COLLECTION = "swipes"   # written by the `swipeJob` cloud function
+FIRESTORE_IN_MAX  = 30         # values per Firestore "in" filter
+PREF_L2    = 1.0               # pull per-user vectors towards the global model
+PREF_STEPS = 50
+PREF_LR    = 0.5
+
+Swipe = Tuple[str, bool]       # (jobId, liked)
+
+# ---------------------------------------------------------------------------
+# SCORER
+# ---------------------------------------------------------------------------
+
+class PersonalScorer:
+    """Scores the prediction set for individual users.
+
+    The fitted ``ColumnTransformer`` output for the prediction rows is cached
+    once as a CSR matrix ``X``.  A user is a preference vector ``u`` added to
+    the global logistic-regression weights, so scoring is one sparse mat-vec
+    ``X @ (w + u)`` and never re-runs one-hot encoding or ``predict_proba``.
+    """
+
+    __slots__ = ("X", "coef", "intercept")
+
+    def __init__(self, X: sp.csr_matrix, coef: np.ndarray, intercept: float):
+        self.X = X
+        self.coef = coef
+        self.intercept = intercept
+
+    @classmethod
+    def from_pipeline(cls, pipe, df) -> "PersonalScorer":
+        X = sp.csr_matrix(pipe.named_steps["prep"].transform(jr._features(df)), dtype=np.float64)
+        model = pipe.named_steps["model"]
+        return cls(X, np.asarray(model.coef_[0], dtype=np.float64), float(model.intercept_[0]))
+
+    @property
+    def n_features(self) -> int:
+        return self.X.shape[1]
+
+    def zero_preference(self) -> np.ndarray:
+        return np.zeros(self.n_features, dtype=np.float64)
+
+    def fit_preference(self, positions: List[int], liked: List[bool]) -> np.ndarray:
+        """Learn a user's offset from the global weights on their swiped rows.
+
+        L2-regularised logistic regression on the user's own labels, with the
+        global model as the prior (``u = 0``), solved by a few gradient steps
+        over the handful of rows the user has actually seen.
+        """
+        u = self.zero_preference()
+        if not positions:
+            return u
+        Xs = self.X[positions]
+        y = np.asarray(liked, dtype=np.float64)
+        base = Xs @ self.coef + self.intercept
+        m = len(positions)
+        for _ in range(PREF_STEPS):
+            p = _sigmoid(base + Xs @ u)
+            grad = Xs.T @ (p - y) / m + PREF_L2 * u / m
+            u -= PREF_LR * grad
+        return u
+
+    def score(self, preference: np.ndarray | None = None) -> np.ndarray:
+        w = self.coef if preference is None else self.coef + preference
+        return _sigmoid(self.X @ w + self.intercept)
+
+    def score_many(self, preferences: np.ndarray) -> np.ndarray:
+        """Scores for a batch of users: ``(n_users, n_features)`` → ``(n_users, n_jobs)``."""
+        W = self.coef[:, None] + np.asarray(preferences, dtype=np.float64).T
+        return _sigmoid(self.X @ W + self.intercept).T
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _scorer() -> PersonalScorer:
+    return _scorer_at(jr._model_version())
+
+
+@lru_cache(maxsize=1)
+def _scorer_at(version) -> PersonalScorer:
+    return PersonalScorer.from_pipeline(jr._load_model_at(version), jr._pred_df())
+
+# ---------------------------------------------------------------------------
+# PREFERENCES FROM SWIPES
+# ---------------------------------------------------------------------------
+
+def learn_preference(swipes: Iterable[Swipe]) -> np.ndarray:
+    """Preference vector for one user from their ``(jobId, liked)`` swipes."""
+    positions, liked = jr._catalog().resolve(swipes)
+    return _scorer().fit_preference(positions, [bool(v) for v in liked])
+
+
+def learn_preferences(swipes_by_user: Mapping[str, Iterable[Swipe]]) -> Dict[str, np.ndarray]:
+    return {uid: learn_preference(swipes) for uid, swipes in swipes_by_user.items()}
+
+
+def load_swipes(user_ids: Iterable[str] | None = None) -> Dict[str, List[Swipe]]:
+    """Read the `swipes` collection, grouped by user.
+
+    With *user_ids* only those users' swipes are queried (``userId in [...]``,
+    FIRESTORE_IN_MAX ids per query) instead of streaming the whole collection.
+    """
+    coll = jr._init_firestore().collection(SWIPES_COLLECTION)
+    if user_ids is None:
+        queries = [coll]
+    else:
+        wanted = sorted(set(user_ids))
+        queries = [coll.where("userId", "in", wanted[i:i + FIRESTORE_IN_MAX])
+                   for i in range(0, len(wanted), FIRESTORE_IN_MAX)]
+    grouped: Dict[str, List[Swipe]] = defaultdict(list)
+    for query in queries:
+        for doc in query.stream():
+            d = doc.to_dict() or {}
+            uid, job_id = d.get("userId"), d.get("jobId")
+            if uid and job_id:
+                grouped[uid].append((job_id, bool(d.get("liked"))))
+    return dict(grouped)
+
+# ---------------------------------------------------------------------------
+# PUBLIC PICKERS
+# ---------------------------------------------------------------------------
+
+def personalized_job_objects(
+    preference: np.ndarray | None,
+    n: int = 3,
+    *,
+    shown: Iterable[str] | None = None,
+    randomize: bool = False,
+) -> List[Dict[str, Any]]:
+    return jr._pick_job_objects(_scorer().score(preference), n, shown, randomize)
+
+
+def personalized_scores(preferences: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Batched scoring: one ``X @ W`` product for every user in *preferences*."""
+    uids = list(preferences)
+    if not uids:
+        return {}
+    scores = _scorer().score_many(np.vstack([preferences[u] for u in uids]))
+    return dict(zip(uids, scores))
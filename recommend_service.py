@@ -0,0 +1,289 @@
+"""Recommendation HTTP service: the model, catalog and scorer loaded once, shared by every worker.
+
+    python recommend_service.py --workers 4 --port 8001
+
+The master process loads the model, the job catalog and the personalization
+scorer, freezes them out of the garbage collector (``gc.freeze``), binds the
+listening socket and only then forks the workers.  Workers start ready and
+read the master's pages copy-on-write: the numpy arrays and memory-mapped
+frames are never written, and frozen objects are not touched by collections,
+so adding a worker costs its request-time allocations rather than another copy
+of the model (see benchmarks/bench_recommend_service.py).  ``--no-preload``
+(or a plain ``uvicorn recommend_service:app``) loads in each worker instead,
+in the background, with ``/ready`` answering 503 until it is done.
+
+Each worker admits at most RECOMMEND_MAX_INFLIGHT requests; a request that
+cannot get a slot within RECOMMEND_QUEUE_TIMEOUT_S is answered 503.
+
+    GET  /health                    liveness
+    GET  /metrics                   Prometheus text: stage timings, in-flight work (per worker)
+    GET  /ready                     200 once the model and catalog are loaded, else 503
+    GET  /recommendations           ?n=3&randomize=false&block=false&shown=<firm>&shown=...
+    POST /recommendations/personal  {"swipes": [{"jobId": ..., "liked": true}], "n": 3, ...}
+"""
+from __future__ import annotations
+
+import argparse, asyncio, gc, os, signal, socket, sys, threading, time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Query, Response
+from pydantic import BaseModel, Field
+
+import job_recommendation as jr
+import personalization as ps
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "backend" / "functions"))  # shared with the API servers
+from instrumentation import in_flight, instrument, stage  # noqa: E402
+
+# ---------------------------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------------------------
+MAX_INFLIGHT    = int(os.getenv("RECOMMEND_MAX_INFLIGHT", "32"))       # per worker
+QUEUE_TIMEOUT_S = float(os.getenv("RECOMMEND_QUEUE_TIMEOUT_S", "5"))
+MAX_N           = int(os.getenv("RECOMMEND_MAX_N", "50"))              # jobs per response
+WORKERS         = int(os.getenv("RECOMMEND_WORKERS", str(os.cpu_count() or 1)))
+RESPAWN_BACKOFF_S     = float(os.getenv("RECOMMEND_RESPAWN_BACKOFF_S", "0.5"))  # doubled per quick crash
+RESPAWN_BACKOFF_MAX_S = float(os.getenv("RECOMMEND_RESPAWN_BACKOFF_MAX_S", "30"))
+RESPAWN_HEALTHY_S     = float(os.getenv("RECOMMEND_RESPAWN_HEALTHY_S", "30"))   # uptime that resets the count
+RESPAWN_MAX_FAILURES  = int(os.getenv("RECOMMEND_RESPAWN_MAX_FAILURES", "5"))   # quick crashes in a row
+
+# ---------------------------------------------------------------------------
+# PRELOAD
+# ---------------------------------------------------------------------------
+_ready = threading.Event()
+_preload_error: BaseException | None = None
+
+
+def preload() -> float:
+    """Load everything a request reads (model, catalog, ranking, personal scorer); returns seconds."""
+    global _preload_error
+    t0 = time.perf_counter()
+    try:
+        jr.warm_up()
+        ps._scorer()
+    except BaseException as e:
+        _preload_error = e
+        raise
+    _preload_error = None
+    _ready.set()
+    return time.perf_counter() - t0
+
+
+def _preload_in_background() -> None:
+    def run():
+        try:
+            print(f"[recommend] pid {os.getpid()} loaded in {preload():.2f}s", flush=True)
+        except Exception as e:
+            print(f"[recommend] pid {os.getpid()} preload failed: {e!r}", flush=True)
+
+    threading.Thread(target=run, name="recommend-preload", daemon=True).start()
+
+# ---------------------------------------------------------------------------
+# APP
+# ---------------------------------------------------------------------------
+slots: asyncio.Semaphore | None = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global slots
+    slots = asyncio.Semaphore(MAX_INFLIGHT)
+    if not _ready.is_set():
+        _preload_in_background()      # not forked from a preloaded master
+    yield
+
+
+app = FastAPI(title="NeoMind recommendations", lifespan=lifespan)
+instrument(app)
+
+
+async def _run_limited(fn, *args, **kwargs):
+    """Run *fn* on a thread once a request slot is free (503 if none frees up in time)."""
+    if not _ready.is_set():
+        raise HTTPException(status_code=503, detail="Recommender is still loading")
+    try:
+        with stage("recommend_queue"):
+            await asyncio.wait_for(slots.acquire(), QUEUE_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Recommender is busy, please retry")
+    try:
+        with in_flight("recommend"):
+            return await asyncio.to_thread(fn, *args, **kwargs)
+    finally:
+        slots.release()
+
+
+@app.get("/health")
+def health():
+    return {"ok": True}
+
+
+@app.get("/ready")
+def ready(response: Response):
+    if _ready.is_set():
+        return {"ready": True, "jobs": len(jr._catalog())}
+    response.status_code = 503
+    return {"ready": False, "error": repr(_preload_error) if _preload_error else None}
+
+
+@app.get("/recommendations")
+async def recommendations(
+    n: int = Query(3, ge=1, le=MAX_N),
+    randomize: bool = False,
+    block: bool = False,
+    shown: List[str] = Query(default=[]),
+):
+    """Top (or score-weighted, or a random contiguous block of) jobs by model score."""
+    return {"jobs": await _run_limited(_global, n, shown, randomize, block)}
+
+
+def _global(n: int, shown: List[str], randomize: bool, block: bool) -> List[Dict[str, Any]]:
+    if block:
+        with stage("job_objects"):
+            return jr.random_block_job_objects(n)
+    with stage("model_scoring"):
+        scores = jr._scores()
+    with stage("job_objects"):
+        return jr._pick_job_objects(scores, n, shown, randomize)
+
+
+class SwipeIn(BaseModel):
+    jobId: str
+    liked: bool
+
+
+class PersonalRequest(BaseModel):
+    swipes: List[SwipeIn] = Field(default_factory=list, description="The user's swipes, oldest first")
+    n: int = Field(3, ge=1, le=MAX_N)
+    shown: List[str] = Field(default_factory=list, description="Firm names to leave out")
+    randomize: bool = False
+
+
+def _personal(req: PersonalRequest) -> List[Dict[str, Any]]:
+    with stage("preference_fit"):
+        preference = ps.learn_preference([(s.jobId, s.liked) for s in req.swipes]) if req.swipes else None
+    with stage("model_scoring"):
+        scores = ps._scorer().score(preference)
+    with stage("job_objects"):
+        return jr._pick_job_objects(scores, req.n, req.shown, req.randomize)
+
+
+@app.post("/recommendations/personal")
+async def personal_recommendations(req: PersonalRequest):
+    """Jobs scored with the user's preference vector learned from their swipes."""
+    return {"jobs": await _run_limited(_personal, req)}
+
+# ---------------------------------------------------------------------------
+# PRE-FORK SERVER
+# ---------------------------------------------------------------------------
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker(sock: socket.socket, host: str, port: int) -> None:
+    import uvicorn
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    uvicorn.Server(uvicorn.Config(app, host=host, port=port, access_log=False)).run(sockets=[sock])
+
+
+def serve(host: str = "0.0.0.0", port: int = 8001, workers: int = WORKERS, *, preload_first: bool = True) -> None:
+    """Bind once, optionally preload, then fork *workers* uvicorn servers sharing the socket.
+
+    A worker that dies is replaced, after an exponential backoff if it died
+    within RESPAWN_HEALTHY_S of starting; after RESPAWN_MAX_FAILURES such
+    crashes in a row every worker is stopped and RuntimeError raised.
+    SIGINT/SIGTERM stop every worker and return.
+    """
+    if preload_first:
+        print(f"[recommend] preloaded in {preload():.2f}s, forking {workers} workers", flush=True)
+        gc.freeze()   # loaded objects leave the GC's lists, so collections in workers don't dirty their pages
+    sock = _bind(host, port)
+    children: Dict[int, Tuple[int, float]] = {}   # pid -> (slot, started)
+    failures = [0] * workers                       # quick crashes in a row, per slot
+    respawn_at: Dict[int, float] = {}              # slot -> when its backoff ends
+    stopping = False
+    gave_up: str | None = None
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _worker(sock, host, port)
+            finally:
+                os._exit(0)
+        children[pid] = (slot, time.monotonic())
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            os.kill(pid, signal.SIGTERM)
+
+    previous = {sig: signal.signal(sig, stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        for slot in range(workers):
+            spawn(slot)
+        while children or (respawn_at and not stopping):
+            if respawn_at and not stopping:
+                pid, status = os.waitpid(-1, os.WNOHANG) if children else (0, 0)
+                if pid == 0:
+                    time.sleep(max(0.0, min(min(respawn_at.values()) - time.monotonic(), 0.1)))
+                    now = time.monotonic()
+                    for slot in [s for s, due in respawn_at.items() if due <= now]:
+                        del respawn_at[slot]
+                        spawn(slot)
+                    continue
+            else:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+            entry = children.pop(pid, None)
+            if entry is None or stopping:
+                continue
+            slot, started = entry
+            if time.monotonic() - started >= RESPAWN_HEALTHY_S:
+                failures[slot] = 0
+                print(f"[recommend] worker {pid} exited ({status}), restarting", flush=True)
+                spawn(slot)
+                continue
+            failures[slot] += 1
+            if failures[slot] >= RESPAWN_MAX_FAILURES:
+                gave_up = (f"worker slot {slot} crashed {failures[slot]} times in a row "
+                           f"within {RESPAWN_HEALTHY_S:g}s of starting")
+                print(f"[recommend] {gave_up}, stopping", flush=True)
+                stop(None, None)
+                continue
+            delay = min(RESPAWN_BACKOFF_S * 2 ** (failures[slot] - 1), RESPAWN_BACKOFF_MAX_S)
+            print(f"[recommend] worker {pid} exited ({status}) after starting, restarting in {delay:g}s", flush=True)
+            respawn_at[slot] = time.monotonic() + delay
+    finally:
+        for sig, handler in previous.items():
+            if handler is not None:
+                signal.signal(sig, handler)
+        sock.close()
+    if gave_up:
+        raise RuntimeError(gave_up)
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8001)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--no-preload", action="store_true", help="load in each worker after the fork instead")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, args.workers, preload_first=not args.no_preload)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,53 @@
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# the services import their sibling modules by plain name
+for path in (ROOT, ROOT / "backend" / "functions", ROOT / "backend" / "functions" / "src", ROOT / "neomind" / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+class SMTPHandler:
+    """aiosmtpd handler recording deliveries, with scripted RCPT refusals."""
+
+    def __init__(self):
+        self.delivered = []      # (recipient, raw message)
+        self.rcpt_attempts = []
+        self.refusals = {}       # recipient -> RCPT replies in turn (None accepts); the last one sticks
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        self.rcpt_attempts.append(address)
+        refusals = self.refusals.get(address) or [None]
+        reply = refusals.pop(0) if len(refusals) > 1 else refusals[0]
+        if reply is not None:
+            return reply
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        for rcpt in envelope.rcpt_tos:
+            self.delivered.append((rcpt, envelope.content.decode("utf-8", "replace")))
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtpd():
+    from aiosmtpd.controller import Controller
+    handler = SMTPHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        yield controller
+    finally:
+        controller.stop()
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import batch_recommend as br
+import job_recommendation as jr
+from bulk_writer import JsonlBackend
+
+ROOT = Path(__file__).resolve().parents[1]
+USERS = [f"u{i}" for i in range(6)]
+
+
+class FlakySink(JsonlBackend):
+    """Fails every commit that carries a write for one of *failing*."""
+
+    def __init__(self, path, failing=()):
+        super().__init__(path)
+        self.failing = set(failing)
+
+    def commit(self, writes):
+        if any(path.split("/")[1] in self.failing for path, _ in writes):
+            raise RuntimeError("backend unavailable")
+        super().commit(writes)
+
+
+@pytest.fixture
+def job(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    users = tmp_path / "uids.txt"
+    users.write_text("\n".join(USERS) + "\n")
+    return {"users": str(users), "out": str(tmp_path / "recs.jsonl"), "checkpoint": str(tmp_path / "ckpt.json")}
+
+
+def _written(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["path"] for line in f]
+
+
+def test_checkpoint_stops_at_the_first_failed_chunk_and_rerun_retries_it(job):
+    run = dict(n=2, chunk_size=2, checkpoint=job["checkpoint"], randomize=False)
+
+    state = br.run(job["users"], FlakySink(job["out"], failing={"u2"}), **run)
+
+    # chunk [u2, u3] failed; [u4, u5] committed after it but must not move the checkpoint
+    assert (state["done"], state["failed"], state["last_uid"]) == (2, 2, "u1")
+    assert json.loads(Path(job["checkpoint"]).read_text())["done"] == 2
+    assert {p.split("/")[1] for p in _written(job["out"])} == {"u0", "u1", "u4", "u5"}
+
+    state = br.run(job["users"], FlakySink(job["out"]), **run)
+
+    assert (state["done"], state["failed"], state["last_uid"]) == (6, 0, "u5")
+    written = _written(job["out"])
+    assert len(written) == len(set(written)) == 2 * len(USERS)   # the redone chunk is not duplicated
+    assert sorted({p.split("/")[1] for p in written}) == USERS
+
+
+def test_swipes_are_read_per_chunk_and_swiped_jobs_skipped(job, tmp_path, monkeypatch):
+    cat = jr._catalog()
+    top = jr._ranking()[:2].tolist()
+    swipes = tmp_path / "swipes.jsonl"
+    swipes.write_text("".join(json.dumps({"userId": "u0", "jobId": cat.ids[p], "liked": True}) + "\n" for p in top)
+                      + json.dumps({"userId": "nobody", "jobId": cat.ids[0], "liked": False}) + "\n")
+
+    source = br.open_swipes(str(swipes))
+    assert source.for_users(["u0", "u1"]) == {"u0": [(cat.ids[p], True) for p in top]}
+    source.close()
+
+    asked = []
+    for_users = br.JsonlSwipes.for_users
+    monkeypatch.setattr(br.JsonlSwipes, "for_users", lambda self, uids: asked.append(uids) or for_users(self, uids))
+    br.run(job["users"], JsonlBackend(job["out"]), n=2, chunk_size=4, randomize=False,
+           swipes=str(swipes), checkpoint=job["checkpoint"])
+
+    assert asked == [USERS[:4], USERS[4:]]
+    u0 = [p.rsplit("/", 1)[1] for p in _written(job["out"]) if p.startswith("users/u0/")]
+    assert len(u0) == 2 and not {cat.ids[p] for p in top} & set(u0)
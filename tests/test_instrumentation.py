@@ -0,0 +1,30 @@
+import instrumentation as ins
+
+
+def test_collected_counter_renders_as_a_counter():
+    hits = {"hit": 3, "miss": 1}
+    counter = ins.Counter("test_lookups_total", "Lookups", ["result"], collect=lambda: hits)
+
+    assert counter.render() == [
+        "# HELP neomind_test_lookups_total Lookups",
+        "# TYPE neomind_test_lookups_total counter",
+        'neomind_test_lookups_total{result="hit"} 3',
+        'neomind_test_lookups_total{result="miss"} 1',
+    ]
+
+
+def test_cache_lookups_are_exposed_as_counters(monkeypatch):
+    monkeypatch.setitem(ins._CACHES, "test_cache", lambda: {"hit": 2, "miss": 2, "deduped": 0})
+    page = ins.REGISTRY.render()
+
+    assert "# TYPE neomind_cache_lookups_total counter" in page
+    assert 'neomind_cache_lookups_total{cache="test_cache",result="hit"} 2' in page
+    assert 'neomind_cache_hit_ratio{cache="test_cache"} 0.5' in page
+
+
+def test_counter_inc():
+    counter = ins.Counter("test_events_total", "Events", ["kind"])
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+
+    assert counter.render()[-1] == 'neomind_test_events_total{kind="a"} 3'
@@ -0,0 +1,137 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import job_recommendation as jr
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def pred_df(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    return jr._pred_df().copy()
+
+
+# ---- catalog ids ----
+
+def test_ids_survive_reloading_and_reordering(pred_df):
+    ids = jr.JobCatalog.from_frame(pred_df).ids
+    again = jr.JobCatalog.from_frame(pred_df.copy()).ids
+    shuffled = pred_df.sample(frac=1, random_state=0)
+    by_row = dict(zip(shuffled.index, jr.JobCatalog.from_frame(shuffled.reset_index(drop=True)).ids))
+
+    assert again == ids
+    assert [by_row[i] for i in pred_df.index] == ids
+    assert len(set(ids)) == len(ids)
+
+
+def test_duplicate_rows_get_distinct_keys(pred_df):
+    doubled = pred_df.iloc[[0, 0, 1]].reset_index(drop=True)
+    keys = jr._row_keys(doubled)
+
+    assert keys[0] != keys[1] and keys[1] == keys[0] + "#1"
+    assert jr.JobCatalog.from_frame(doubled).ids[0] == jr.JobCatalog.from_frame(pred_df).ids[0]
+
+
+def test_keys_prefer_jk_then_link():
+    import pandas as pd
+    df = pd.DataFrame({
+        "firm_name": ["A", "B", "C", "D"],
+        "jk": ["abc123", None, None, None],
+        "link": [None, "https://www.indeed.com/viewjob?jk=def456", "https://example.com/jobs/7", None],
+    })
+    keys = jr._row_keys(df)
+
+    assert keys[:3] == ["abc123", "def456", "link:https://example.com/jobs/7"]
+    assert keys[3].startswith("row:")
+
+
+def test_resolve_drops_unknown_ids(pred_df):
+    cat = jr.JobCatalog.from_frame(pred_df)
+
+    assert cat.resolve([(cat.ids[5], 1), ("not-a-job", 0), (cat.ids[0], 0)]) == ([5, 0], [1, 0])
+
+
+def test_exclusion_mask_covers_every_row_of_a_firm(pred_df):
+    cat = jr.JobCatalog.from_frame(pred_df)
+    names = pred_df[jr.ID_COL]
+    shared = names[names.duplicated()].iloc[:3].tolist()
+
+    mask = cat.exclusion_mask(shared + ["No Such Firm"])
+
+    assert mask.tolist() == names.isin(shared).tolist()
+    assert mask.sum() > len(shared)            # the firms appear on several rows each
+    assert not cat.exclusion_mask([]).any()
+
+# ---- pickers ----
+
+@pytest.mark.parametrize("n", [0, 1, 5, 40, 500])
+def test_top_k_matches_a_full_sort(n):
+    rng = np.random.default_rng(1)
+    scores = rng.random(300).round(2)          # plenty of ties
+    excluded = rng.random(300) < 0.3
+
+    expected = [p for p in np.argsort(-scores, kind="stable") if not excluded[p]][:n]
+
+    assert jr._top_k(scores, excluded, n).tolist() == expected
+
+
+def test_weighted_sample_is_distinct_and_skips_excluded():
+    scores = np.linspace(0, 1, 50)
+    excluded = np.zeros(50, dtype=bool)
+    excluded[40:] = True
+
+    picks = jr._weighted_sample(scores, excluded, 10)
+
+    assert len(set(picks.tolist())) == 10
+    assert not excluded[picks].any()
+    assert 0 not in picks                      # zero score, zero weight
+
+# ---- incremental model updates ----
+
+@pytest.fixture
+def scratch_model(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    path = tmp_path / "model.joblib"
+    shutil.copy(ROOT / jr.MODEL_PATH, path)
+    monkeypatch.setattr(jr, "MODEL_PATH", str(path))
+    for cached in (jr._load_model_at, jr._scores_at, jr._ranking_at):
+        cached.cache_clear()
+    yield path
+    for cached in (jr._load_model_at, jr._scores_at, jr._ranking_at):
+        cached.cache_clear()
+
+
+def test_update_model_publishes_a_new_version(scratch_model):
+    from sklearn.linear_model import SGDClassifier
+
+    v0 = jr._model_version()
+    scores0, ranking0 = jr._scores(), jr._ranking()
+    assert jr._scores() is scores0                     # cached per version
+    cat = jr._catalog()
+    top = ranking0[:5].tolist()
+
+    applied = jr.update_model([(cat.ids[p], 0) for p in top] + [("unknown", 1)])
+
+    assert applied == 5
+    assert jr._model_version() != v0
+    scores1, ranking1 = jr._scores(), jr._ranking()
+    assert scores1 is not scores0
+    assert (scores1[top] < scores0[top]).all()         # negative labels pull those scores down
+    assert ranking1.tolist() == np.argsort(-scores1, kind="stable").tolist()
+    assert list(scratch_model.parent.iterdir()) == [scratch_model]   # no temp file left behind
+
+    model = jr._load_model().named_steps["model"]
+    assert isinstance(model, SGDClassifier)
+    assert set(model.class_weight) == {0, 1}
+    assert model.class_weight[1] > model.class_weight[0]   # "balanced" resolved from the training labels
+
+
+def test_update_model_without_known_jobs_publishes_nothing(scratch_model):
+    v0 = jr._model_version()
+
+    assert jr.update_model([("unknown", 1)]) == 0
+    assert jr._model_version() == v0
@@ -0,0 +1,69 @@
+import base64
+
+import pytest
+
+import job_search as js
+
+CSV = '''"Title","Company","Location","Salary","Summary","Link"
+"Python Developer","Acme","Remote","","Build APIs","https://www.indeed.com/rc/clk?jk=aaaa1111&fccid=1"
+"Data Engineer","Globex","New York, NY","","Spark pipelines","https://www.indeed.com/pagead/clk?mo=r&vjk=bbbb2222"
+"Python Developer","Acme","Remote","","Build APIs","https://www.indeed.com/viewjob?jk=aaaa1111"
+"Analyst","Initech","","","Reports",""
+'''
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "indeed_jobs.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return js.SearchIndex.build(js.load_postings([str(path)]))
+
+
+def _cursor(index, doc):
+    return base64.urlsafe_b64encode(f"{index.build_id}:{doc}".encode()).decode()
+
+
+def test_raw_scrape_ids_come_from_the_link(index):
+    ids = [r["id"] for r in index.search(limit=10)["results"]]
+
+    assert ids == ["aaaa1111", "bbbb2222", "indeed_jobs:3"]   # the repeated posting is indexed once
+
+
+def test_cursor_pages_through_results(index):
+    first = index.search(limit=2)
+    rest = index.search(cursor=first["next_cursor"], limit=2)
+
+    assert [r["id"] for r in rest["results"]] == ["indeed_jobs:3"]
+    assert rest["next_cursor"] is None
+
+
+@pytest.mark.parametrize("doc", [-1, 3, 10 ** 9])
+def test_out_of_range_cursor_is_rejected(index, doc):
+    with pytest.raises(ValueError, match="Malformed cursor"):
+        index.search(cursor=_cursor(index, doc))
+
+
+def test_stale_cursor(index):
+    with pytest.raises(js.StaleCursor):
+        index.search(cursor=base64.urlsafe_b64encode(b"0123456789ab:0").decode())
+
+
+PREFIX_CSV = '''"Title","Company","Location","Salary","Summary","Link"
+"Python Developer","Acme","Remote","","Build APIs","https://www.indeed.com/viewjob?jk=p1"
+"PySpark Engineer","Globex","Remote","","Spark jobs","https://www.indeed.com/viewjob?jk=p2"
+"Analyst","Initech","","","Reports","https://www.indeed.com/viewjob?jk=p3"
+'''
+
+
+@pytest.fixture
+def prefix_index(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text(PREFIX_CSV, encoding="utf-8")
+    return js.SearchIndex.build(js.load_postings([str(path)]))
+
+
+def test_prefix_expanding_to_several_terms(prefix_index):
+    # "py" expands to python and pyspark; fewer hits than limit + 1 walks past the last posting
+    assert [r["id"] for r in prefix_index.search("py")["results"]] == ["p1", "p2"]
+    assert [r["id"] for r in prefix_index.search("py", title="engineer")["results"]] == ["p2"]
+    assert prefix_index.search("py", title="analyst")["results"] == []
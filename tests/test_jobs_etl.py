@@ -0,0 +1,38 @@
+import io
+
+import pandas as pd
+
+import jobs_etl
+
+CSV = '''"Title","Company","Location","Salary","Summary","Link"
+"Python Developer","Acme","Remote","","Build APIs","https://www.indeed.com/viewjob?jk=aaaa1111"
+"Data Engineer","Globex","New York, NY","","Spark pipelines",""
+"Analyst","Initech","Austin, TX","","Reports",
+"Python Developer","Acme","Remote","","Build APIs, updated","https://www.indeed.com/rc/clk?vjk=aaaa1111"
+'''
+
+
+def test_job_keys():
+    src = pd.read_csv(io.StringIO(CSV), dtype=str)
+    keys = jobs_etl.job_keys(src)
+
+    assert keys[0] == keys[3] == "aaaa1111"
+    assert keys[1] != keys[2]                              # link-less rows are keyed by their content
+    assert keys[1].startswith("r") and keys[2].startswith("r")
+    assert keys.equals(jobs_etl.job_keys(src))
+
+
+def test_run_keeps_every_link_less_posting(tmp_path):
+    source = tmp_path / "jobs.csv"
+    source.write_text(CSV, encoding="utf-8")
+    out = str(tmp_path / "jobs.arrow")
+
+    stats = jobs_etl.run([str(source)], out)
+    df = pd.read_feather(out)
+
+    assert stats["rows"] == 3
+    assert sorted(df["firm_name"]) == ["Acme", "Globex", "Initech"]
+    assert df.loc[df["firm_name"] == "Acme", "summary"].item() == "Build APIs, updated"   # last copy wins
+
+    again = jobs_etl.run([str(source)], out)
+    assert again["extracted"] == 0 and again["rows"] == 3
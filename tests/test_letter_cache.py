@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from letter_cache import LetterCache, cache_key
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_key_ignores_whitespace_and_empty_overrides():
+    a = cache_key("Jane\r\nPython  \n", {"a": 1}, {"name": "", "email": "j@x.io"}, "m", 700)
+    b = cache_key("Jane\nPython\n", {"a": 1}, {"email": "j@x.io"}, "m", 700)
+    assert a == b
+    assert a != cache_key("Jane\nPython\n", {"a": 1}, {"email": "j@x.io"}, "m", 700, "compact")
+
+
+def test_concurrent_callers_share_one_fill():
+    async def main():
+        cache, calls = LetterCache(disk_dir=None), []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "letter"
+
+        got = await asyncio.gather(*(cache.get_or_create("k", factory) for _ in range(5)))
+        again = await cache.get_or_create("k", factory)
+        return got, again, calls, cache
+
+    got, again, calls, cache = _run(main())
+    assert got == ["letter"] * 5 and again == "letter"
+    assert len(calls) == 1
+    assert (cache.misses, cache.deduped, cache.hits) == (1, 4, 1)
+
+
+def test_cancelled_owner_leaves_the_fill_to_other_waiters():
+    async def main():
+        cache = LetterCache(disk_dir=None)
+
+        async def factory():
+            await asyncio.sleep(0.02)
+            return "letter"
+
+        owner = asyncio.create_task(cache.get_or_create("k", factory))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_create("k", factory))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await waiter, owner.cancelled(), await cache.get("k")
+
+    assert _run(main()) == ("letter", True, "letter")
+
+
+def test_fill_is_cancelled_once_nobody_waits():
+    async def main():
+        cache, started, finished = LetterCache(disk_dir=None), [], []
+
+        async def factory():
+            started.append(1)
+            await asyncio.sleep(0.02)
+            finished.append(1)
+            return "letter"
+
+        only = asyncio.create_task(cache.get_or_create("k", factory))
+        await asyncio.sleep(0.005)
+        only.cancel()
+        await asyncio.sleep(0.03)
+        retry = await cache.get_or_create("k", factory)
+        return started, finished, retry
+
+    started, finished, retry = _run(main())
+    assert retry == "letter"
+    assert len(started) == 2 and len(finished) == 1
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    async def main():
+        cache, calls = LetterCache(disk_dir=None), []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("model down")
+
+        got = await asyncio.gather(*(cache.get_or_create("k", factory) for _ in range(3)),
+                                   return_exceptions=True)
+        return got, await cache.get("k"), calls
+
+    got, cached, calls = _run(main())
+    assert all(isinstance(e, RuntimeError) for e in got)
+    assert cached is None and len(calls) == 1
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    _run(LetterCache(disk_dir=str(tmp_path)).put("k", "letter"))
+    assert _run(LetterCache(disk_dir=str(tmp_path)).get("k")) == "letter"
+
+
+def test_streams_share_one_generation_and_replay_missed_deltas():
+    async def main():
+        cache, calls = LetterCache(disk_dir=None), []
+
+        async def factory():
+            calls.append(1)
+            for part in ("Dear ", "team", ",\n"):
+                await asyncio.sleep(0.01)
+                yield part
+
+        async def collect(delay):
+            await asyncio.sleep(delay)
+            return [d async for d in cache.stream_or_create("k", factory)]
+
+        got = await asyncio.gather(collect(0), collect(0.015))
+        cached = [d async for d in cache.stream_or_create("k", factory)]
+        return got, cached, calls, await cache.get("k"), cache
+
+    got, cached, calls, stored, cache = _run(main())
+    assert got == [["Dear ", "team", ",\n"]] * 2
+    assert cached == ["Dear team,"] and stored == "Dear team,"
+    assert len(calls) == 1
+    assert (cache.misses, cache.deduped, cache.hits) == (1, 1, 1)
+
+
+def test_abandoned_stream_stops_the_generation():
+    async def main():
+        cache, produced = LetterCache(disk_dir=None), []
+
+        async def factory():
+            for part in ("a", "b", "c", "d"):
+                await asyncio.sleep(0.01)
+                produced.append(part)
+                yield part
+
+        stream = cache.stream_or_create("k", factory)
+        first = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+        return first, produced, await cache.get("k")
+
+    first, produced, stored = _run(main())
+    assert first == "a" and len(produced) < 4 and stored is None
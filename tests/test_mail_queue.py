@@ -0,0 +1,124 @@
+"""MailQueue delivery against a local aiosmtpd server."""
+import asyncio
+import time
+
+from mail_queue import MailQueue
+
+
+def _queue(smtpd, **kw) -> MailQueue:
+    kw.setdefault("retry_base_s", 0.01)
+    return MailQueue("neomind@example.com", None, host=smtpd.hostname, port=smtpd.port,
+                     starttls=False, spool_dir=kw.pop("spool_dir", None), **kw)
+
+
+async def _settled(queue: MailQueue, n: int, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while queue.stats["sent"] + queue.stats["failed"] < n:
+        assert time.monotonic() < deadline, queue.metrics()
+        await asyncio.sleep(0.01)
+
+
+def test_sends_a_batch_over_one_session(smtpd):
+    async def main():
+        queue = _queue(smtpd)
+        for i in range(3):      # enqueued before start: delivered once the worker runs
+            queue.enqueue(f"user{i}@example.com", "Job Application", f"Letter {i}")
+        await queue.start()
+        await _settled(queue, 3)
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(main())
+    assert sorted(r for r, _ in smtpd.handler.delivered) == [f"user{i}@example.com" for i in range(3)]
+    assert all("Subject: Job Application" in raw for _, raw in smtpd.handler.delivered)
+    assert queue.stats["sent"] == 3 and queue.stats["connections"] == 1
+
+
+def test_unsendable_recipient_fails_alone_and_the_worker_survives(smtpd):
+    async def main():
+        queue = _queue(smtpd)
+        await queue.start()
+        queue.enqueue("jörg@exämple.com", "Job Application", "Letter")
+        queue.enqueue("ok@example.com", "Job Application", "Letter")
+        await _settled(queue, 2)
+        alive = not queue._worker.done()
+        queue.enqueue("later@example.com", "Job Application", "Letter")
+        await _settled(queue, 3)
+        await queue.stop()
+        return queue, alive
+
+    queue, alive = asyncio.run(main())
+    assert alive
+    assert [r for r, _ in smtpd.handler.delivered] == ["ok@example.com", "later@example.com"]
+    assert queue.stats["failed"] == 1 and queue.stats["retries"] == 0
+    assert "UnicodeEncodeError" in queue.stats["last_error"]
+    assert queue.stats["connections"] == 1
+
+
+def test_permanent_refusal_is_not_retried_and_keeps_the_session(smtpd):
+    smtpd.handler.refusals["gone@example.com"] = ["550 No such user"]
+
+    async def main():
+        queue = _queue(smtpd)
+        queue.enqueue("gone@example.com", "Job Application", "Letter")
+        queue.enqueue("ok@example.com", "Job Application", "Letter")
+        await queue.start()
+        await _settled(queue, 2)
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(main())
+    assert smtpd.handler.rcpt_attempts.count("gone@example.com") == 1
+    assert [r for r, _ in smtpd.handler.delivered] == ["ok@example.com"]
+    assert queue.stats["failed"] == 1 and queue.stats["retries"] == 0
+    assert queue.stats["connections"] == 1
+
+
+def test_transient_refusal_is_retried_on_a_new_session(smtpd):
+    smtpd.handler.refusals["busy@example.com"] = ["451 Try again later", None]
+
+    async def main():
+        queue = _queue(smtpd)
+        await queue.start()
+        queue.enqueue("busy@example.com", "Job Application", "Letter")
+        await _settled(queue, 1)
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(main())
+    assert [r for r, _ in smtpd.handler.delivered] == ["busy@example.com"]
+    assert queue.stats["sent"] == 1 and queue.stats["retries"] == 1
+    assert queue.stats["connections"] == 2
+
+
+def test_stop_retries_backed_off_mail_once_then_reports_it(smtpd, capsys):
+    smtpd.handler.refusals["busy@example.com"] = ["451 Try again later"]
+
+    async def main():
+        queue = _queue(smtpd, retry_base_s=60)
+        await queue.start()
+        queue.enqueue("busy@example.com", "Job Application", "Letter")
+        while not queue._retrying:
+            await asyncio.sleep(0.01)
+        await queue.stop(timeout=5)
+        return queue
+
+    queue = asyncio.run(main())
+    assert smtpd.handler.rcpt_attempts.count("busy@example.com") == 2
+    assert "busy@example.com not delivered before shutdown, dropped" in capsys.readouterr().out
+    assert queue.metrics()["retry_pending"] == 0
+
+
+def test_spooled_mail_is_delivered_after_a_restart(smtpd, tmp_path):
+    _queue(smtpd, spool_dir=str(tmp_path)).enqueue("ok@example.com", "Job Application", "Letter")
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    async def main():
+        queue = _queue(smtpd, spool_dir=str(tmp_path))
+        await queue.start()
+        await _settled(queue, 1)
+        await queue.stop()
+
+    asyncio.run(main())
+    assert [r for r, _ in smtpd.handler.delivered] == ["ok@example.com"]
+    assert list(tmp_path.glob("*.json")) == []
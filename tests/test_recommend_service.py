@@ -0,0 +1,32 @@
+import threading
+import time
+
+import pytest
+
+import job_recommendation as jr
+import recommend_service as rs
+
+
+def test_crash_looping_workers_back_off_then_give_up(monkeypatch, capsys):
+    monkeypatch.setattr(rs, "_worker", lambda sock, host, port: None)   # every child exits at once
+    monkeypatch.setattr(rs, "RESPAWN_BACKOFF_S", 0.05)
+    monkeypatch.setattr(rs, "RESPAWN_MAX_FAILURES", 3)
+
+    t0 = time.monotonic()
+    with pytest.raises(RuntimeError, match="crashed 3 times in a row"):
+        rs.serve("127.0.0.1", 0, workers=1, preload_first=False)
+
+    assert time.monotonic() - t0 >= 0.05 + 0.1          # backoffs before the 2nd and 3rd start
+    assert capsys.readouterr().out.count("restarting in") == 2
+
+
+def test_each_thread_draws_from_its_own_generator():
+    rngs = []
+    threads = [threading.Thread(target=lambda: rngs.append(jr._rng())) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(r) for r in rngs}) == 3
+    assert jr._rng() is jr._rng()
@@ -0,0 +1,162 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+
+import scrape_engine as se
+from scrape_store import ScrapeStore, scrape_incremental
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PAGE_URL = "https://www.indeed.com/jobs?q=python&l=remote&start=0"
+
+
+def fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_parse_listing_fields():
+    rows = se.parse_listing(fixture("indeed_listing.html"), PAGE_URL)
+
+    assert len(rows) == 4   # the card-shaped markup inside <script> is not a card
+    assert rows[0] == [
+        "Senior Python Developer",   # the "new" badge is skipped, whitespace collapsed
+        "Acme & Sons",
+        "Remote in Austin, TX",
+        "$120,000 - $150,000 a year",
+        "Build 'data' pipelines Own the API",   # quotes made CSV-safe
+        "https://www.indeed.com/rc/clk?jk=a1b2c3d4e5f6a7b8&fccid=1&vjs=3",
+    ]
+
+
+def test_parse_listing_fallback_selectors_and_missing_fields():
+    rows = se.parse_listing(fixture("indeed_listing.html"), PAGE_URL)
+
+    assert rows[1] == ["Data Engineer", "Globex", "New York, NY", "$60 an hour", "",
+                       "https://www.indeed.com/viewjob?jk=0f0f0f0f0f0f0f0f"]
+    assert rows[2] == ["Unlinked Posting", "Initech", "", "", "", ""]
+
+
+def test_parse_detail_skips_scripts():
+    text = se.parse_detail(fixture("indeed_detail.html"))
+
+    assert text.startswith("Globex is hiring a Data Engineer")
+    assert "track(" not in text
+    assert text.endswith("Spark & Airflow Tabs and newlines")
+    assert se.parse_detail(fixture("indeed_listing.html")) == ""
+
+
+def test_looks_blocked():
+    assert se.looks_blocked(fixture("indeed_blocked.html"))
+    assert not se.looks_blocked(fixture("indeed_listing.html"))
+    assert not se.looks_blocked(fixture("indeed_detail.html"))
+
+
+def test_child_and_descendant_selectors():
+    root = se.parse_html(fixture("indeed_listing.html"))
+
+    assert len(root.select("h2.jobTitle > span")) == 5
+    assert len(root.select("ul.jobsearch-ResultsList div.tapItem")) == 4
+    assert root.select("ul.jobsearch-ResultsList > div.tapItem") == []
+    assert root.select_one("#mosaic-provider-jobcards").tag == "div"
+
+
+def test_retry_after_is_clamped(monkeypatch):
+    replies = [httpx.Response(429, headers={"Retry-After": "86400"}),
+               httpx.Response(200, text=fixture("indeed_detail.html"))]
+    slept = []
+
+    async def no_sleep(delay):
+        slept.append(delay)
+
+    async def main():
+        fetcher = se.Fetcher(rate=0, browser="never", max_retry_after=5.0)
+        await fetcher.client.aclose()
+        fetcher.client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: replies.pop(0)))
+        monkeypatch.setattr(se.asyncio, "sleep", no_sleep)
+        try:
+            return await fetcher.get("https://www.indeed.com/viewjob?jk=0f0f0f0f0f0f0f0f")
+        finally:
+            monkeypatch.undo()
+            await fetcher.close()
+
+    html = asyncio.run(main())
+
+    assert "jobDescriptionText" in html
+    assert slept == [5.0]
+
+
+class FixtureFetcher:
+    """Serves the listing fixture as the first page and fails every later one."""
+
+    def __init__(self):
+        self.urls = []
+
+    async def get(self, url):
+        self.urls.append(url)
+        if "viewjob" in url:
+            return fixture("indeed_detail.html")
+        if "/jobs?" in url and url.endswith("start=0"):
+            return fixture("indeed_listing.html")
+        raise se.Blocked(url)
+
+
+def test_incremental_counts_distinct_jobs(tmp_path):
+    store = ScrapeStore(str(tmp_path / "jobs.sqlite"))
+
+    with pytest.raises(se.ListingError):
+        asyncio.run(scrape_incremental(store, "python", "remote", 20, fetcher=FixtureFetcher()))
+
+    # the second Acme card repeats jk a1b2c3d4e5f6a7b8 (as vjk) and the unlinked card has no key
+    assert store.checkpoint("python|remote") == (se.PAGE_SIZE, 2)
+    assert sorted(r[5] for r in store.rows()) == [
+        "https://www.indeed.com/rc/clk?jk=a1b2c3d4e5f6a7b8&fccid=1&vjs=3",
+        "https://www.indeed.com/viewjob?jk=0f0f0f0f0f0f0f0f",
+    ]
+    store.close()
+
+
+def test_scrape_failure_cancels_detail_fetches(monkeypatch):
+    class SlowDetails:
+        async def get(self, url):
+            if "viewjob" in url:
+                await asyncio.sleep(10)
+            return fixture("indeed_listing.html")   # every listing page parses
+
+    parse = se.parse_listing
+
+    def parse_first_page_only(html, page_url):
+        if not page_url.endswith("start=0"):
+            raise RuntimeError("unexpected markup")
+        return parse(html, page_url)
+
+    monkeypatch.setattr(se, "parse_listing", parse_first_page_only)
+
+    async def main():
+        with pytest.raises(RuntimeError, match="unexpected markup"):
+            await se.scrape("python", "remote", 20, fetcher=SlowDetails())
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []   # the first page's detail fetches were not left running
+
+
+def test_incremental_failure_cancels_page_tasks(tmp_path, monkeypatch):
+    class SlowDetails:
+        async def get(self, url):
+            if "viewjob" in url:
+                await asyncio.sleep(10)
+            return fixture("indeed_listing.html")
+
+    parse = se.parse_listing
+    monkeypatch.setattr(se, "parse_listing", lambda html, page_url: parse(html, page_url)
+                        if page_url.endswith("start=0") else 1 / 0)
+    store = ScrapeStore(str(tmp_path / "jobs.sqlite"))
+
+    async def main():
+        with pytest.raises(ZeroDivisionError):
+            await scrape_incremental(store, "python", "remote", 20, fetcher=SlowDetails())
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
+    assert store.checkpoint("python|remote") == (0, 0)   # the unfinished page was not stored
+    store.close()
@@ -0,0 +1,236 @@
+"""Cover-letter routes against a fake AsyncOpenAI client (no network, no API key)."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from letter_cache import LetterCache
+from mail_queue import MailQueue
+
+CV = """Jane Doe
+jane@example.com
+
+Skills
+Python, FastAPI, PostgreSQL
+
+Experience
+Backend Engineer, Acme 2019 - 2024
+- Cut p95 latency by 40% for 2M users
+"""
+JOB = {"firm_name": "Duolingo", "position": "Backend Engineer", "skills": ["Python", "Django"]}
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(type="response.output_text.delta", delta=chunk)
+        yield SimpleNamespace(type="response.completed", delta=None)
+
+
+class FakeResponses:
+    def __init__(self):
+        self.calls = []
+        self.delay = 0.0
+        self.error = None
+
+    async def create(self, *, model, max_output_tokens, input, extra_body=None, stream=False):
+        self.calls.append({"model": model, "max_output_tokens": max_output_tokens,
+                           "input": input, "extra_body": extra_body, "stream": stream})
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        letter = f"Dear hiring team, letter #{len(self.calls)}."
+        if stream:
+            return FakeStream([letter[:10], letter[10:]])
+        return SimpleNamespace(output_text=f"  {letter}\n")
+
+
+class FakeAsyncOpenAI:
+    def __init__(self):
+        self.responses = FakeResponses()
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeAsyncOpenAI()
+    monkeypatch.setattr(server, "OPENAI_API_KEY", "test")
+    monkeypatch.setattr(server, "EMAIL_USER", "neomind@example.com")
+    monkeypatch.setattr(server, "EMAIL_PASS", "test")
+    monkeypatch.setattr(server, "client", fake)
+    monkeypatch.setattr(server, "letter_cache", LetterCache(disk_dir=None))
+    monkeypatch.setattr(server, "llm_slots", asyncio.Semaphore(server.LLM_MAX_CONCURRENCY))
+    return fake
+
+
+@pytest.fixture
+def api(llm):
+    with TestClient(server.app) as c:
+        yield c
+
+
+def _events(body: str):
+    out = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((fields["event"], json.loads(fields["data"])))
+    return out
+
+
+def test_generate_returns_the_stripped_letter(api, llm):
+    r = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": JOB})
+    assert r.status_code == 200
+    assert r.json() == {"letter": "Dear hiring team, letter #1."}
+    (call,) = llm.responses.calls
+    assert call["model"] == server.DEFAULT_MODEL
+    assert call["extra_body"]["prompt_cache_key"]
+    prompt = call["input"][-1]["content"]
+    assert "Duolingo" in prompt and "Python" in prompt
+
+
+def test_job_json_may_be_a_string(api, llm):
+    r = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": json.dumps(JOB)})
+    assert r.status_code == 200
+    assert len(llm.responses.calls) == 1
+
+
+def test_invalid_job_json_is_a_400(api, llm):
+    r = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": "{not json"})
+    assert r.status_code == 400
+    assert llm.responses.calls == []
+
+
+@pytest.mark.parametrize("job_json", ["[1, 2]", '"a job"', "42", "null"])
+def test_job_json_that_is_not_an_object_is_a_400(api, llm, job_json):
+    r = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": job_json})
+    assert r.status_code == 400
+    events = _events(api.post("/generate-cover-letters/batch", json={"cv_text": CV, "jobs": [job_json]}).text)
+    assert events[0][0] == "error" and events[0][1]["status"] == 400
+    assert llm.responses.calls == []
+
+
+def test_identical_requests_share_one_llm_call(api, llm):
+    first = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": JOB}).json()
+    second = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": JOB}).json()
+    assert first == second
+    assert len(llm.responses.calls) == 1
+    assert server.letter_cache.hits == 1
+
+
+def test_no_free_llm_slot_is_a_503(api, llm, monkeypatch):
+    monkeypatch.setattr(server, "llm_slots", asyncio.Semaphore(0))
+    monkeypatch.setattr(server, "LLM_QUEUE_TIMEOUT_S", 0.05)
+    r = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": JOB})
+    assert r.status_code == 503
+    assert llm.responses.calls == []
+
+
+def test_stream_sends_deltas_then_the_letter(api, llm):
+    r = api.post("/generate-cover-letter/stream", json={"cv_text": CV, "job_json": JOB})
+    assert r.status_code == 200
+    events = _events(r.text)
+    assert [e for e, _ in events] == ["delta", "delta", "done"]
+    assert "".join(d["text"] for e, d in events if e == "delta") == events[-1][1]["letter"]
+    assert llm.responses.calls[0]["stream"] is True
+
+
+def test_stream_serves_a_cached_letter_in_one_piece(api, llm):
+    letter = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": JOB}).json()["letter"]
+    events = _events(api.post("/generate-cover-letter/stream", json={"cv_text": CV, "job_json": JOB}).text)
+    assert events == [("delta", {"text": letter}), ("done", {"letter": letter})]
+    assert len(llm.responses.calls) == 1
+
+
+def test_stream_reports_model_errors_as_an_event(api, llm):
+    llm.responses.error = RuntimeError("model exploded")
+    events = _events(api.post("/generate-cover-letter/stream", json={"cv_text": CV, "job_json": JOB}).text)
+    assert events[-1][0] == "error" and events[-1][1]["status"] == 500
+
+
+def _model_timeout():
+    return openai.APITimeoutError(request=httpx.Request("POST", "https://api.openai.com/v1/responses"))
+
+
+def test_model_timeouts_are_a_504_on_every_route(api, llm):
+    llm.responses.error = _model_timeout()
+    r = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": JOB})
+    assert r.status_code == 504
+
+    events = _events(api.post("/generate-cover-letter/stream", json={"cv_text": CV, "job_json": JOB}).text)
+    assert events[-1] == ("error", {"status": 504, "detail": "Model request timed out."})
+
+    events = _events(api.post("/generate-cover-letters/batch", json={"cv_text": CV, "jobs": [JOB]}).text)
+    assert events[0] == ("error", {"index": 0, "status": 504, "detail": "Model request timed out."})
+
+
+def test_batch_streams_one_result_per_job(api, llm):
+    jobs = [JOB, {**JOB, "firm_name": "Anthropic"}, "{not json"]
+    r = api.post("/generate-cover-letters/batch", json={"cv_text": CV, "jobs": jobs})
+    assert r.status_code == 200
+    events = _events(r.text)
+    assert events[-1] == ("done", {"count": 3})
+    by_index = {d["index"]: (e, d) for e, d in events[:-1]}
+    assert by_index[0][0] == by_index[1][0] == "result"
+    assert by_index[2][0] == "error" and by_index[2][1]["status"] == 400
+    # every job reuses the same CV prefix, so the provider sees one prompt cache key
+    assert len({c["extra_body"]["prompt_cache_key"] for c in llm.responses.calls}) == 1
+    assert len(llm.responses.calls) == 2
+
+
+@pytest.mark.parametrize("jobs", [[], [JOB] * (server.BATCH_MAX_JOBS + 1)])
+def test_batch_rejects_empty_and_oversized_requests(api, llm, jobs):
+    r = api.post("/generate-cover-letters/batch", json={"cv_text": CV, "jobs": jobs})
+    assert r.status_code == 400
+
+
+def test_cache_hits_skip_prompt_building(api, llm, monkeypatch):
+    api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": JOB})
+    built = []
+    monkeypatch.setattr(server, "build_prompt_prefix", lambda *a, **k: built.append(1) or "")
+    r = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": JOB})
+    assert r.status_code == 200
+    assert built == []
+
+
+def test_unsendable_recipient_does_not_break_mail_or_shutdown(llm, smtpd, monkeypatch):
+    queue = MailQueue("neomind@example.com", None, host=smtpd.hostname, port=smtpd.port, starttls=False)
+    monkeypatch.setattr(server, "mail_queue", queue)
+    with TestClient(server.app) as api:
+        for to in ("jörg@exämple.com", "jane@example.com"):
+            r = api.post("/generate-cover-letter", json={"cv_text": CV, "job_json": JOB, "recipient_email": to})
+            assert r.status_code == 200
+    # the lifespan's stop() drained the queue without re-raising from the worker
+    assert [rcpt for rcpt, _ in smtpd.handler.delivered] == ["jane@example.com"]
+    assert queue.stats["failed"] == 1
+
+
+def test_concurrent_identical_streams_share_one_llm_call(llm):
+    llm.responses.delay = 0.05
+
+    async def main():
+        async def collect():
+            return "".join([d async for d in server.stream_cover_letter_from_inputs(CV, JOB)])
+
+        return await asyncio.gather(collect(), collect(), collect())
+
+    letters = asyncio.run(main())
+    assert len(set(letters)) == 1 and letters[0]
+    assert len(llm.responses.calls) == 1
+    cache = server.letter_cache
+    assert (cache.misses, cache.deduped) == (1, 2)